@@ -0,0 +1,111 @@
+"""
+쿼리 임베딩 마이크로 배치 벤치마크 - 동시 쿼리 임베딩의 HTTP 요청 수와 소요 시간 비교
+
+실행 예:
+    python -m benchmarks.embedding_batch
+    python -m benchmarks.embedding_batch --concurrency 64 --max-batch-size 16 --output batch.json
+
+가짜 Ollama 서버(benchmarks.fake_ollama)를 같은 프로세스에서 띄우고, 캐시 없이
+N개의 embed_query를 동시에 호출합니다. 배처를 거친 경우와 거치지 않은 경우의
+소요 시간과 서버가 받은 임베딩 요청 수를 측정하며, 배처의 요청 수가
+약 N / max_batch_size(시간 창이 나뉜 배치 수만큼 여유)를 넘으면 실패로 종료합니다.
+"""
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+import httpx
+from benchmarks.fake_ollama import add_arguments, make_server, server_options
+from models.embedding_batcher import MicroBatchingEmbeddings
+from models.ollama_client import PooledOllamaEmbeddings
+
+
+def run(embeddings, base_url: str, concurrency: int, seed: int) -> Dict[str, Any]:
+    """
+    동시 embed_query 호출 후 소요 시간과 서버 요청 수 측정
+
+    Args:
+        embeddings: 임베딩 모델
+        base_url: 가짜 Ollama 서버 주소
+        concurrency: 동시 호출 수
+        seed: 쿼리 문장 구분용 시드
+
+    Returns:
+        Dict: 소요 시간, 임베딩 요청 수, 임베딩한 텍스트 수
+    """
+    before = httpx.get(f"{base_url}/bench/stats").json()
+    barrier = threading.Barrier(concurrency)
+
+    def query(index: int):
+        barrier.wait()
+        return embeddings.embed_query(f"query {seed} {index}")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        started = time.perf_counter()
+        vectors = list(executor.map(query, range(concurrency)))
+        seconds = time.perf_counter() - started
+
+    after = httpx.get(f"{base_url}/bench/stats").json()
+    return {
+        "seconds": round(seconds, 4),
+        "queries": len(vectors),
+        "http_requests": after.get("embedding_requests", 0) - before.get("embedding_requests", 0),
+        "embedded_texts": after.get("embedded_texts", 0) - before.get("embedded_texts", 0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="쿼리 임베딩 마이크로 배치 벤치마크")
+    parser.add_argument("--concurrency", type=int, default=32, help="동시 embed_query 호출 수")
+    parser.add_argument("--window-ms", type=float, default=5.0, help="배치 시간 창")
+    parser.add_argument("--max-batch-size", type=int, default=32, help="배치 최대 크기")
+    parser.add_argument("--max-inflight", type=int, default=2, help="동시에 진행할 최대 배치 수")
+    parser.add_argument("--output", default=None, help="결과를 저장할 JSON 파일")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = make_server("127.0.0.1", 0, **server_options(args))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    plain = PooledOllamaEmbeddings(base_url=base_url, model="fake-embed")
+    batcher = MicroBatchingEmbeddings(
+        underlying=PooledOllamaEmbeddings(base_url=base_url, model="fake-embed"),
+        window_ms=args.window_ms,
+        max_batch_size=args.max_batch_size,
+        max_inflight=args.max_inflight,
+    )
+    try:
+        results = {
+            "concurrency": args.concurrency,
+            "plain": run(plain, base_url, args.concurrency, seed=0),
+            "microbatch": {**run(batcher, base_url, args.concurrency, seed=1), **batcher.stats()},
+        }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # 시간 창 경계에서 나뉘는 배치를 고려해 진행 중인 배치 수만큼 여유를 둠
+    expected = math.ceil(args.concurrency / args.max_batch_size)
+    allowed = expected + args.max_inflight
+    results["expected_http_requests"] = expected
+    results["passed"] = results["microbatch"]["http_requests"] <= allowed
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"결과 저장: {args.output}")
+    else:
+        print(output)
+    if not results["passed"]:
+        print(f"배치 HTTP 요청 수가 예상({expected}, 허용 {allowed})보다 많습니다", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+가짜 Ollama 서버 - 실제 모델 없이 벤치마크를 돌리기 위한 로컬 HTTP 서버
+
+실행 예:
+    python -m benchmarks.fake_ollama --port 11435 --tokens-per-second 30 --ttft-ms 150
+
+/api/embeddings, /api/embed, /api/generate(스트리밍 포함), /api/tags를 흉내 냅니다.
+임베딩은 텍스트 해시를 시드로 만든 단위 벡터라 같은 텍스트면 항상 같은 값이고,
+생성 토큰도 프롬프트 해시로 정해지므로 실행마다 결과가 같습니다.
+지연 시간(임베딩 요청/항목당, 첫 토큰까지, 초당 토큰 수)은 인자로 조절합니다.
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+import numpy as np
+
+
+# 생성 응답에 쓰는 단어 목록
+WORDS = (
+    "검색된", "문서에", "따르면", "이", "시스템은", "질문에", "대한", "답변을", "제공합니다",
+    "the", "context", "describes", "how", "documents", "are", "chunked", "and", "embedded",
+)
+
+
+def fake_embedding(text: str, dim: int) -> List[float]:
+    """
+    텍스트 해시를 시드로 한 결정적 단위 벡터
+
+    Args:
+        text: 임베딩할 텍스트
+        dim: 차원
+
+    Returns:
+        List[float]: 임베딩 벡터
+    """
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+    return vector.tolist()
+
+
+def fake_tokens(prompt: str, count: int) -> List[str]:
+    """프롬프트 해시로 정해지는 생성 토큰 목록"""
+    seed = int.from_bytes(hashlib.sha256(prompt.encode("utf-8")).digest()[:8], "little")
+    rng = np.random.default_rng(seed)
+    return [WORDS[index] + " " for index in rng.integers(0, len(WORDS), count)]
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """가짜 Ollama 요청 처리"""
+
+    protocol_version = "HTTP/1.1"
+    options: Dict[str, Any] = {}
+    counters: Dict[str, int] = {}
+    counters_lock = threading.Lock()
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self.counters_lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def _send_json(self, data: Any, status: int = 200) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, data: Dict[str, Any]) -> None:
+        line = (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+    def do_GET(self) -> None:
+        if self.path == "/api/tags":
+            model = {"name": self.options["model"], "model": self.options["model"]}
+            self._send_json({"models": [model]})
+        elif self.path == "/api/version":
+            self._send_json({"version": "0.0.0-fake"})
+        elif self.path == "/bench/stats":
+            with self.counters_lock:
+                self._send_json(dict(self.counters))
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/api/embeddings":
+            self._embed([body.get("prompt", "")], key="embedding")
+        elif self.path == "/api/embed":
+            inputs = body.get("input", "")
+            self._embed([inputs] if isinstance(inputs, str) else inputs, key="embeddings")
+        elif self.path == "/api/generate":
+            self._generate(body)
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def _embed(self, texts: List[str], key: str) -> None:
+        """임베딩 응답 (요청당 지연 + 항목당 지연)"""
+        self._count("embedding_requests")
+        self._count("embedded_texts", len(texts))
+        options = self.options
+        time.sleep((options["embed_latency_ms"] + options["embed_item_ms"] * len(texts)) / 1000)
+        vectors = [fake_embedding(text, options["dim"]) for text in texts]
+        self._send_json({key: vectors[0] if key == "embedding" else vectors})
+
+    def _generate(self, body: Dict[str, Any]) -> None:
+        """생성 응답 (첫 토큰 지연 후 초당 토큰 수에 맞춰 전송)"""
+        self._count("generate_requests")
+        options = self.options
+        prompt = body.get("prompt", "")
+        limit = (body.get("options") or {}).get("num_predict") or options["response_tokens"]
+        tokens = fake_tokens(prompt, min(options["response_tokens"], limit))
+        prompt_tokens = max(1, len(prompt.encode("utf-8")) // 4)
+        interval = 1 / options["tokens_per_second"]
+        started = time.perf_counter()
+
+        final = {
+            "model": options["model"],
+            "response": "",
+            "done": True,
+            "done_reason": "stop",
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(options["ttft_ms"] * 1e6),
+            "eval_count": len(tokens),
+            "eval_duration": int(len(tokens) * interval * 1e9),
+        }
+        self._count("generated_tokens", len(tokens))
+        time.sleep(options["ttft_ms"] / 1000)
+
+        if body.get("stream", True) is False:
+            time.sleep(len(tokens) * interval)
+            final["response"] = "".join(tokens)
+            final["total_duration"] = int((time.perf_counter() - started) * 1e9)
+            self._send_json(final)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for index, token in enumerate(tokens):
+            if index:
+                time.sleep(interval)
+            self._send_chunk({"model": options["model"], "response": token, "done": False})
+        final["total_duration"] = int((time.perf_counter() - started) * 1e9)
+        self._send_chunk(final)
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def make_server(host: str = "127.0.0.1", port: int = 11435, dim: int = 768,
+                embed_latency_ms: float = 15.0, embed_item_ms: float = 2.0,
+                ttft_ms: float = 100.0, tokens_per_second: float = 50.0,
+                response_tokens: int = 32, model: str = "llama3.1") -> ThreadingHTTPServer:
+    """
+    가짜 Ollama 서버 생성 (serve_forever()로 실행)
+
+    Args:
+        host: 바인딩 주소
+        port: 포트 (0이면 빈 포트)
+        dim: 임베딩 차원
+        embed_latency_ms: 임베딩 요청당 지연
+        embed_item_ms: 임베딩 텍스트 하나당 추가 지연
+        ttft_ms: 첫 토큰까지 지연 (프롬프트 처리 시간)
+        tokens_per_second: 생성 속도
+        response_tokens: 응답 토큰 수 (요청의 num_predict가 더 작으면 그 값)
+        model: /api/tags에 보고할 모델 이름
+
+    Returns:
+        ThreadingHTTPServer: 서버
+    """
+    handler = type("Handler", (FakeOllamaHandler,), {
+        "options": {
+            "dim": dim,
+            "embed_latency_ms": embed_latency_ms,
+            "embed_item_ms": embed_item_ms,
+            "ttft_ms": ttft_ms,
+            "tokens_per_second": tokens_per_second,
+            "response_tokens": response_tokens,
+            "model": model,
+        },
+        "counters": {},
+        "counters_lock": threading.Lock(),
+    })
+    # 동시 연결이 몰려도 listen 백로그(기본 5)가 넘쳐 SYN 재전송(1초)이 생기지 않도록 크게 설정
+    server_class = type("Server", (ThreadingHTTPServer,), {"request_queue_size": 1024})
+    server = server_class((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """가짜 서버 설정 인자 추가 (부하 테스트 스크립트와 공유)"""
+    parser.add_argument("--dim", type=int, default=768, help="임베딩 차원")
+    parser.add_argument("--embed-latency-ms", type=float, default=15.0, help="임베딩 요청당 지연")
+    parser.add_argument("--embed-item-ms", type=float, default=2.0, help="임베딩 텍스트 하나당 추가 지연")
+    parser.add_argument("--ttft-ms", type=float, default=100.0, help="첫 토큰까지 지연")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="생성 속도")
+    parser.add_argument("--response-tokens", type=int, default=32, help="응답 토큰 수")
+
+
+def server_options(args) -> Dict[str, Any]:
+    """인자에서 make_server() 키워드 인자 추출"""
+    return {
+        "dim": args.dim,
+        "embed_latency_ms": args.embed_latency_ms,
+        "embed_item_ms": args.embed_item_ms,
+        "ttft_ms": args.ttft_ms,
+        "tokens_per_second": args.tokens_per_second,
+        "response_tokens": args.response_tokens,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="벤치마크용 가짜 Ollama 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, **server_options(args))
+    print(f"가짜 Ollama 서버: http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
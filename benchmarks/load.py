@@ -0,0 +1,613 @@
+"""
+서비스 부하 벤치마크 - 가짜 Ollama 서버를 붙여 API 처리량과 지연 시간 측정
+
+실행 예:
+    python -m benchmarks.load --output load.json
+    python -m benchmarks.load --scenarios query --concurrency 1 8 32 --requests 200
+    python -m benchmarks.load --scenarios replay --log traces.jsonl --replay-speed 2
+    python -m benchmarks.load --url http://localhost:8000 --scenarios query   # 실행 중인 서버 대상
+
+--url이 없으면 가짜 Ollama 서버(benchmarks.fake_ollama)와 API 서버(uvicorn)를
+임시 디렉토리를 쓰는 별도 프로세스로 띄우고 끝나면 정리합니다.
+
+시나리오:
+    upload  합성 문서를 업로드하고 수집 작업이 끝날 때까지 처리량 측정
+    query   동시성 단계별 /api/rag/query 지연(p50/p95/p99)과 처리량
+    mixed   질의와 업로드를 정해진 시간 동안 동시에 실행
+    replay  요청 로그(JSONL)를 기록된 간격 또는 최대 속도로 재생
+
+요청 로그는 한 줄에 요청 하나입니다:
+    {"method": "POST", "path": "/api/rag/query", "json": {"question": "..."}, "offset": 0.25}
+    {"question": "..."}    # POST /api/rag/query 축약형
+기본값은 서버의 추적 로그(TRACE_LOG_PATH)이며, 추적 레코드는 이름("POST /api/rag/query")과
+시작 시각으로 경로와 간격을 재현합니다. 추적에는 요청 본문이 없으므로 질의 경로에는 합성 질문을
+넣고, 파일 업로드와 수집 작업(ingest) 레코드는 건너뜁니다.
+offset(초)이 있으면 --replay-speed 배속으로 같은 간격을 재현하고, 없으면
+--replay-concurrency 동시성으로 최대한 빠르게 보냅니다. 형식이 맞지 않는 줄은 건너뛰며,
+재생할 요청이 하나도 없으면 오류로 종료합니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+import httpx
+import numpy as np
+from benchmarks.fake_ollama import add_arguments, server_options
+from config import settings
+
+
+# 저장소 루트 (API 서버 실행 위치)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 합성 문서에 쓰는 단어 목록 (주제 단어는 키워드 검색에 걸리도록 문서마다 다르게 섞음)
+VOCABULARY = (
+    "시스템", "문서", "검색", "임베딩", "벡터", "질문", "답변", "모델", "서버", "요청",
+    "latency", "throughput", "cache", "index", "chunk", "token", "batch", "query", "store", "pipeline",
+)
+TOPICS = ("ollama", "chroma", "fastapi", "langchain", "numpy", "bm25", "mmr", "sse", "manifest", "embedding")
+
+# 추적 레코드 이름 ("POST /api/rag/query")
+TRACE_NAME = re.compile(r"^(GET|POST|PUT|PATCH|DELETE) (/\S*)$")
+
+# 본문 없이 기록된 추적을 재생할 때 넣을 합성 본문 (번호 → JSON)
+REPLAY_BODIES = {
+    "/api/rag/query": lambda index, seed: {"question": make_question(index, seed)},
+    "/api/rag/query/stream": lambda index, seed: {"question": make_question(index, seed)},
+    "/api/rag/query/batch": lambda index, seed: {"questions": [make_question(index, seed)]},
+    "/api/chat/query": lambda index, seed: {"message": make_question(index, seed)},
+    "/api/chat/query/stream": lambda index, seed: {"message": make_question(index, seed)},
+}
+
+
+def percentile_ms(samples: List[float], q: float) -> float:
+    """초 단위 샘플의 백분위수를 밀리초로 반환"""
+    return round(float(np.percentile(samples, q)) * 1000, 3) if samples else 0.0
+
+
+def summarize(latencies: List[float], errors: int, seconds: float) -> Dict[str, Any]:
+    """
+    지연 시간 샘플 요약
+
+    Args:
+        latencies: 성공한 요청의 지연 시간(초)
+        errors: 실패한 요청 수
+        seconds: 측정 구간 길이(초)
+
+    Returns:
+        Dict: 요청 수, 오류 수, 초당 처리량, 평균/p50/p95/p99/최대 지연(ms)
+    """
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "throughput_rps": round(len(latencies) / seconds, 2) if seconds > 0 else 0.0,
+        "mean_ms": round(float(np.mean(latencies)) * 1000, 3) if latencies else 0.0,
+        "p50_ms": percentile_ms(latencies, 50),
+        "p95_ms": percentile_ms(latencies, 95),
+        "p99_ms": percentile_ms(latencies, 99),
+        "max_ms": round(max(latencies) * 1000, 3) if latencies else 0.0,
+    }
+
+
+def make_document(index: int, chars: int, seed: int) -> str:
+    """
+    고정 시드로 합성 문서 생성
+
+    Args:
+        index: 문서 번호
+        chars: 대략적인 문서 길이(문자 수)
+        seed: 시드
+
+    Returns:
+        str: 문서 본문
+    """
+    rng = random.Random(seed * 100003 + index)
+    topic = TOPICS[index % len(TOPICS)]
+    sentences = []
+    length = 0
+    while length < chars:
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(6, 14))]
+        words.insert(rng.randrange(len(words)), topic)
+        sentence = " ".join(words) + f" (doc-{index})."
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return "\n".join(sentences)
+
+
+def make_question(index: int, seed: int) -> str:
+    """질문 생성 (번호가 다르면 답변 캐시에 걸리지 않도록 서로 다른 문장)"""
+    rng = random.Random(seed * 7919 + index)
+    words = " ".join(rng.choice(VOCABULARY) for _ in range(4))
+    return f"{TOPICS[index % len(TOPICS)]} {words} #{index}?"
+
+
+class Timer:
+    """요청 지연 시간 수집기"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.error_samples: List[str] = []
+
+    async def call(self, coro) -> Optional[httpx.Response]:
+        """
+        요청 하나 실행 후 지연 시간 기록 (4xx/5xx와 예외는 오류로 집계)
+
+        Args:
+            coro: httpx 요청 코루틴
+
+        Returns:
+            Optional[httpx.Response]: 응답 (예외 시 None)
+        """
+        started = time.perf_counter()
+        try:
+            response = await coro
+        except Exception as e:
+            self._error(f"{type(e).__name__}: {e}")
+            return None
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            self._error(f"HTTP {response.status_code}: {response.text[:200]}")
+        else:
+            self.latencies.append(elapsed)
+        return response
+
+    def _error(self, message: str) -> None:
+        self.errors += 1
+        if len(self.error_samples) < 5:
+            self.error_samples.append(message)
+
+    def summary(self, seconds: float) -> Dict[str, Any]:
+        """요약 통계 (오류가 있으면 예시 메시지 포함)"""
+        result = summarize(self.latencies, self.errors, seconds)
+        if self.error_samples:
+            result["error_samples"] = self.error_samples
+        return result
+
+
+async def upload_document(client: httpx.AsyncClient, timer: Timer, index: int, args) -> Optional[str]:
+    """합성 문서 하나 업로드 후 작업 ID 반환"""
+    content = make_document(index, args.doc_chars, args.seed).encode("utf-8")
+    files = {"file": (f"bench-{args.seed}-{index}.txt", content, "text/plain")}
+    response = await timer.call(client.post("/api/rag/upload", files=files))
+    if response is None or response.status_code >= 400:
+        return None
+    return response.json()["job_id"]
+
+
+async def wait_for_jobs(client: httpx.AsyncClient, job_ids: List[str],
+                        poll_interval: float = 0.05) -> List[Dict[str, Any]]:
+    """모든 수집 작업이 끝날 때까지 상태 조회"""
+    pending = set(job_ids)
+    jobs: Dict[str, Dict[str, Any]] = {}
+    while pending:
+        for job_id in list(pending):
+            response = await client.get(f"/api/rag/jobs/{job_id}")
+            job = response.json()
+            if job["status"] in ("completed", "failed"):
+                jobs[job_id] = job
+                pending.discard(job_id)
+        if pending:
+            await asyncio.sleep(poll_interval)
+    return [jobs[job_id] for job_id in job_ids]
+
+
+async def scenario_upload(client: httpx.AsyncClient, args, offset: int = 0) -> Dict[str, Any]:
+    """
+    업로드 처리량 측정
+
+    --documents개 문서를 --upload-concurrency 동시성으로 업로드하고
+    모든 수집 작업이 끝날 때까지의 시간을 잽니다.
+    """
+    timer = Timer()
+    semaphore = asyncio.Semaphore(args.upload_concurrency)
+
+    async def upload(index: int) -> Optional[str]:
+        async with semaphore:
+            return await upload_document(client, timer, offset + index, args)
+
+    started = time.perf_counter()
+    job_ids = [job_id for job_id in await asyncio.gather(*(upload(i) for i in range(args.documents))) if job_id]
+    jobs = await wait_for_jobs(client, job_ids)
+    seconds = time.perf_counter() - started
+
+    completed = [job for job in jobs if job["status"] == "completed"]
+    chunks = sum(job["progress"]["chunks"] for job in completed)
+    job_seconds = [job["finished_at"] - job["created_at"] for job in completed]
+    return {
+        "documents": args.documents,
+        "completed": len(completed),
+        "failed": len(jobs) - len(completed),
+        "chunks": chunks,
+        "seconds": round(seconds, 3),
+        "documents_per_second": round(len(completed) / seconds, 2) if seconds > 0 else 0.0,
+        "chunks_per_second": round(chunks / seconds, 2) if seconds > 0 else 0.0,
+        "upload_request": timer.summary(seconds),
+        "job_completion": summarize(job_seconds, 0, seconds),
+    }
+
+
+async def run_queries(client: httpx.AsyncClient, timer: Timer, indices, concurrency: int, args) -> None:
+    """질문 번호 목록을 concurrency개씩 동시에 질의"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def query(index: int) -> None:
+        async with semaphore:
+            payload = {"question": make_question(index, args.seed)}
+            if args.top_k:
+                payload["top_k"] = args.top_k
+            await timer.call(client.post("/api/rag/query", json=payload))
+
+    await asyncio.gather(*(query(index) for index in indices))
+
+
+async def scenario_query(client: httpx.AsyncClient, args) -> Dict[str, Any]:
+    """동시성 단계별 질의 지연 시간과 처리량 측정"""
+    levels = {}
+    next_index = 0
+    for concurrency in args.concurrency:
+        # 워밍업 (측정에서 제외)
+        await run_queries(client, Timer(), range(next_index, next_index + concurrency), concurrency, args)
+        next_index += concurrency
+
+        timer = Timer()
+        started = time.perf_counter()
+        await run_queries(client, timer, range(next_index, next_index + args.requests), concurrency, args)
+        levels[str(concurrency)] = timer.summary(time.perf_counter() - started)
+        next_index += args.requests
+        print(f"[query c={concurrency}] {levels[str(concurrency)]['throughput_rps']} rps, "
+              f"p50 {levels[str(concurrency)]['p50_ms']}ms, p95 {levels[str(concurrency)]['p95_ms']}ms, "
+              f"p99 {levels[str(concurrency)]['p99_ms']}ms", flush=True)
+    return {"concurrency": levels}
+
+
+async def scenario_mixed(client: httpx.AsyncClient, args) -> Dict[str, Any]:
+    """질의와 업로드를 --duration초 동안 동시에 실행"""
+    query_timer = Timer()
+    upload_timer = Timer()
+    deadline = time.perf_counter() + args.duration
+    counter = {"query": 10 ** 6, "upload": 10 ** 6}
+    job_seconds: List[float] = []
+
+    async def reader() -> None:
+        while time.perf_counter() < deadline:
+            counter["query"] += 1
+            payload = {"question": make_question(counter["query"], args.seed)}
+            await query_timer.call(client.post("/api/rag/query", json=payload))
+
+    async def writer() -> None:
+        while time.perf_counter() < deadline:
+            counter["upload"] += 1
+            job_id = await upload_document(client, upload_timer, counter["upload"], args)
+            if job_id:
+                job = (await wait_for_jobs(client, [job_id]))[0]
+                if job["status"] == "completed":
+                    job_seconds.append(job["finished_at"] - job["created_at"])
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(reader() for _ in range(args.mixed_readers)),
+        *(writer() for _ in range(args.mixed_writers))
+    )
+    seconds = time.perf_counter() - started
+    return {
+        "readers": args.mixed_readers,
+        "writers": args.mixed_writers,
+        "query": query_timer.summary(seconds),
+        "upload_request": upload_timer.summary(seconds),
+        "job_completion": summarize(job_seconds, 0, seconds),
+    }
+
+
+def trace_entry(record: Dict[str, Any], index: int, seed: int) -> Optional[Dict[str, Any]]:
+    """
+    추적 레코드를 재생할 요청으로 변환
+
+    Returns:
+        Optional[Dict]: 요청 (HTTP 요청이 아니거나 multipart 업로드면 None)
+    """
+    match = TRACE_NAME.match(str(record.get("name", "")))
+    if match is None or not isinstance(record.get("timestamp"), (int, float)):
+        return None
+    method, path = match.groups()
+    if path == "/api/rag/upload" or (method == "PUT" and path.startswith("/api/rag/documents/")):
+        return None
+    body = REPLAY_BODIES.get(path) if method == "POST" else None
+    return {
+        "method": method,
+        "path": path,
+        "json": body(index, seed) if body else None,
+        "offset": record["timestamp"],
+    }
+
+
+def load_request_log(path: str, seed: int = 0) -> tuple:
+    """
+    요청 로그 읽기 (요청 로그 또는 추적 로그)
+
+    Args:
+        path: JSONL 파일 경로
+        seed: 추적 레코드에 넣을 합성 질문 시드
+
+    Returns:
+        tuple: (요청 리스트, 건너뛴 줄 수)
+
+    Raises:
+        ValueError: 재생할 수 있는 줄이 하나도 없는 경우
+    """
+    entries, skipped = [], 0
+    traced = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+            if not isinstance(record, dict):
+                skipped += 1
+            elif "path" in record:
+                entries.append({
+                    "method": record.get("method", "GET").upper(),
+                    "path": record["path"],
+                    "json": record.get("json"),
+                    "offset": record.get("offset"),
+                })
+            elif isinstance(record.get("question"), str):
+                entries.append({
+                    "method": "POST",
+                    "path": "/api/rag/query",
+                    "json": {"question": record["question"]},
+                    "offset": record.get("offset"),
+                })
+            elif "trace_id" in record:
+                entry = trace_entry(record, len(traced), seed)
+                if entry is None:
+                    skipped += 1
+                else:
+                    traced.append(entry)
+            else:
+                skipped += 1
+
+    # 추적은 끝난 순서로 기록되므로 시작 시각 순으로 정렬하고 첫 요청 기준 간격으로 바꿈
+    if traced:
+        traced.sort(key=lambda entry: entry["offset"])
+        first = traced[0]["offset"]
+        for entry in traced:
+            entry["offset"] -= first
+        entries.extend(traced)
+    if not entries:
+        raise ValueError(f"재생할 수 있는 요청이 없습니다: {path} (건너뛴 줄 {skipped}개)")
+    return entries, skipped
+
+
+async def scenario_replay(client: httpx.AsyncClient, args) -> Dict[str, Any]:
+    """요청 로그 재생 (경로별 지연 시간)"""
+    entries, skipped = load_request_log(args.log, args.seed)
+    timers: Dict[str, Timer] = {}
+    timed = args.replay_speed > 0 and entries and all(entry["offset"] is not None for entry in entries)
+    semaphore = asyncio.Semaphore(args.replay_concurrency)
+    started = time.perf_counter()
+
+    async def send(entry: Dict[str, Any]) -> None:
+        if timed:
+            delay = entry["offset"] / args.replay_speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        timer = timers.setdefault(f"{entry['method']} {entry['path']}", Timer())
+        request = client.request(entry["method"], entry["path"], json=entry["json"])
+        if timed:
+            await timer.call(request)
+        else:
+            async with semaphore:
+                await timer.call(request)
+
+    await asyncio.gather(*(send(entry) for entry in entries))
+    seconds = time.perf_counter() - started
+    return {
+        "log": args.log,
+        "entries": len(entries),
+        "skipped_lines": skipped,
+        "mode": f"timed x{args.replay_speed}" if timed else f"max concurrency {args.replay_concurrency}",
+        "seconds": round(seconds, 3),
+        "paths": {path: timer.summary(seconds) for path, timer in sorted(timers.items())},
+    }
+
+
+def free_port() -> int:
+    """사용 가능한 로컬 포트"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    """서버가 응답할 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"프로세스가 종료되었습니다 (exit {process.returncode}): {url}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"서버가 {timeout}초 안에 준비되지 않았습니다: {url}")
+
+
+class LocalStack:
+    """가짜 Ollama와 API 서버를 임시 디렉토리로 띄우는 컨텍스트 매니저"""
+
+    def __init__(self, args):
+        self.args = args
+        self.workdir = tempfile.mkdtemp(prefix="bench-load-", dir=args.workdir)
+        self.processes: List[subprocess.Popen] = []
+        self.ollama_url = ""
+        self.api_url = ""
+
+    def _spawn(self, command: List[str], env: Dict[str, str], log_name: str) -> subprocess.Popen:
+        log = open(os.path.join(self.workdir, log_name), "w")
+        process = subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        self.processes.append(process)
+        return process
+
+    def __enter__(self) -> "LocalStack":
+        args = self.args
+        env = dict(os.environ)
+        ollama_port = free_port()
+        self.ollama_url = f"http://127.0.0.1:{ollama_port}"
+        command = [sys.executable, "-m", "benchmarks.fake_ollama", "--port", str(ollama_port)]
+        for name, value in server_options(args).items():
+            command += [f"--{name.replace('_', '-')}", str(value)]
+        process = self._spawn(command, env, "fake_ollama.log")
+        wait_until_ready(f"{self.ollama_url}/api/tags", process)
+
+        api_port = free_port()
+        self.api_url = f"http://127.0.0.1:{api_port}"
+        env.update({
+            "OLLAMA_BASE_URL": self.ollama_url,
+            "VECTOR_STORE_PATH": os.path.join(self.workdir, "chroma_db"),
+            "UPLOAD_DIR": os.path.join(self.workdir, "data"),
+            "EMBEDDING_CACHE_PATH": os.path.join(self.workdir, "embedding_cache.sqlite3"),
+            "TRACE_LOG_PATH": os.path.join(self.workdir, "traces.jsonl"),
+            "DEBUG": "false",
+        })
+        for item in args.env:
+            key, _, value = item.partition("=")
+            env[key] = value
+        command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                   "--port", str(api_port), "--log-level", "warning", "--workers", str(args.workers)]
+        process = self._spawn(command, env, "api.log")
+        wait_until_ready(f"{self.api_url}/health", process)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if self.args.keep_workdir:
+            print(f"작업 디렉토리 유지: {self.workdir}")
+        else:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def git_commit() -> Optional[str]:
+    """현재 커밋 해시 (릴리스 간 결과 비교용)"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_scenarios(api_url: str, args) -> Dict[str, Any]:
+    """선택한 시나리오를 차례로 실행"""
+    results: Dict[str, Any] = {}
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=api_url, timeout=args.timeout, limits=limits) as client:
+        if "upload" in args.scenarios:
+            results["upload"] = await scenario_upload(client, args)
+            print(f"[upload] {results['upload']['documents_per_second']} docs/s, "
+                  f"{results['upload']['chunks_per_second']} chunks/s", flush=True)
+        elif {"query", "mixed", "replay"} & set(args.scenarios):
+            # 질의할 문서가 있도록 시드 문서 업로드 (결과에는 포함하지 않음)
+            documents = (await client.get("/api/rag/documents")).json().get("total_chunks", 0)
+            if not documents:
+                await scenario_upload(client, args, offset=10 ** 5)
+
+        if "query" in args.scenarios:
+            results["query"] = await scenario_query(client, args)
+        if "mixed" in args.scenarios:
+            results["mixed"] = await scenario_mixed(client, args)
+            print(f"[mixed] query p95 {results['mixed']['query']['p95_ms']}ms, "
+                  f"job p95 {results['mixed']['job_completion']['p95_ms']}ms", flush=True)
+        if "replay" in args.scenarios:
+            results["replay"] = await scenario_replay(client, args)
+            print(f"[replay] {results['replay']['entries']}개 요청, {results['replay']['seconds']}s", flush=True)
+
+        results["health"] = (await client.get("/health")).json()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RAG API 부하 벤치마크 (가짜 Ollama 사용)")
+    parser.add_argument("--scenarios", nargs="+", default=["upload", "query", "mixed"],
+                        choices=["upload", "query", "mixed", "replay"])
+    parser.add_argument("--url", default=None, help="실행 중인 API 서버 주소 (없으면 로컬 스택 실행)")
+    parser.add_argument("--documents", type=int, default=20, help="업로드할 합성 문서 수")
+    parser.add_argument("--doc-chars", type=int, default=5000, help="합성 문서 길이(문자 수)")
+    parser.add_argument("--upload-concurrency", type=int, default=4, help="동시 업로드 수")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="질의 동시성 단계")
+    parser.add_argument("--requests", type=int, default=50, help="동시성 단계별 질의 수")
+    parser.add_argument("--top-k", type=int, default=None, help="질의 top_k (없으면 서버 설정)")
+    parser.add_argument("--duration", type=float, default=15.0, help="mixed 시나리오 시간(초)")
+    parser.add_argument("--mixed-readers", type=int, default=8, help="mixed 시나리오 동시 질의 수")
+    parser.add_argument("--mixed-writers", type=int, default=1, help="mixed 시나리오 동시 업로드 수")
+    parser.add_argument("--log", default=settings.TRACE_LOG_PATH,
+                        help="replay 시나리오 요청 로그 (기본값: 서버 추적 로그 TRACE_LOG_PATH)")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="offset 재현 배속 (0이면 최대 속도)")
+    parser.add_argument("--replay-concurrency", type=int, default=8, help="offset 없이 재생할 때 동시성")
+    parser.add_argument("--timeout", type=float, default=120.0, help="요청 타임아웃(초)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn 워커 수 (로컬 스택)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="API 서버 설정 덮어쓰기 (예: --env VECTOR_STORE_BACKEND=numpy)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="임시 디렉토리를 만들 위치")
+    parser.add_argument("--keep-workdir", action="store_true", help="끝난 뒤 임시 디렉토리(로그 포함) 유지")
+    parser.add_argument("--output", default=None, help="결과를 저장할 JSON 파일")
+    add_arguments(parser)
+    args = parser.parse_args()
+    if "replay" in args.scenarios:
+        # 스택을 띄우기 전에 재생할 로그부터 확인
+        try:
+            load_request_log(args.log, args.seed)
+        except (OSError, ValueError) as e:
+            parser.error(f"--log: {e}")
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+            "fake_ollama": None if args.url else server_options(args),
+        }
+    }
+    if args.url:
+        report["results"] = asyncio.run(run_scenarios(args.url, args))
+    else:
+        with LocalStack(args) as stack:
+            report["results"] = asyncio.run(run_scenarios(stack.api_url, args))
+            report["fake_ollama_calls"] = httpx.get(f"{stack.ollama_url}/bench/stats").json()
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"결과 저장: {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+양자화 인덱스 벤치마크 - 1차 검색 양자화 방식별 recall 대비 메모리 리포트
+
+실행 예:
+    python -m benchmarks.quantization --size 100000
+    python -m benchmarks.quantization --size 1000000 --rescore-factors 1 4 --output quant.json
+
+NumPy 백엔드에 같은 합성 임베딩을 none/float16/int8 방식으로 넣고,
+float32 전수 검색 결과를 정답으로 하여 재채점 후보 배수별 recall@k,
+쿼리 지연(p50/p95), 1차 검색 인덱스 메모리(청크당 바이트, GB당 청크 수)를 측정합니다.
+rescore factor 1은 재채점 후보를 늘리지 않은 경우(1차 검색 순위 그대로)입니다.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List
+from benchmarks.vector_store import generate_batches, make_queries, percentile_ms, recall
+from rag.numpy_store import NumpyCollection, QUANTIZATION_MODES
+
+
+def build_collection(path: str, mode: str, args) -> NumpyCollection:
+    """양자화 방식별 컬렉션 생성 및 합성 임베딩 수집"""
+    collection = NumpyCollection(os.path.join(path, mode), quantization=mode)
+    for ids, vectors in generate_batches(args.size, args.dim, args.batch_size, args.seed):
+        collection.upsert(ids=ids, embeddings=vectors)
+    return collection
+
+
+def measure(collection: NumpyCollection, queries, k: int) -> Dict[str, Any]:
+    """쿼리 지연과 상위 ID 측정"""
+    latencies = []
+    top_ids = []
+    for query in queries:
+        started = time.perf_counter()
+        result = collection.query(query_embeddings=[query], n_results=k, include=[])
+        latencies.append(time.perf_counter() - started)
+        top_ids.append(result["ids"][0])
+    return {
+        "query_p50_ms": percentile_ms(latencies, 50),
+        "query_p95_ms": percentile_ms(latencies, 95),
+        "top_ids": top_ids,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="양자화 인덱스 recall/메모리 리포트")
+    parser.add_argument("--size", type=int, default=100000, help="컬렉션 크기(청크 수)")
+    parser.add_argument("--modes", nargs="+", default=list(QUANTIZATION_MODES), choices=QUANTIZATION_MODES)
+    parser.add_argument("--rescore-factors", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--dim", type=int, default=768, help="임베딩 차원")
+    parser.add_argument("--k", type=int, default=4, help="쿼리당 검색 개수")
+    parser.add_argument("--queries", type=int, default=200, help="측정할 쿼리 수")
+    parser.add_argument("--batch-size", type=int, default=5000, help="upsert 배치 크기")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="임시 컬렉션을 만들 디렉토리")
+    parser.add_argument("--output", default=None, help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    queries = make_queries(args.dim, min(args.batch_size, args.size), args.queries, args.seed)
+    path = tempfile.mkdtemp(prefix="bench-quant-", dir=args.workdir)
+    results: List[Dict[str, Any]] = []
+    try:
+        # float32 전수 검색 결과를 정답으로 사용
+        baseline = build_collection(path, "none", args)
+        exact = measure(baseline, queries, args.k)["top_ids"]
+
+        for mode in args.modes:
+            collection = baseline if mode == "none" else build_collection(path, mode, args)
+            stats = collection.stats()
+            factors = [1] if mode == "none" else args.rescore_factors
+            for factor in factors:
+                collection.rescore_factor = factor
+                measured = measure(collection, queries, args.k)
+                result = {
+                    "quantization": mode,
+                    "rescore_factor": factor,
+                    "size": args.size,
+                    "dim": args.dim,
+                    "recall_at_k": recall(measured["top_ids"], exact),
+                    "query_p50_ms": measured["query_p50_ms"],
+                    "query_p95_ms": measured["query_p95_ms"],
+                    "index_bytes": stats["index_bytes"],
+                    "index_bytes_per_chunk": round(stats["index_bytes"] / args.size, 1),
+                    "chunks_per_gb": int(1024 ** 3 * args.size / stats["index_bytes"]),
+                    "memory_ratio_vs_float32": round(stats["index_bytes"] / stats["full_precision_bytes"], 3),
+                }
+                results.append(result)
+                print(f"[{mode:7} x{factor}] recall@{args.k} {result['recall_at_k']:.4f}, "
+                      f"p50 {result['query_p50_ms']}ms, 인덱스 {result['index_bytes'] / 1024 ** 2:.1f}MB "
+                      f"({result['memory_ratio_vs_float32']:.0%} of float32)", flush=True)
+            if mode != "none":
+                shutil.rmtree(os.path.join(path, mode), ignore_errors=True)
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+    report = json.dumps(results, ensure_ascii=False, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+벡터 스토어 백엔드 벤치마크 - ChromaDB와 NumPy 메모리 맵 백엔드 비교
+
+실행 예:
+    python -m benchmarks.vector_store --sizes 100000 1000000
+    python -m benchmarks.vector_store --sizes 20000 --backends numpy --output result.json
+
+합성 임베딩(기본 768차원, nomic-embed-text와 같은 크기)을 컬렉션에 넣고
+수집 시간, 다시 여는 시간(cold open), 쿼리 지연(p50/p95), 디스크 사용량,
+정확한 전수 검색 대비 recall@k를 측정합니다.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List
+import numpy as np
+from rag.numpy_store import NumpyCollection
+
+
+def generate_batches(size: int, dim: int, batch_size: int, seed: int):
+    """
+    고정 시드로 합성 임베딩 배치 생성 (단위 벡터)
+
+    실제 임베딩처럼 정규화하여 ChromaDB 기본 L2 거리와 코사인 거리의
+    순위가 같아지도록 합니다.
+
+    Yields:
+        Tuple[List[str], np.ndarray]: (청크 ID, 임베딩) 배치
+    """
+    rng = np.random.default_rng(seed)
+    for start in range(0, size, batch_size):
+        count = min(batch_size, size - start)
+        ids = [f"chunk-{start + i}" for i in range(count)]
+        vectors = rng.standard_normal((count, dim), dtype=np.float32)
+        yield ids, vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(dim: int, batch_size: int, count: int, seed: int) -> np.ndarray:
+    """첫 배치의 벡터에 잡음을 더해 실제 질문처럼 가까운 이웃이 있는 쿼리 생성"""
+    _, first = next(generate_batches(batch_size, dim, batch_size, seed))
+    rng = np.random.default_rng(seed + 1)
+    picked = first[rng.integers(0, len(first), count)]
+    queries = picked + 0.03 * rng.standard_normal(picked.shape, dtype=np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def directory_size(path: str) -> int:
+    """디렉토리 전체 바이트 수"""
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+
+
+def percentile_ms(samples: List[float], q: float) -> float:
+    """초 단위 샘플의 백분위수를 밀리초로 반환"""
+    return round(float(np.percentile(samples, q)) * 1000, 3)
+
+
+def open_collection(backend: str, path: str, create: bool = False):
+    """백엔드별 컬렉션 열기 (ChromaDB는 앱과 같은 기본 설정 사용)"""
+    if backend == "numpy":
+        return NumpyCollection(os.path.join(path, "numpy", "bench"))
+    import chromadb
+    from chromadb.api.shared_system_client import SharedSystemClient
+    # 같은 프로세스에서 캐시된 클라이언트를 재사용하지 않도록 비움 (cold open 측정)
+    SharedSystemClient.clear_system_cache()
+    client = chromadb.PersistentClient(path=path)
+    if create:
+        return client.get_or_create_collection("bench")
+    return client.get_collection("bench")
+
+
+def run_backend(backend: str, size: int, args, queries: np.ndarray) -> Dict[str, Any]:
+    """
+    백엔드 하나를 주어진 크기로 측정
+
+    Returns:
+        Dict: 측정 결과 (쿼리별 상위 ID 포함)
+    """
+    path = tempfile.mkdtemp(prefix=f"bench-{backend}-", dir=args.workdir)
+    try:
+        collection = open_collection(backend, path, create=True)
+        batch_size = args.batch_size
+        if backend == "chroma":
+            batch_size = min(batch_size, collection._client.get_max_batch_size())
+
+        started = time.perf_counter()
+        for ids, vectors in generate_batches(size, args.dim, batch_size, args.seed):
+            collection.upsert(ids=ids, embeddings=vectors, documents=[""] * len(ids))
+        ingest_seconds = time.perf_counter() - started
+        del collection
+
+        # 새 워커가 뜰 때처럼 다시 열고 첫 쿼리까지의 시간
+        started = time.perf_counter()
+        collection = open_collection(backend, path)
+        collection.query(query_embeddings=[queries[0]], n_results=args.k, include=[])
+        open_seconds = time.perf_counter() - started
+
+        latencies = []
+        top_ids = []
+        for query in queries:
+            started = time.perf_counter()
+            result = collection.query(query_embeddings=[query], n_results=args.k, include=["distances"])
+            latencies.append(time.perf_counter() - started)
+            top_ids.append(result["ids"][0])
+
+        return {
+            "backend": backend,
+            "size": size,
+            "dim": args.dim,
+            "ingest_seconds": round(ingest_seconds, 3),
+            "ingest_vectors_per_second": round(size / ingest_seconds, 1),
+            "open_seconds": round(open_seconds, 4),
+            "query_p50_ms": percentile_ms(latencies, 50),
+            "query_p95_ms": percentile_ms(latencies, 95),
+            "disk_bytes": directory_size(path),
+            "top_ids": top_ids,
+        }
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def recall(found: List[List[str]], exact: List[List[str]]) -> float:
+    """정확한 결과 대비 recall@k"""
+    hits = sum(len(set(a) & set(b)) for a, b in zip(found, exact))
+    total = sum(len(b) for b in exact)
+    return round(hits / total, 4) if total else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ChromaDB / NumPy 벡터 스토어 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000], help="컬렉션 크기(청크 수)")
+    parser.add_argument("--backends", nargs="+", default=["chroma", "numpy"], choices=["chroma", "numpy"])
+    parser.add_argument("--dim", type=int, default=768, help="임베딩 차원")
+    parser.add_argument("--k", type=int, default=4, help="쿼리당 검색 개수")
+    parser.add_argument("--queries", type=int, default=200, help="측정할 쿼리 수")
+    parser.add_argument("--batch-size", type=int, default=5000, help="upsert 배치 크기")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="임시 컬렉션을 만들 디렉토리")
+    parser.add_argument("--output", default=None, help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        queries = make_queries(args.dim, min(args.batch_size, size), args.queries, args.seed)
+        by_backend = {}
+        for backend in args.backends:
+            result = run_backend(backend, size, args, queries)
+            by_backend[backend] = result
+            print(f"[{backend} {size:,}] 수집 {result['ingest_seconds']}s, 열기 {result['open_seconds']}s, "
+                  f"p50 {result['query_p50_ms']}ms, p95 {result['query_p95_ms']}ms, "
+                  f"디스크 {result['disk_bytes'] / 1024 ** 2:.1f}MB", flush=True)
+
+        # NumPy 백엔드는 전수 검색이므로 정답으로 사용
+        exact = by_backend.get("numpy", {}).get("top_ids")
+        for result in by_backend.values():
+            top_ids = result.pop("top_ids")
+            if exact is not None:
+                result["recall_at_k"] = recall(top_ids, exact)
+            results.append(result)
+
+    report = json.dumps(results, ensure_ascii=False, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+
+if __name__ == "__main__":
+    main()
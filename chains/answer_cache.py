@@ -0,0 +1,178 @@
+"""
+시맨틱 답변 캐시 - 질문 임베딩 유사도 기반 RAG 답변 캐싱
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import numpy as np
+from config import settings
+
+
+class SemanticAnswerCache:
+    """질문 임베딩의 코사인 유사도로 이전 답변을 재사용하는 캐시"""
+
+    def __init__(self, max_items: int = None, ttl: float = None,
+                 threshold: float = None):
+        """
+        초기화
+
+        Args:
+            max_items: 보관할 최대 답변 수 (LRU 방식으로 제거)
+            ttl: 답변 유효 시간(초)
+            threshold: 캐시 적중으로 판단할 최소 코사인 유사도
+        """
+        self.max_items = max_items or settings.ANSWER_CACHE_MAX_ITEMS
+        self.ttl = ttl or settings.ANSWER_CACHE_TTL
+        self.threshold = threshold or settings.ANSWER_CACHE_SIMILARITY_THRESHOLD
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_id = 0
+        self._version = None
+
+        # 유사도 계산용 행렬 (항목이 바뀔 때만 다시 만듦)
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: List[int] = []
+
+        # 캐시 통계
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_stores = 0
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        """단위 벡터로 정규화"""
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm > 0 else array
+
+    def _check_version(self, version: int) -> bool:
+        """
+        컬렉션 버전 확인 (락을 잡은 상태에서 호출)
+
+        더 새 버전이면 캐시 전체를 무효화하고 그 버전을 따릅니다.
+        더 옛 버전(버전을 읽은 뒤 늦게 도착한 요청)이면 캐시를 되돌리지 않고 False를 반환합니다.
+
+        Returns:
+            bool: 캐시를 사용할 수 있는 버전이면 True
+        """
+        if self._version is not None and version < self._version:
+            return False
+        if self._version != version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._matrix = None
+            self._version = version
+        return True
+
+    def _expire(self) -> None:
+        """TTL이 지난 항목 제거 (락을 잡은 상태에서 호출)"""
+        now = time.time()
+        expired = [key for key, entry in self._entries.items()
+                   if now - entry["created_at"] > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def lookup(self, vector: List[float], version: int, params: Any = None) -> Optional[Dict[str, Any]]:
+        """
+        유사한 질문의 답변 조회
+
+        Args:
+            vector: 질문 임베딩
+            version: 현재 벡터 스토어 버전
+            params: 검색 설정 (같은 설정으로 만든 답변만 재사용)
+
+        Returns:
+            Optional[Dict]: 캐시된 응답 (없으면 None)
+        """
+        query = self._normalize(vector)
+        with self._lock:
+            if not self._check_version(version):
+                self.misses += 1
+                return None
+            self._expire()
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            if self._matrix is None:
+                self._matrix_ids = list(self._entries.keys())
+                self._matrix = np.stack([self._entries[key]["vector"] for key in self._matrix_ids])
+
+            # 모든 캐시 항목과의 코사인 유사도를 한 번에 계산
+            scores = self._matrix @ query
+            for index in np.argsort(-scores):
+                if scores[index] < self.threshold:
+                    break
+                key = self._matrix_ids[index]
+                entry = self._entries[key]
+                if entry["params"] == params:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return {**entry["response"], "similarity": float(scores[index])}
+
+            self.misses += 1
+            return None
+
+    def store(self, vector: List[float], version: int, response: Dict[str, Any], params: Any = None) -> None:
+        """
+        답변 저장
+
+        답변을 만드는 동안 컬렉션이 바뀌어 캐시가 이미 더 새 버전이면 저장하지 않습니다.
+        늦게 끝난 요청이 옛 버전으로 캐시를 되돌려 새 답변을 지우지 않도록 하기 위함입니다.
+
+        Args:
+            vector: 질문 임베딩
+            version: 답변을 만들 때의 벡터 스토어 버전
+            response: 저장할 응답
+            params: 답변을 만들 때의 검색 설정
+        """
+        with self._lock:
+            if not self._check_version(version):
+                self.stale_stores += 1
+                return
+            self._entries[self._next_id] = {
+                "vector": self._normalize(vector),
+                "params": params,
+                "response": response,
+                "created_at": time.time(),
+            }
+            self._next_id += 1
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self) -> None:
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        캐시 통계 반환
+
+        Returns:
+            dict: 히트/미스 카운터, 적중률, 항목 수
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "invalidations": self.invalidations,
+                "stale_stores": self.stale_stores,
+                "items": len(self._entries),
+                "max_items": self.max_items,
+                "ttl": self.ttl,
+                "threshold": self.threshold,
+            }
+
+
+# 전역 인스턴스
+answer_cache = SemanticAnswerCache()
@@ -1,11 +1,23 @@
 """
 질의응답 체인 - RAG를 활용한 QA 시스템
 """
-from typing import Dict, Any
-from langchain_classic.chains import RetrievalQA
+import asyncio
+import functools
+import time
+from typing import Dict, Any, AsyncIterator, List
 from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import Runnable, RunnableLambda
 from models.llm_setup import get_llm
-from rag.retriever import document_retriever
+from models.embedding_cache import embed_query_batch
+from rag.retriever import document_retriever, retrieval_timings
+from rag.context_builder import context_builder
+from rag.context_compressor import context_compressor
+from rag.vector_store import vector_store_manager
+from chains.answer_cache import answer_cache
+from utils.concurrency import run_blocking
+from utils.metrics import stage_seconds
+from utils.tracing import record_span, span
+from config import settings
 
 
 # RAG 프롬프트 템플릿
@@ -26,66 +38,387 @@ class QAChainManager:
     def __init__(self):
         """초기화"""
         self.llm = None
-        self.retriever = None
         self.prompt = PromptTemplate(
             template=RAG_PROMPT_TEMPLATE,
             input_variables=["context", "question"]
         )
+        self._pipeline = None
+        self._context_pipeline = None
     
     def _ensure_initialized(self):
-        """필요 시 LLM과 retriever 초기화"""
+        """필요 시 LLM 초기화"""
         if self.llm is None:
             self.llm = get_llm()
-        if self.retriever is None:
-            self.retriever = document_retriever.get_retriever()
     
-    def create_qa_chain(self) -> RetrievalQA:
+    def get_pipeline(self) -> Runnable:
         """
-        RAG 기반 QA 체인 생성
+        미리 구성된 RAG 파이프라인 반환 (최초 호출 시 한 번만 구성)
+        
+        검색 → 컨텍스트 구성 → 생성 단계를 잇는 Runnable로, 요청마다
+        체인이나 retriever 객체를 만들지 않습니다. 입력은 _pipeline_input()으로
+        만든 상태 딕셔너리이며, k와 검색 모드 등은 호출마다 입력으로 받습니다.
+        각 단계는 상태의 timings에 소요 시간을 기록합니다.
         
         Returns:
-            RetrievalQA: 질의응답 체인
-        """
-        self._ensure_initialized()
-        qa_chain = RetrievalQA.from_chain_type(
-            llm=self.llm,
-            chain_type="stuff",
-            retriever=self.retriever,
-            return_source_documents=True,
-            chain_type_kwargs={
-                "prompt": self.prompt,
-                "verbose": False
-            }
-        )
-        return qa_chain
+            Runnable: 상태 딕셔너리를 받아 answer가 채워진 상태를 반환하는 파이프라인
+        """
+        if self._pipeline is None:
+            self._ensure_initialized()
+            retrieve = RunnableLambda(self._retrieve_step, afunc=self._aretrieve_step, name="retrieve")
+            build_prompt = RunnableLambda(self._prompt_step, afunc=self._aprompt_step, name="build_prompt")
+            generate = RunnableLambda(self._generate_step, afunc=self._agenerate_step, name="generate")
+            self._context_pipeline = retrieve | build_prompt
+            self._pipeline = self._context_pipeline | generate
+        return self._pipeline
+    
+    def get_context_pipeline(self) -> Runnable:
+        """
+        생성 단계를 뺀 파이프라인 반환 (토큰 스트리밍용)
+        
+        Returns:
+            Runnable: 상태 딕셔너리를 받아 docs와 prompt가 채워진 상태를 반환하는 파이프라인
+        """
+        self.get_pipeline()
+        return self._context_pipeline
     
-    def query(self, question: str) -> Dict[str, Any]:
+    @staticmethod
+    def _pipeline_input(question: str, k: int = None, search_mode: str = None, **extra) -> Dict[str, Any]:
+        """
+        파이프라인 입력 상태 생성
+        
+        Args:
+            question: 질문
+            k: 검색할 문서 개수 (None이면 TOP_K)
+            search_mode: 검색 모드 (None이면 SEARCH_MODE)
+            **extra: 미리 계산한 query_vector, vector_results 등
+            
+        Returns:
+            Dict: 파이프라인 상태
+        """
+        return {
+            "question": question,
+            "k": k or settings.TOP_K,
+            "search_mode": search_mode or settings.SEARCH_MODE,
+            "timings": {},
+            "context": {},
+            **extra
+        }
+    
+    def _retrieve_step(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """검색 단계 (단계별 소요 시간은 retriever가 timings에 기록)"""
+        token = retrieval_timings.set(state["timings"])
+        try:
+            with span("retrieve", k=state["k"], mode=state["search_mode"]) as current:
+                docs = document_retriever.retrieve_documents(
+                    state["question"],
+                    k=state["k"],
+                    mode=state["search_mode"],
+                    query_vector=state.get("query_vector"),
+                    vector_results=state.get("vector_results")
+                )
+                current.set(documents=len(docs))
+        finally:
+            retrieval_timings.reset(token)
+        return {**state, "docs": docs}
+    
+    async def _aretrieve_step(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """검색 단계 (비동기, 스레드 풀에서 실행)"""
+        return await run_blocking(self._retrieve_step, state)
+    
+    def _prompt_step(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """컨텍스트 구성 및 프롬프트 생성 단계"""
+        with span("build_prompt") as current:
+            prompt_text = self._build_prompt(state["question"], state["docs"], state["timings"], state["context"])
+            current.set(context_tokens=state["context"].get("tokens"))
+        return {**state, "prompt": prompt_text}
+    
+    async def _aprompt_step(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """컨텍스트 구성 단계 (비동기, 압축 시 임베딩 호출이 있어 스레드 풀에서 실행)"""
+        return await run_blocking(self._prompt_step, state)
+    
+    def _generate_step(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """답변 생성 단계"""
+        started = time.perf_counter()
+        with span("generate") as current:
+            answer = self.llm.invoke(state["prompt"])
+            current.set(answer_chars=len(answer))
+        elapsed = time.perf_counter() - started
+        stage_seconds.observe(elapsed, stage="generation")
+        state["timings"]["generation"] = round(elapsed, 4)
+        return {**state, "answer": answer}
+    
+    async def _agenerate_step(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """답변 생성 단계 (네이티브 비동기)"""
+        started = time.perf_counter()
+        with span("generate") as current:
+            answer = await self.llm.ainvoke(state["prompt"])
+            current.set(answer_chars=len(answer))
+        elapsed = time.perf_counter() - started
+        stage_seconds.observe(elapsed, stage="generation")
+        state["timings"]["generation"] = round(elapsed, 4)
+        return {**state, "answer": answer}
+    
+    def query(self, question: str, search_mode: str = None, k: int = None) -> Dict[str, Any]:
         """
         질문에 대한 답변 생성
         
         Args:
             question: 질문
+            search_mode: 검색 모드 ("vector", "keyword", "hybrid")
+            k: 검색할 문서 개수
             
         Returns:
             Dict: 답변 및 소스 문서
         """
-        qa_chain = self.create_qa_chain()
-        result = qa_chain.invoke({"query": question})
+        state = self.get_pipeline().invoke(self._pipeline_input(question, k, search_mode))
+        response = self._format_response(question, state["answer"], state["docs"])
+        return {**response, "timings": state["timings"], "context": state["context"]}
+    
+    async def aquery(self, question: str, search_mode: str = None, k: int = None) -> Dict[str, Any]:
+        """
+        질문에 대한 답변 생성 (비동기)
+        
+        LLM 호출은 네이티브 비동기로, 검색은 스레드 풀에서 실행되어
+        이벤트 루프를 막지 않습니다. 질문 임베딩이 같은 검색 설정(검색 모드, k)의
+        이전 질문과 충분히 유사하면 검색과 생성 없이 캐시된 답변을 반환합니다.
+        
+        Args:
+            question: 질문
+            search_mode: 검색 모드 ("vector", "keyword", "hybrid")
+            k: 검색할 문서 개수
+            
+        Returns:
+            Dict: 답변, 소스 문서, 단계별 소요 시간 및 컨텍스트 통계
+        """
+        state = self._pipeline_input(question, k, search_mode)
+        params = (state["search_mode"], state["k"])
+        
+        # 의미가 같은 이전 질문의 답변이 있으면 재사용
+        if settings.ANSWER_CACHE_ENABLED:
+            version = vector_store_manager.version
+            started = time.perf_counter()
+            with span("embed"):
+                question_vector = await vector_store_manager.embeddings.aembed_query(question)
+            stage_seconds.observe(time.perf_counter() - started, stage="query_embedding")
+            with span("answer_cache") as current:
+                cached = answer_cache.lookup(question_vector, version, params=params)
+                current.set(hit=cached is not None)
+            if cached is not None:
+                return {**cached, "question": question, "cached": True}
+            state["query_vector"] = question_vector
+        
+        state = await self.get_pipeline().ainvoke(state)
+        response = self._format_response(question, state["answer"], state["docs"])
+        
+        if settings.ANSWER_CACHE_ENABLED:
+            answer_cache.store(question_vector, version, response, params=params)
+        return {**response, "cached": False, "timings": state["timings"], "context": state["context"]}
+    
+    async def astream_query(self, question: str, search_mode: str = None,
+                            k: int = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        질문에 대한 답변을 토큰 단위로 스트리밍
+        
+        첫 이벤트로 검색된 소스 문서를 보내고, 이후 LLM이 생성하는
+        토큰을 차례로 보냅니다.
+        
+        Args:
+            question: 질문
+            search_mode: 검색 모드 ("vector", "keyword", "hybrid")
+            k: 검색할 문서 개수
+            
+        Yields:
+            Dict: {"event": 이벤트 이름, "data": 데이터}
+        """
+        state = await self.get_context_pipeline().ainvoke(self._pipeline_input(question, k, search_mode))
+        yield {
+            "event": "sources",
+            "data": {
+                "question": question,
+                "source_documents": self._format_documents(state["docs"]),
+                "timings": state["timings"],
+                "context": state["context"]
+            }
+        }
         
-        # 결과 포맷팅
-        response = {
+        # 스트리밍 중에는 컨텍스트를 바꾸지 않도록 생성 시간을 재서 끝난 단계로 기록
+        started = time.perf_counter()
+        tokens = 0
+        try:
+            async for token in self.llm.astream(state["prompt"]):
+                if token:
+                    tokens += 1
+                    yield {"data": {"token": token}}
+        finally:
+            record_span("generate", time.perf_counter() - started, tokens=tokens)
+    
+    async def abatch_query(self, questions: List[str], search_mode: str = None,
+                           k: int = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        여러 질문에 대한 답변을 완료되는 순서대로 생성
+        
+        모든 질문을 한 번의 호출로 임베딩하고, 벡터 검색도 한 번의 컬렉션
+        쿼리(행렬 연산)로 수행한 뒤, 질문별 키워드 검색·재순위화와 답변 생성은
+        RAG_BATCH_MAX_CONCURRENCY개까지 동시에 진행합니다.
+        질문 하나의 실패는 해당 항목의 error로만 보고됩니다.
+        
+        Args:
+            questions: 질문 리스트
+            search_mode: 검색 모드 ("vector", "keyword", "hybrid")
+            k: 질문당 검색할 문서 개수
+            
+        Yields:
+            Dict: {"index": 질문 순번, "question": ..., "answer": ..., ...}
+                  또는 {"index": ..., "question": ..., "error": 오류 메시지}
+        """
+        pipeline = self.get_pipeline()
+        search_mode = search_mode or settings.SEARCH_MODE
+        k = k or settings.TOP_K
+        params = (search_mode, k)
+        version = vector_store_manager.version
+        timings: Dict[str, float] = {}
+        
+        # 질문 전체를 한 번에 임베딩하고 벡터 검색도 한 번에 수행
+        try:
+            started = time.perf_counter()
+            with span("batch_embed", size=len(questions)):
+                vectors = await run_blocking(embed_query_batch, vector_store_manager.embeddings, questions)
+            timings["batch_embedding"] = round(time.perf_counter() - started, 4)
+            stage_seconds.observe(timings["batch_embedding"], stage="batch_embedding")
+            
+            pending = list(range(len(questions)))
+            results: Dict[int, Dict[str, Any]] = {}
+            if settings.ANSWER_CACHE_ENABLED:
+                for index in pending:
+                    cached = answer_cache.lookup(vectors[index], version, params=params)
+                    if cached is not None:
+                        results[index] = {**cached, "question": questions[index], "cached": True}
+                pending = [index for index in pending if index not in results]
+            
+            started = time.perf_counter()
+            with span("batch_vector_search", size=len(pending)):
+                vector_results = await run_blocking(
+                    document_retriever.batch_vector_search,
+                    [vectors[index] for index in pending],
+                    k=k,
+                    mode=search_mode
+                )
+            timings["batch_vector_search"] = round(time.perf_counter() - started, 4)
+            stage_seconds.observe(timings["batch_vector_search"], stage="batch_vector_search")
+        except Exception as e:
+            for index, question in enumerate(questions):
+                yield {"index": index, "question": question, "error": str(e)}
+            return
+        
+        for index, result in results.items():
+            yield {"index": index, **result}
+        
+        semaphore = asyncio.Semaphore(settings.RAG_BATCH_MAX_CONCURRENCY)
+        
+        async def answer(position: int, index: int) -> Dict[str, Any]:
+            question = questions[index]
+            try:
+                async with semaphore:
+                    with span("question", index=index):
+                        state = await pipeline.ainvoke(self._pipeline_input(
+                            question, k, search_mode,
+                            query_vector=vectors[index],
+                            vector_results=None if vector_results is None else vector_results[position]
+                        ))
+            except Exception as e:
+                return {"index": index, "question": question, "error": str(e)}
+            
+            response = self._format_response(question, state["answer"], state["docs"])
+            if settings.ANSWER_CACHE_ENABLED:
+                answer_cache.store(vectors[index], version, response, params=params)
+            return {
+                "index": index,
+                **response,
+                "cached": False,
+                "timings": {**timings, **state["timings"]},
+                "context": state["context"]
+            }
+        
+        tasks = [asyncio.ensure_future(answer(position, index)) for position, index in enumerate(pending)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # 클라이언트가 연결을 끊으면 남은 생성 작업 취소
+            for task in tasks:
+                task.cancel()
+    
+    def _build_prompt(self, question: str, docs, timings: Dict[str, float] = None,
+                      context_stats: Dict[str, Any] = None) -> str:
+        """
+        검색된 문서로 컨텍스트를 구성해 프롬프트 생성
+        
+        CONTEXT_COMPRESSION_ENABLED이면 병합된 청크에서 질문과 관련된
+        문장만 남긴 뒤 토큰 예산에 담습니다.
+        
+        Args:
+            question: 질문
+            docs: 관련성 순 문서 리스트
+            timings: 컨텍스트 구성(및 압축) 시간을 기록할 딕셔너리
+            context_stats: 컨텍스트 통계(토큰 수, 압축률 등)를 기록할 딕셔너리
+            
+        Returns:
+            str: LLM에 보낼 프롬프트
+        """
+        compress = None
+        if settings.CONTEXT_COMPRESSION_ENABLED:
+            compress = functools.partial(context_compressor.compress, question)
+        
+        started = time.perf_counter()
+        context, stats = context_builder.build(docs, compress=compress)
+        elapsed = time.perf_counter() - started
+        compression_seconds = stats.pop("compression_seconds", None)
+        stage_seconds.observe(elapsed, stage="context_build")
+        if compression_seconds is not None:
+            stage_seconds.observe(compression_seconds, stage="compression")
+        if timings is not None:
+            timings["context_build"] = round(elapsed, 4)
+            if compression_seconds is not None:
+                timings["compression"] = compression_seconds
+        if context_stats is not None:
+            context_stats.update(stats)
+        return self.prompt.format(context=context, question=question)
+    
+    def _format_response(self, question: str, answer: str, docs) -> Dict[str, Any]:
+        """
+        답변과 소스 문서를 응답 형식으로 변환
+        
+        Args:
+            question: 질문
+            answer: 생성된 답변
+            docs: 소스 문서 리스트
+            
+        Returns:
+            Dict: 답변 및 소스 문서
+        """
+        return {
             "question": question,
-            "answer": result["result"],
-            "source_documents": [
-                {
-                    "content": doc.page_content,
-                    "metadata": doc.metadata
-                }
-                for doc in result["source_documents"]
-            ]
+            "answer": answer,
+            "source_documents": self._format_documents(docs)
         }
+    
+    def _format_documents(self, documents) -> list:
+        """
+        소스 문서를 응답 형식으로 변환
         
-        return response
+        Args:
+            documents: 문서 리스트
+            
+        Returns:
+            list: 내용과 메타데이터 딕셔너리 리스트
+        """
+        return [
+            {
+                "content": doc.page_content,
+                "metadata": doc.metadata
+            }
+            for doc in documents
+        ]
     
     def simple_query(self, question: str) -> str:
         """
@@ -97,20 +430,9 @@ class QAChainManager:
         Returns:
             str: 답변
         """
-        self._ensure_initialized()
-        # 관련 문서 검색
-        docs = document_retriever.retrieve_documents(question)
-        
-        # 컨텍스트 생성
-        context = document_retriever.format_documents(docs)
-        
-        # 프롬프트 생성 및 LLM 호출
-        prompt_text = self.prompt.format(context=context, question=question)
-        answer = self.llm.invoke(prompt_text)
-        
-        return answer
+        state = self.get_pipeline().invoke(self._pipeline_input(question))
+        return state["answer"]
 
 
 # 전역 인스턴스
 qa_chain_manager = QAChainManager()
-
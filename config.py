@@ -26,6 +26,92 @@ class Settings(BaseSettings):
     # 벡터 스토어 설정
     VECTOR_STORE_PATH: str = "./chroma_db"
     COLLECTION_NAME: str = "documents"
+    VECTOR_STORE_BACKEND: str = "chroma"  # chroma 또는 numpy (메모리 맵 행렬, 읽기 위주 배포용)
+    VECTOR_QUANTIZATION: str = "none"  # numpy 백엔드 1차 검색 양자화 (none, float16, int8)
+    VECTOR_RESCORE_FACTOR: int = 4  # 양자화 검색 후 float32 원본으로 다시 채점할 후보 배수 (k × 배수)
+    
+    # 임베딩 캐시 설정
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "./embedding_cache.sqlite3"  # 빈 문자열이면 메모리만 사용
+    EMBEDDING_CACHE_MAX_ITEMS: int = 10000  # 메모리 LRU 최대 벡터 개수
+    
+    # 동시성 설정
+    BLOCKING_EXECUTOR_MAX_WORKERS: int = 16  # 블로킹 작업(파싱, DB 쓰기 등) 스레드 수
+    
+    # 문서 수집 작업 큐 설정
+    INGEST_WORKERS: int = 2  # 동시에 처리할 업로드 작업 수
+    INGEST_QUEUE_SIZE: int = 32  # 대기 큐 최대 크기
+    INGEST_ENQUEUE_TIMEOUT: float = 5.0  # 큐가 가득 찼을 때 대기할 최대 시간(초)
+    INGEST_BATCH_SIZE: int = 64  # 벡터 스토어에 한 번에 추가할 청크 수
+    INGEST_PREFETCH_BATCHES: int = 2  # 임베딩 중 미리 파싱해 둘 최대 배치 수
+    UPLOAD_BLOCK_SIZE: int = 1024 * 1024  # 업로드 파일을 디스크에 쓸 블록 크기(바이트)
+    INGEST_JOB_HISTORY: int = 1000  # 보관할 작업 상태 최대 개수
+    INGEST_PROCESS_WORKERS: int = 0  # 디렉토리 병렬 파싱 프로세스 수 (0이면 CPU 수)
+    
+    # 쿼리 임베딩 마이크로 배치 설정
+    EMBEDDING_MICROBATCH_ENABLED: bool = True  # 동시에 들어온 쿼리 임베딩 요청을 모아 한 번에 호출
+    EMBEDDING_MICROBATCH_WINDOW_MS: float = 5.0  # 첫 요청 이후 다른 요청을 기다릴 최대 시간(밀리초)
+    EMBEDDING_MICROBATCH_MAX_SIZE: int = 32  # 배치 하나에 담을 최대 쿼리 수
+    EMBEDDING_MICROBATCH_MAX_INFLIGHT: int = 2  # 동시에 진행할 최대 배치 수
+    
+    # 임베딩 수집 설정
+    EMBEDDING_BATCH_SIZE: int = 16  # 임베딩 요청 1회당 청크 수
+    EMBEDDING_MAX_CONCURRENCY: int = 4  # 동시에 보낼 최대 임베딩 요청 수
+    
+    # 시맨틱 답변 캐시 설정
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_MAX_ITEMS: int = 1000  # 보관할 최대 답변 수
+    ANSWER_CACHE_TTL: float = 3600.0  # 답변 유효 시간(초)
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.95  # 캐시 적중 최소 코사인 유사도
+    
+    # 채팅 응답 캐시 설정
+    CHAT_CACHE_ENABLED: bool = True
+    CHAT_CACHE_MAX_TEMPERATURE: float = 0.0  # 이 온도 이하(결정적 설정)의 응답만 캐싱
+    CHAT_CACHE_MAX_ITEMS: int = 1000  # 보관할 최대 응답 수
+    CHAT_CACHE_TTL: float = 3600.0  # 응답 유효 시간(초)
+    
+    # 하이브리드 검색 설정
+    SEARCH_MODE: str = "hybrid"  # 기본 검색 모드 (vector, keyword, hybrid)
+    HYBRID_FETCH_K: int = 20  # 하이브리드 검색 시 각 검색기에서 가져올 후보 수
+    RRF_K: int = 60  # Reciprocal Rank Fusion 순위 완화 상수
+    
+    # 재순위화 설정
+    RERANK_ENABLED: bool = True  # 후보를 넉넉히 가져와 MMR로 중복 청크 제거
+    RERANK_CANDIDATES: int = 20  # 재순위화 전에 가져올 후보 수
+    MMR_LAMBDA: float = 0.5  # MMR 관련성 가중치 (1이면 관련성만, 0이면 다양성만)
+    CROSS_ENCODER_MODEL: str = ""  # 예: cross-encoder/ms-marco-MiniLM-L-6-v2 (빈 문자열이면 사용 안 함)
+    CROSS_ENCODER_CANDIDATES: int = 8  # MMR 결과 중 크로스 인코더로 채점할 후보 수
+    
+    # 컨텍스트 구성 설정
+    CONTEXT_MAX_TOKENS: int = 1500  # 프롬프트에 넣을 컨텍스트 토큰 예산 (0이면 제한 없음)
+    CONTEXT_COMPRESSION_ENABLED: bool = False  # 질문과 관련된 문장만 남기는 추출식 압축 사용
+    CONTEXT_COMPRESSION_MAX_SENTENCES: int = 12  # 압축 시 질문과 유사도가 높은 순으로 남길 최대 문장 수
+    CONTEXT_COMPRESSION_CACHE_MAX_ITEMS: int = 5000  # 문장 임베딩 메모리 LRU 최대 개수 (디스크 캐시에는 저장하지 않음)
+    
+    # 일괄 질의 설정
+    RAG_BATCH_MAX_QUESTIONS: int = 100  # 일괄 질의 요청 1회당 최대 질문 수
+    RAG_BATCH_MAX_CONCURRENCY: int = 4  # 일괄 질의에서 동시에 진행할 최대 답변 생성 수
+    
+    # 요청 추적 설정
+    TRACE_ENABLED: bool = False  # 요청/수집 작업별 단계(span) 추적 사용
+    TRACE_SLOW_THRESHOLD_MS: float = 2000.0  # 이 시간 이상 걸린 추적은 항상 기록
+    TRACE_SAMPLE_RATE: float = 0.01  # 나머지 추적 중 기록할 비율 (0~1)
+    TRACE_LOG_PATH: str = "./traces.jsonl"  # 추적 로그 파일 (JSONL)
+    TRACE_LOG_MAX_BYTES: int = 10 * 1024 * 1024  # 로그 파일 회전 크기(바이트)
+    TRACE_LOG_BACKUP_COUNT: int = 5  # 보관할 회전 파일 수
+    
+    # Ollama HTTP 연결 설정 (LLM, 임베딩 호출이 공유하는 연결 풀)
+    OLLAMA_CONNECT_TIMEOUT: float = 5.0  # 연결 수립 최대 대기(초)
+    OLLAMA_READ_TIMEOUT: float = 120.0  # 응답 데이터 사이 최대 대기(초, 스트리밍은 토큰 간격)
+    OLLAMA_POOL_MAX_CONNECTIONS: int = 32  # 최대 동시 연결 수
+    OLLAMA_POOL_MAX_KEEPALIVE: int = 16  # 재사용을 위해 열어 둘 유휴 연결 수
+    OLLAMA_POOL_KEEPALIVE_EXPIRY: float = 30.0  # 유휴 연결을 닫기까지 시간(초)
+    OLLAMA_POOL_TIMEOUT: float = 10.0  # 풀이 가득 찼을 때 연결을 기다릴 최대 시간(초)
+    OLLAMA_EMBED_MAX_RETRIES: int = 2  # 임베딩 요청 실패 시 재시도 횟수 (연결 오류, 타임아웃, 5xx)
+    OLLAMA_RETRY_BACKOFF_BASE: float = 0.2  # 재시도 대기 기준값(초, 시도마다 2배, 0~값 사이 무작위)
+    OLLAMA_RETRY_BACKOFF_MAX: float = 2.0  # 재시도 대기 상한(초)
+    OLLAMA_CIRCUIT_FAILURE_THRESHOLD: int = 5  # 연속 실패가 이만큼이면 회로 차단 (0이면 사용 안 함)
+    OLLAMA_CIRCUIT_RESET_TIMEOUT: float = 15.0  # 차단 후 시험 요청을 보내기까지 시간(초)
     
     # 문서 저장 경로
     UPLOAD_DIR: str = "./data"
@@ -1,16 +1,45 @@
 """
 FastAPI 메인 애플리케이션
 """
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from config import settings
 from routers import chat, rag
+from models.llm_setup import get_embedding_cache_stats, get_embedding_batcher_stats
+from models.ollama_client import ollama_client
+from rag.ingestion_jobs import ingestion_job_manager
+from chains.qa_chain import qa_chain_manager
+from chains.answer_cache import answer_cache
+from utils.concurrency import install_default_executor, shutdown_executor
+from utils.metrics import Counter, Gauge, MetricsMiddleware, registry
+from utils.tracing import TracingMiddleware, tracer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """애플리케이션 시작/종료 처리"""
+    # 블로킹 작업이 이벤트 루프를 막지 않도록 크기 제한된 스레드 풀 사용
+    install_default_executor(asyncio.get_running_loop())
+    # 문서 수집 워커 풀 시작
+    await ingestion_job_manager.start()
+    # RAG 파이프라인은 시작 시 한 번만 구성하고 모든 요청에서 재사용
+    qa_chain_manager.get_pipeline()
+    yield
+    await ingestion_job_manager.stop()
+    shutdown_executor()
+    await ollama_client.aclose()
+    tracer.close()
+
 
 # FastAPI 앱 초기화
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="LangChain과 Ollama를 활용한 RAG 시스템"
+    description="LangChain과 Ollama를 활용한 RAG 시스템",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -22,6 +51,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청 수/소요 시간 메트릭
+app.add_middleware(MetricsMiddleware)
+
+# 요청별 단계 추적 (TRACE_ENABLED일 때만, X-Trace-Id 헤더 반환)
+app.add_middleware(TracingMiddleware)
+
 # 라우터 등록
 app.include_router(chat.router, prefix="/api/chat", tags=["Chat"])
 app.include_router(rag.router, prefix="/api/rag", tags=["RAG"])
@@ -35,23 +70,78 @@ async def root():
         "version": settings.APP_VERSION,
         "endpoints": {
             "chat": "/api/chat/query",
+            "chat_stream": "/api/chat/query/stream",
             "rag_upload": "/api/rag/upload",
+            "rag_job_status": "/api/rag/jobs/{job_id}",
             "rag_query": "/api/rag/query",
-            "rag_documents": "/api/rag/documents"
+            "rag_query_stream": "/api/rag/query/stream",
+            "rag_documents": "/api/rag/documents",
+            "metrics": "/metrics"
         }
     }
 
 
+def collect_runtime_metrics():
+    """
+    캐시와 임베딩 배처가 이미 세고 있는 통계를 스크레이프 시점에 메트릭으로 변환
+    
+    Returns:
+        list: 메트릭 리스트
+    """
+    caches = {
+        "answer": answer_cache.stats(),
+        "chat_response": chat.chat_response_cache.stats(),
+        "embedding": get_embedding_cache_stats(),
+    }
+    hits = Counter("cache_hits_total", "Cache hits", ["cache"])
+    misses = Counter("cache_misses_total", "Cache misses", ["cache"])
+    hit_ratio = Gauge("cache_hit_ratio", "Cache hit ratio since startup", ["cache"])
+    for name, stats in caches.items():
+        if stats.get("enabled") is False:
+            continue
+        hits.inc(stats["hits"], cache=name)
+        misses.inc(stats["misses"], cache=name)
+        hit_ratio.set(stats["hit_rate"], cache=name)
+    
+    coalesced = Counter("chat_single_flight_coalesced_total", "Chat requests coalesced into an in-flight call")
+    coalesced.inc(chat.chat_single_flight.stats()["coalesced"])
+    metrics = [hits, misses, hit_ratio, coalesced]
+    
+    batcher = get_embedding_batcher_stats()
+    if batcher["enabled"]:
+        queue_depth = Gauge("embedding_batcher_queue_depth", "Query embeddings waiting for a batch")
+        queue_depth.set(batcher["queue_depth"])
+        inflight = Gauge("embedding_batcher_inflight_batches", "Embedding batches currently running")
+        inflight.set(batcher["inflight_batches"])
+        batch_size = Gauge("embedding_batcher_average_batch_size", "Average query embedding batch size")
+        batch_size.set(batcher["average_batch_size"])
+        metrics += [queue_depth, inflight, batch_size]
+    return metrics
+
+
+registry.add_collector(collect_runtime_metrics)
+
+
 @app.get("/health")
 async def health_check():
     """헬스 체크 엔드포인트"""
     return {
         "status": "healthy",
         "ollama_url": settings.OLLAMA_BASE_URL,
-        "model": settings.OLLAMA_MODEL
+        "model": settings.OLLAMA_MODEL,
+        "embedding_cache": get_embedding_cache_stats(),
+        "embedding_batcher": get_embedding_batcher_stats(),
+        "ollama_pool": ollama_client.stats(),
+        "tracing": tracer.stats()
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus 메트릭 엔드포인트"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,209 @@
+"""
+쿼리 임베딩 마이크로 배치 - 동시에 들어온 쿼리 임베딩 요청을 모아 한 번에 계산
+"""
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+from models.embedding_cache import embed_query_batch
+
+
+class MicroBatchingEmbeddings(Embeddings):
+    """쿼리 임베딩을 짧은 시간 창 동안 모아 일괄 호출하는 Embeddings 래퍼"""
+
+    def __init__(self, underlying: Embeddings, window_ms: float = 5.0,
+                 max_batch_size: int = 32, max_inflight: int = 2):
+        """
+        초기화
+
+        Args:
+            underlying: 실제 임베딩을 계산하는 모델
+            window_ms: 첫 요청 이후 다른 요청을 기다릴 최대 시간(밀리초)
+            max_batch_size: 배치 하나에 담을 최대 쿼리 수
+            max_inflight: 동시에 진행할 최대 배치 수
+        """
+        self.underlying = underlying
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.max_inflight = max_inflight
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._dispatcher: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # 배치 통계
+        self.requests = 0
+        self.batches = 0
+        self.batched_texts = 0
+        self.failed_batches = 0
+        self.inflight = 0
+        self.max_queue_depth = 0
+
+    def _ensure_started(self) -> None:
+        """최초 요청 시 배치 수집 스레드와 배치 실행 스레드 풀 시작"""
+        if self._dispatcher is not None:
+            return
+        with self._lock:
+            if self._dispatcher is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_inflight,
+                    thread_name_prefix="embedding-batch"
+                )
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch_loop, name="embedding-batcher", daemon=True
+                )
+                self._dispatcher.start()
+
+    def submit(self, text: str) -> Future:
+        """
+        쿼리 임베딩 요청을 배치 큐에 넣기
+
+        Args:
+            text: 임베딩할 쿼리
+
+        Returns:
+            Future: 임베딩 벡터로 완료되는 Future
+        """
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((text, future))
+        with self._lock:
+            self.requests += 1
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return future
+
+    def _collect(self) -> list:
+        """
+        첫 요청을 받은 뒤 시간 창이 끝나거나 최대 크기가 될 때까지 요청 수집
+
+        Returns:
+            list: (텍스트, Future) 리스트
+        """
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _dispatch_loop(self) -> None:
+        """배치 수집 스레드 본체 (실행 중인 배치가 가득 차면 큐에 요청이 쌓임)"""
+        while True:
+            self._slots.acquire()
+            batch = self._collect()
+            with self._lock:
+                self.inflight += 1
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: list) -> None:
+        """
+        배치 하나를 한 번의 임베딩 호출로 계산하고 각 Future 완료
+
+        Args:
+            batch: (텍스트, Future) 리스트
+        """
+        try:
+            # 같은 텍스트는 한 번만 계산
+            waiters: Dict[str, List[Future]] = {}
+            for text, future in batch:
+                if future.set_running_or_notify_cancel():
+                    waiters.setdefault(text, []).append(future)
+            if not waiters:
+                return
+            texts = list(waiters)
+            try:
+                vectors = embed_query_batch(self.underlying, texts)
+            except BaseException as e:
+                with self._lock:
+                    self.failed_batches += 1
+                for futures in waiters.values():
+                    for future in futures:
+                        future.set_exception(e)
+                return
+            with self._lock:
+                self.batches += 1
+                self.batched_texts += len(texts)
+            for text, vector in zip(texts, vectors):
+                for future in waiters[text]:
+                    future.set_result(vector)
+        finally:
+            with self._lock:
+                self.inflight -= 1
+            self._slots.release()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 임베딩 (수집 경로는 이미 배치로 호출하므로 그대로 전달)"""
+        return self.underlying.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 임베딩 (비동기, 그대로 전달)"""
+        return await self.underlying.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        쿼리 임베딩 (다른 동시 요청과 묶어서 계산)
+
+        Args:
+            text: 임베딩할 쿼리
+
+        Returns:
+            List[float]: 임베딩 벡터
+        """
+        return self.submit(text).result()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """쿼리 임베딩 (비동기, 다른 동시 요청과 묶어서 계산)"""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        여러 쿼리 임베딩 (이미 배치이므로 시간 창을 기다리지 않고 한 번의 호출로 계산)
+
+        Args:
+            texts: 임베딩할 쿼리 리스트
+
+        Returns:
+            List[List[float]]: 임베딩 벡터 리스트
+        """
+        unique = list(dict.fromkeys(texts))
+        with self._lock:
+            self.requests += len(texts)
+        try:
+            vectors = dict(zip(unique, embed_query_batch(self.underlying, unique)))
+        except BaseException:
+            with self._lock:
+                self.failed_batches += 1
+            raise
+        with self._lock:
+            self.batches += 1
+            self.batched_texts += len(unique)
+        return [vectors[text] for text in texts]
+
+    def stats(self) -> Dict[str, object]:
+        """
+        배치 통계 반환
+
+        Returns:
+            dict: 대기 큐 깊이, 요청/배치 수, 평균 배치 크기
+        """
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "inflight_batches": self.inflight,
+                "requests": self.requests,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                "average_batch_size": round(self.batched_texts / self.batches, 2) if self.batches else 0.0,
+                "window_ms": self.window_ms,
+                "max_batch_size": self.max_batch_size,
+            }
@@ -0,0 +1,285 @@
+"""
+임베딩 캐시 - 텍스트 해시 기반 임베딩 벡터 캐싱 (메모리 LRU + 디스크)
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+from utils.concurrency import run_blocking
+
+
+class EmbeddingCacheStore:
+    """임베딩 벡터 저장소 (메모리 LRU + SQLite 디스크 저장)"""
+
+    def __init__(self, path: Optional[str] = None, max_memory_items: int = 10000):
+        """
+        초기화
+
+        Args:
+            path: 디스크 캐시 파일 경로 (None 또는 빈 문자열이면 메모리만 사용)
+            max_memory_items: 메모리 LRU에 보관할 최대 벡터 개수
+        """
+        self.path = path or None
+        self.max_memory_items = max_memory_items
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        # 캐시 통계
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.path:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, kind: str, text: str) -> str:
+        """
+        캐시 키 생성
+
+        Args:
+            model: 임베딩 모델 이름
+            kind: 임베딩 종류 ("document" 또는 "query")
+            text: 원본 텍스트
+
+        Returns:
+            str: sha256 해시 키
+        """
+        digest = hashlib.sha256()
+        for part in (model, kind, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        """메모리 LRU에 벡터 저장 (락을 잡은 상태에서 호출)"""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        여러 키에 대한 캐시 조회
+
+        Args:
+            keys: 조회할 캐시 키 리스트
+
+        Returns:
+            Dict: 캐시에 존재하는 키 → 벡터 매핑
+        """
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                if key in found:
+                    continue
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                else:
+                    missing.append(key)
+
+            if missing and self._conn is not None:
+                # SQLite 변수 개수 제한을 고려해 나눠서 조회
+                for start in range(0, len(missing), 500):
+                    part = missing[start:start + 500]
+                    placeholders = ",".join("?" * len(part))
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                        part
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = array("f")
+                        vector.frombytes(blob)
+                        vector = vector.tolist()
+                        found[key] = vector
+                        self._remember(key, vector)
+                        self.disk_hits += 1
+
+            hit_count = sum(1 for key in keys if key in found)
+            self.hits += hit_count
+            self.misses += len(keys) - hit_count
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        """
+        여러 벡터를 캐시에 저장
+
+        Args:
+            items: 캐시 키 → 벡터 매핑
+        """
+        if not items:
+            return
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            if self._conn is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, array("f", vector).tobytes()) for key, vector in items.items()]
+                )
+                self._conn.commit()
+
+    def clear(self) -> None:
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, object]:
+        """
+        캐시 통계 반환
+
+        Returns:
+            dict: 히트/미스 카운터 및 적중률
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "memory_items": len(self._memory),
+                "max_memory_items": self.max_memory_items,
+                "path": self.path,
+            }
+
+
+def embed_query_batch(embeddings: Embeddings, texts: List[str]) -> List[List[float]]:
+    """
+    여러 쿼리를 한 번의 호출로 임베딩
+
+    Embeddings 인터페이스에는 쿼리 일괄 임베딩이 없으므로, embed_queries()를
+    제공하는 모델(캐시/배치 래퍼, PooledOllamaEmbeddings의 /api/embed 요청)은
+    그것을 쓰고, 그 밖의 모델은 embed_query()를 차례로 호출합니다.
+
+    Args:
+        embeddings: 임베딩 모델
+        texts: 임베딩할 쿼리 리스트
+
+    Returns:
+        List[List[float]]: texts와 같은 순서의 임베딩 벡터 리스트
+    """
+    if not texts:
+        return []
+    if hasattr(embeddings, "embed_queries"):
+        return embeddings.embed_queries(texts)
+    return [embeddings.embed_query(text) for text in texts]
+
+
+class CachedEmbeddings(Embeddings):
+    """캐시를 거쳐 임베딩을 계산하는 Embeddings 래퍼"""
+
+    def __init__(self, underlying: Embeddings, model_name: str, store: EmbeddingCacheStore):
+        """
+        초기화
+
+        Args:
+            underlying: 실제 임베딩을 계산하는 모델
+            model_name: 캐시 키에 포함될 모델 이름
+            store: 임베딩 캐시 저장소
+        """
+        self.underlying = underlying
+        self.model_name = model_name
+        self.store = store
+
+    def _lookup(self, texts: List[str], kind: str):
+        """캐시 조회 후 (키 리스트, 캐시 결과, 미스 텍스트 리스트) 반환"""
+        keys = [self.store.make_key(self.model_name, kind, text) for text in texts]
+        cached = self.store.get_many(keys)
+
+        # 같은 텍스트가 여러 번 나와도 한 번만 계산
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        return keys, cached, missing
+
+    def _merge(self, keys: List[str], cached: Dict[str, List[float]],
+               missing: Dict[str, str], vectors: List[List[float]]) -> List[List[float]]:
+        """새로 계산한 벡터를 캐시에 저장하고 입력 순서대로 결과 조합"""
+        # 캐시에서 읽은 값과 동일하도록 float32 정밀도로 맞춤
+        computed = {
+            key: array("f", vector).tolist()
+            for key, vector in zip(missing.keys(), vectors)
+        }
+        self.store.put_many(computed)
+        cached.update(computed)
+        return [cached[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        문서 임베딩 (캐시 적용)
+
+        Args:
+            texts: 임베딩할 텍스트 리스트
+
+        Returns:
+            List[List[float]]: 임베딩 벡터 리스트
+        """
+        keys, cached, missing = self._lookup(texts, "document")
+        vectors = self.underlying.embed_documents(list(missing.values())) if missing else []
+        return self._merge(keys, cached, missing, vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        쿼리 임베딩 (캐시 적용)
+
+        Args:
+            text: 임베딩할 쿼리
+
+        Returns:
+            List[float]: 임베딩 벡터
+        """
+        keys, cached, missing = self._lookup([text], "query")
+        vectors = [self.underlying.embed_query(text)] if missing else []
+        return self._merge(keys, cached, missing, vectors)[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        여러 쿼리 임베딩 (캐시 적용, 미스는 한 번에 계산)
+
+        Args:
+            texts: 임베딩할 쿼리 리스트
+
+        Returns:
+            List[List[float]]: 임베딩 벡터 리스트
+        """
+        keys, cached, missing = self._lookup(texts, "query")
+        vectors = embed_query_batch(self.underlying, list(missing.values())) if missing else []
+        return self._merge(keys, cached, missing, vectors)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 임베딩 (비동기, 캐시 적용, SQLite 조회/저장은 스레드 풀에서 실행)"""
+        keys, cached, missing = await run_blocking(self._lookup, texts, "document")
+        vectors = await self.underlying.aembed_documents(list(missing.values())) if missing else []
+        return await run_blocking(self._merge, keys, cached, missing, vectors)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """쿼리 임베딩 (비동기, 캐시 적용, SQLite 조회/저장은 스레드 풀에서 실행)"""
+        keys, cached, missing = await run_blocking(self._lookup, [text], "query")
+        vectors = [await self.underlying.aembed_query(text)] if missing else []
+        return (await run_blocking(self._merge, keys, cached, missing, vectors))[0]
+
+    def stats(self) -> Dict[str, object]:
+        """캐시 통계 반환"""
+        return self.store.stats()
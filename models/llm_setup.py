@@ -1,41 +1,220 @@
 """
 LLM 및 임베딩 모델 설정
 """
-from langchain_community.llms import Ollama
-from langchain_community.embeddings import OllamaEmbeddings
+import threading
+import time
+from typing import Any, Dict
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from models.embedding_cache import CachedEmbeddings, EmbeddingCacheStore
+from models.embedding_batcher import MicroBatchingEmbeddings
+from models.ollama_client import PooledOllama, PooledOllamaEmbeddings
+from utils.metrics import (
+    llm_generation_seconds,
+    llm_requests_in_flight,
+    llm_time_to_first_token_seconds,
+    llm_tokens,
+    llm_tokens_per_second,
+)
 from config import settings
 
 
-def get_llm():
+# 프로세스 전역 임베딩 캐시 저장소 (최초 사용 시 생성)
+_embedding_cache_store = None
+
+# 프로세스 전역 쿼리 임베딩 마이크로 배처 (최초 사용 시 생성)
+_embedding_batcher = None
+
+# 프로세스 전역 LLM 인스턴스 (최초 사용 시 생성)
+_llm = None
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """LLM 호출의 첫 토큰 지연, 생성 시간, 토큰 수, 초당 토큰 수를 기록하는 콜백"""
+
+    # 이벤트 루프를 거치지 않고 호출 스레드에서 바로 실행
+    run_inline = True
+
+    def __init__(self, model: str):
+        """
+        초기화
+        
+        Args:
+            model: 메트릭 레이블에 쓸 모델 이름
+        """
+        self.model = model
+        self._runs: Dict[UUID, list] = {}  # run_id → [시작 시각, 첫 토큰 시각, 청크 수]
+        self._lock = threading.Lock()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: list, *, run_id: UUID, **kwargs: Any) -> None:
+        llm_requests_in_flight.inc(model=self.model)
+        with self._lock:
+            self._runs[run_id] = [time.perf_counter(), None, 0]
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        # Ollama는 invoke도 내부적으로 스트리밍하므로 모든 호출에서 첫 토큰 시각을 알 수 있음
+        run = self._runs.get(run_id)
+        if run is None or not token:
+            return
+        if run[1] is None:
+            run[1] = time.perf_counter()
+            llm_time_to_first_token_seconds.observe(run[1] - run[0], model=self.model)
+        run[2] += 1
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        llm_requests_in_flight.dec(model=self.model)
+        started, first_token, chunks = run
+        ended = time.perf_counter()
+        llm_generation_seconds.observe(ended - started, model=self.model)
+
+        # Ollama의 마지막 응답에 담긴 실제 토큰 수를 우선 사용하고, 없으면 스트림 청크 수로 대신함
+        info = {}
+        if response.generations and response.generations[0]:
+            info = response.generations[0][0].generation_info or {}
+        completion_tokens = info.get("eval_count") or chunks
+        prompt_tokens = info.get("prompt_eval_count")
+        llm_tokens.inc(completion_tokens, model=self.model, kind="completion")
+        if prompt_tokens:
+            llm_tokens.inc(prompt_tokens, model=self.model, kind="prompt")
+
+        eval_seconds = (info.get("eval_duration") or 0) / 1e9
+        if not eval_seconds and first_token is not None:
+            eval_seconds = ended - first_token
+        if completion_tokens and eval_seconds > 0:
+            llm_tokens_per_second.observe(completion_tokens / eval_seconds, model=self.model)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is not None:
+            llm_requests_in_flight.dec(model=self.model)
+
+
+def get_llm(temperature: float = None):
     """
     Ollama LLM 인스턴스 반환
     
+    인스턴스는 프로세스에서 하나만 만들어 재사용하고, HTTP 요청은
+    공유 연결 풀(models.ollama_client)을 거칩니다. 온도가 다르면 공유
+    인스턴스를 바꾸지 않고 얕은 복사본을 반환합니다.
+    
+    Args:
+        temperature: 생성 온도 (기본값: TEMPERATURE)
+    
+    Returns:
+        PooledOllama: 설정된 Ollama LLM 인스턴스 (생성 지표 콜백 포함)
+    """
+    global _llm
+    if _llm is None:
+        _llm = PooledOllama(
+            base_url=settings.OLLAMA_BASE_URL,
+            model=settings.OLLAMA_MODEL,
+            temperature=settings.TEMPERATURE,
+            num_predict=settings.MAX_TOKENS,
+            callbacks=[LLMMetricsCallback(settings.OLLAMA_MODEL)],
+        )
+    if temperature is not None and temperature != _llm.temperature:
+        return _llm.model_copy(update={"temperature": temperature})
+    return _llm
+
+
+def get_embedding_cache_store():
+    """
+    프로세스 전역 임베딩 캐시 저장소 반환
+    
     Returns:
-        Ollama: 설정된 Ollama LLM 인스턴스
+        EmbeddingCacheStore: 임베딩 캐시 저장소
     """
-    llm = Ollama(
-        base_url=settings.OLLAMA_BASE_URL,
-        model=settings.OLLAMA_MODEL,
-        temperature=settings.TEMPERATURE,
-        num_predict=settings.MAX_TOKENS,
-    )
-    return llm
+    global _embedding_cache_store
+    if _embedding_cache_store is None:
+        _embedding_cache_store = EmbeddingCacheStore(
+            path=settings.EMBEDDING_CACHE_PATH,
+            max_memory_items=settings.EMBEDDING_CACHE_MAX_ITEMS,
+        )
+    return _embedding_cache_store
+
+
+def get_embedding_batcher():
+    """
+    프로세스 전역 쿼리 임베딩 마이크로 배처 반환
+    
+    여러 요청이 동시에 보내는 단건 쿼리 임베딩을 EMBEDDING_MICROBATCH_WINDOW_MS
+    동안(또는 EMBEDDING_MICROBATCH_MAX_SIZE개가 찰 때까지) 모아 한 번에 계산합니다.
+    
+    Returns:
+        MicroBatchingEmbeddings: 마이크로 배치 임베딩 래퍼
+    """
+    global _embedding_batcher
+    if _embedding_batcher is None:
+        _embedding_batcher = MicroBatchingEmbeddings(
+            underlying=PooledOllamaEmbeddings(
+                base_url=settings.OLLAMA_BASE_URL,
+                model=settings.OLLAMA_EMBEDDING_MODEL,
+            ),
+            window_ms=settings.EMBEDDING_MICROBATCH_WINDOW_MS,
+            max_batch_size=settings.EMBEDDING_MICROBATCH_MAX_SIZE,
+            max_inflight=settings.EMBEDDING_MICROBATCH_MAX_INFLIGHT,
+        )
+    return _embedding_batcher
 
 
 def get_embeddings():
     """
     Ollama 임베딩 모델 인스턴스 반환
     
+    캐시가 활성화되어 있으면 (모델, 텍스트) 해시로 벡터를 캐싱하는
+    래퍼를 반환하여 동일한 텍스트의 재임베딩을 건너뜁니다.
+    마이크로 배치가 활성화되어 있으면 캐시 미스인 쿼리만 배처로 모입니다.
+    
     Returns:
-        OllamaEmbeddings: 설정된 임베딩 모델 인스턴스
+        Embeddings: 설정된 임베딩 모델 인스턴스
     """
-    embeddings = OllamaEmbeddings(
-        base_url=settings.OLLAMA_BASE_URL,
-        model=settings.OLLAMA_EMBEDDING_MODEL,
-    )
+    if settings.EMBEDDING_MICROBATCH_ENABLED:
+        embeddings = get_embedding_batcher()
+    else:
+        embeddings = PooledOllamaEmbeddings(
+            base_url=settings.OLLAMA_BASE_URL,
+            model=settings.OLLAMA_EMBEDDING_MODEL,
+        )
+    if settings.EMBEDDING_CACHE_ENABLED:
+        embeddings = CachedEmbeddings(
+            underlying=embeddings,
+            # 정규화 이전(/api/embeddings) 벡터와 섞이지 않도록 캐시 키 구분
+            model_name=f"{settings.OLLAMA_EMBEDDING_MODEL}:normalized",
+            store=get_embedding_cache_store(),
+        )
     return embeddings
 
 
+def get_embedding_cache_stats():
+    """
+    임베딩 캐시 통계 반환
+    
+    Returns:
+        dict: 히트/미스 카운터 (캐시 비활성화 시 enabled=False)
+    """
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return {"enabled": False}
+    return {"enabled": True, **get_embedding_cache_store().stats()}
+
+
+def get_embedding_batcher_stats():
+    """
+    쿼리 임베딩 마이크로 배치 통계 반환
+    
+    Returns:
+        dict: 대기 큐 깊이, 배치 수 등 (비활성화 시 enabled=False)
+    """
+    if not settings.EMBEDDING_MICROBATCH_ENABLED:
+        return {"enabled": False}
+    return {"enabled": True, **get_embedding_batcher().stats()}
+
+
 def test_llm_connection():
     """
     LLM 연결 테스트
@@ -0,0 +1,489 @@
+"""
+Ollama HTTP 클라이언트 - 모든 Ollama 호출이 공유하는 keep-alive 연결 풀, 타임아웃, 재시도, 회로 차단
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+import httpx
+import numpy as np
+from langchain_community.embeddings import OllamaEmbeddings
+from langchain_community.llms.ollama import OllamaEndpointNotFoundError
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import Generation, GenerationChunk, LLMResult
+from utils.circuit_breaker import CircuitBreaker
+from config import settings
+
+
+# 재시도할 응답 상태 코드 (과부하, 일시적 서버 오류)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class OllamaHTTPClient:
+    """프로세스 전역 Ollama HTTP 연결 풀"""
+
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 120.0,
+                 max_connections: int = 32, max_keepalive: int = 16, keepalive_expiry: float = 30.0,
+                 pool_timeout: float = 10.0, max_retries: int = 2, backoff_base: float = 0.2,
+                 backoff_max: float = 2.0, failure_threshold: int = 5, reset_timeout: float = 15.0):
+        """
+        초기화
+
+        동기 호출(임베딩, invoke)과 비동기 호출(ainvoke, astream)은 각각의 풀을 쓰며,
+        연결 수 제한은 풀마다 적용됩니다. 비동기 풀은 이벤트 루프마다 하나씩 만듭니다.
+
+        Args:
+            connect_timeout: 연결 수립 최대 대기(초)
+            read_timeout: 응답 데이터 사이 최대 대기(초)
+            max_connections: 풀당 최대 동시 연결 수
+            max_keepalive: 풀당 열어 둘 유휴 연결 수
+            keepalive_expiry: 유휴 연결을 닫기까지 시간(초)
+            pool_timeout: 풀이 가득 찼을 때 연결을 기다릴 최대 시간(초)
+            max_retries: post_json()의 기본 재시도 횟수 상한
+            backoff_base: 재시도 대기 기준값(초)
+            backoff_max: 재시도 대기 상한(초)
+            failure_threshold: 회로를 열 연속 실패 횟수 (0이면 사용 안 함)
+            reset_timeout: 회로를 연 뒤 시험 요청을 보내기까지 시간(초)
+        """
+        self.timeout = httpx.Timeout(connect=connect_timeout, read=read_timeout,
+                                     write=read_timeout, pool=pool_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive,
+                                   keepalive_expiry=keepalive_expiry)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker("Ollama", failure_threshold, reset_timeout)
+
+        self._client: Optional[httpx.Client] = None
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+        # 통계
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @property
+    def client(self) -> httpx.Client:
+        """동기 클라이언트 (최초 사용 시 생성, 스레드 간 공유)"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(timeout=self.timeout, limits=self.limits)
+        return self._client
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """현재 이벤트 루프의 비동기 클라이언트 (최초 사용 시 생성)"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+            self._async_clients[loop] = client
+        return client
+
+    @contextmanager
+    def _track(self):
+        """요청 수, 진행 중인 요청 수, 오류 수 집계"""
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _record_status(self, status_code: int) -> None:
+        """응답 상태로 회로 차단기 갱신 (5xx만 실패, 4xx는 서버가 응답한 것으로 봄)"""
+        if status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _backoff(self, attempt: int) -> float:
+        """재시도 대기 시간 (지수 증가 상한 안에서 무작위, 동시 재시도가 몰리지 않도록)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response, model: str) -> None:
+        """200이 아닌 응답을 langchain Ollama와 같은 예외로 변환"""
+        if response.status_code == 404:
+            raise OllamaEndpointNotFoundError(
+                "Ollama call failed with status code 404. "
+                "Maybe your model is not found "
+                f"and you should pull the model with `ollama pull {model}`."
+            )
+        raise ValueError(
+            f"Ollama call failed with status code {response.status_code}. Details: {response.text}"
+        )
+
+    def post_json(self, url: str, payload: Dict[str, Any], headers: Dict[str, str] = None,
+                  retries: int = None) -> httpx.Response:
+        """
+        JSON 요청 (연결 오류, 타임아웃, 재시도 대상 상태 코드면 무작위 지연 후 재시도)
+
+        Args:
+            url: 요청 URL
+            payload: JSON 본문
+            headers: 추가 헤더
+            retries: 재시도 횟수 (기본값: max_retries)
+
+        Returns:
+            httpx.Response: 마지막 응답
+
+        Raises:
+            CircuitOpenError: 회로가 열려 있는 경우 (재시도 중 열린 경우 포함)
+            httpx.TransportError: 재시도 후에도 연결에 실패한 경우
+        """
+        retries = self.max_retries if retries is None else retries
+        attempt = 0
+        while True:
+            probe = self.breaker.before_call()
+            try:
+                with self._track():
+                    response = self.client.post(url, json=payload, headers=headers)
+            except httpx.TransportError:
+                self.breaker.record_failure()
+                if attempt >= retries:
+                    raise
+            else:
+                self._record_status(response.status_code)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= retries:
+                    return response
+            finally:
+                self.breaker.release_probe(probe)
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+            time.sleep(self._backoff(attempt))
+
+    def stream_lines(self, url: str, payload: Dict[str, Any], model: str,
+                     headers: Dict[str, str] = None) -> Iterator[str]:
+        """
+        스트리밍 응답을 줄 단위로 반환 (생성 요청은 재시도하지 않음)
+
+        Args:
+            url: 요청 URL
+            payload: JSON 본문
+            model: 404 오류 메시지에 쓸 모델 이름
+            headers: 추가 헤더
+
+        Yields:
+            str: 응답 한 줄 (NDJSON)
+        """
+        probe = self.breaker.before_call()
+        try:
+            with self._track(), self.client.stream("POST", url, json=payload, headers=headers) as response:
+                self._record_status(response.status_code)
+                if response.status_code != 200:
+                    response.read()
+                    self._raise_for_status(response, model)
+                yield from response.iter_lines()
+        except httpx.TransportError:
+            self.breaker.record_failure()
+            raise
+        finally:
+            self.breaker.release_probe(probe)
+
+    async def astream_lines(self, url: str, payload: Dict[str, Any], model: str,
+                            headers: Dict[str, str] = None) -> AsyncIterator[str]:
+        """
+        스트리밍 응답을 줄 단위로 반환 (비동기)
+
+        Args:
+            url: 요청 URL
+            payload: JSON 본문
+            model: 404 오류 메시지에 쓸 모델 이름
+            headers: 추가 헤더
+
+        Yields:
+            str: 응답 한 줄 (NDJSON)
+        """
+        client = self._get_async_client()
+        probe = self.breaker.before_call()
+        try:
+            with self._track():
+                async with client.stream("POST", url, json=payload, headers=headers) as response:
+                    self._record_status(response.status_code)
+                    if response.status_code != 200:
+                        await response.aread()
+                        self._raise_for_status(response, model)
+                    async for line in response.aiter_lines():
+                        yield line
+        except httpx.TransportError:
+            self.breaker.record_failure()
+            raise
+        finally:
+            self.breaker.release_probe(probe)
+
+    async def aclose(self) -> None:
+        """열린 연결 정리 (애플리케이션 종료 시)"""
+        clients = list(self._async_clients.items())
+        self._async_clients.clear()
+        for loop, client in clients:
+            if loop is asyncio.get_running_loop():
+                await client.aclose()
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        연결 풀 통계 반환 (httpx 내부 상태는 읽지 않고 직접 집계한 값만 사용)
+
+        Returns:
+            dict: 타임아웃/풀 설정, 요청·오류·재시도 수, 진행 중인 요청 수와 최댓값,
+                  만들어진 동기/비동기 클라이언트 수, 회로 차단기 상태
+        """
+        return {
+            "connect_timeout": self.timeout.connect,
+            "read_timeout": self.timeout.read,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive": self.limits.max_keepalive_connections,
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "clients": {
+                "sync": int(self._client is not None),
+                "async": len(self._async_clients),
+            },
+            "circuit": self.breaker.stats(),
+        }
+
+
+# 요청 options로 보내는 생성 파라미터 (값이 None이면 Ollama 모델 기본값 사용)
+GENERATION_OPTIONS = (
+    "mirostat", "mirostat_eta", "mirostat_tau", "num_ctx", "num_gpu", "num_thread", "num_predict",
+    "repeat_last_n", "repeat_penalty", "temperature", "tfs_z", "top_k", "top_p",
+)
+
+
+class PooledOllama(LLM):
+    """
+    공유 연결 풀로 /api/generate를 호출하는 Ollama LLM
+
+    langchain Ollama의 내부 구현에 기대지 않도록 LLM의 확장 지점(_generate, _stream 등)만
+    구현하고, 요청 본문은 아래 공개 필드로 직접 만듭니다. 응답은 항상 스트리밍으로 받아
+    토큰마다 on_llm_new_token을 호출하고, 마지막 응답의 통계(eval_count 등)를 generation_info로 넘깁니다.
+    """
+
+    base_url: str = "http://localhost:11434"
+    model: str = "llama2"
+    mirostat: Optional[int] = None
+    mirostat_eta: Optional[float] = None
+    mirostat_tau: Optional[float] = None
+    num_ctx: Optional[int] = None
+    num_gpu: Optional[int] = None
+    num_thread: Optional[int] = None
+    num_predict: Optional[int] = None
+    repeat_last_n: Optional[int] = None
+    repeat_penalty: Optional[float] = None
+    temperature: Optional[float] = None
+    stop: Optional[List[str]] = None
+    tfs_z: Optional[float] = None
+    top_k: Optional[int] = None
+    top_p: Optional[float] = None
+    system: Optional[str] = None
+    template: Optional[str] = None
+    format: Optional[str] = None
+    keep_alive: Optional[Union[int, str]] = None
+    raw: Optional[bool] = None
+    headers: Optional[Dict[str, str]] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "ollama"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": self.model, "format": self.format, **self._options({})}
+
+    def _options(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """필드 값과 호출 인자(같은 이름이면 우선)로 options 구성"""
+        options = {name: getattr(self, name) for name in GENERATION_OPTIONS}
+        options.update({name: kwargs[name] for name in GENERATION_OPTIONS if name in kwargs})
+        return {name: value for name, value in options.items() if value is not None}
+
+    def _payload(self, prompt: str, stop: Optional[List[str]], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """/api/generate 요청 본문"""
+        if self.stop is not None and stop is not None:
+            raise ValueError("`stop` found in both the input and default params.")
+        options = self._options(kwargs)
+        stop = stop if stop is not None else self.stop
+        if stop:
+            options["stop"] = stop
+        payload = {"model": self.model, "prompt": prompt, "stream": True, "options": options}
+        for name in ("system", "template", "format", "keep_alive", "raw"):
+            if getattr(self, name) is not None:
+                payload[name] = getattr(self, name)
+        return payload
+
+    @staticmethod
+    def _to_chunk(line: str) -> Optional[GenerationChunk]:
+        """스트림 한 줄을 GenerationChunk로 변환 (마지막 줄은 통계를 generation_info로)"""
+        if not line:
+            return None
+        response = json.loads(line)
+        if response.get("done") is True:
+            return GenerationChunk(text=response.get("response", ""), generation_info=response)
+        return GenerationChunk(text=response.get("response", ""))
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        lines = ollama_client.stream_lines(
+            f"{self.base_url}/api/generate", self._payload(prompt, stop, kwargs), self.model, headers=self.headers
+        )
+        for line in lines:
+            chunk = self._to_chunk(line)
+            if chunk is None:
+                continue
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        lines = ollama_client.astream_lines(
+            f"{self.base_url}/api/generate", self._payload(prompt, stop, kwargs), self.model, headers=self.headers
+        )
+        async for line in lines:
+            chunk = self._to_chunk(line)
+            if chunk is None:
+                continue
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    @staticmethod
+    def _to_generation(chunks: List[GenerationChunk]) -> List[Generation]:
+        """스트림 청크를 하나의 Generation으로 합침"""
+        if not chunks:
+            return [Generation(text="")]
+        return [Generation(text="".join(chunk.text for chunk in chunks),
+                           generation_info=chunks[-1].generation_info)]
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None,
+              run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> str:
+        return "".join(chunk.text for chunk in self._stream(prompt, stop, run_manager, **kwargs))
+
+    def _generate(self, prompts: List[str], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> LLMResult:
+        return LLMResult(generations=[
+            self._to_generation(list(self._stream(prompt, stop, run_manager, **kwargs)))
+            for prompt in prompts
+        ])
+
+    async def _agenerate(self, prompts: List[str], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> LLMResult:
+        generations = []
+        for prompt in prompts:
+            chunks = [chunk async for chunk in self._astream(prompt, stop, run_manager, **kwargs)]
+            generations.append(self._to_generation(chunks))
+        return LLMResult(generations=generations)
+
+
+class PooledOllamaEmbeddings(OllamaEmbeddings):
+    """
+    공유 연결 풀로 요청하고 실패 시 재시도하는 Ollama 임베딩
+
+    여러 텍스트는 /api/embed 한 번의 요청(input 리스트)으로 계산합니다. /api/embed는
+    L2 정규화된 벡터를 반환하므로, 이 엔드포인트가 없는 이전 Ollama에서 텍스트별
+    /api/embeddings로 대신 계산할 때도 결과를 정규화해 같은 공간의 벡터를 돌려줍니다.
+    """
+
+    def _options(self) -> Dict[str, Any]:
+        """요청 options (설정된 값만)"""
+        options = {
+            "num_ctx": self.num_ctx,
+            "num_gpu": self.num_gpu,
+            "num_thread": self.num_thread,
+        }
+        return {key: value for key, value in options.items() if value is not None}
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> httpx.Response:
+        """공유 풀로 요청 (재시도 후에도 연결에 실패하면 ValueError)"""
+        try:
+            return ollama_client.post_json(f"{self.base_url}{path}", payload, headers=self.headers)
+        except httpx.HTTPError as e:
+            raise ValueError(f"Error raised by inference endpoint: {e}")
+
+    def _embed_one(self, text: str) -> List[float]:
+        """텍스트 하나를 /api/embeddings로 임베딩 (정규화)"""
+        response = self._post(
+            "/api/embeddings", {"model": self.model, "prompt": text, "options": self._options()}
+        )
+        if response.status_code != 200:
+            raise ValueError(
+                "Error raised by inference API HTTP code: %s, %s" % (response.status_code, response.text)
+            )
+        vector = np.asarray(response.json()["embedding"], dtype=np.float64)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        여러 텍스트를 한 번의 HTTP 요청으로 임베딩 (지시문은 호출자가 붙임)
+
+        Args:
+            texts: 임베딩할 텍스트 리스트
+
+        Returns:
+            List[List[float]]: texts와 같은 순서의 정규화된 임베딩 벡터 리스트
+        """
+        if not texts:
+            return []
+        response = self._post("/api/embed", {"model": self.model, "input": texts, "options": self._options()})
+        if response.status_code == 404 and "model" not in response.text.lower():
+            # /api/embed가 없는 Ollama (0.3.4 미만)
+            return [self._embed_one(text) for text in texts]
+        if response.status_code != 200:
+            raise ValueError(
+                "Error raised by inference API HTTP code: %s, %s" % (response.status_code, response.text)
+            )
+        return response.json()["embeddings"]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 임베딩 (한 번의 요청)"""
+        return self.embed_batch([f"{self.embed_instruction}{text}" for text in texts])
+
+    def embed_query(self, text: str) -> List[float]:
+        """쿼리 임베딩"""
+        return self.embed_batch([f"{self.query_instruction}{text}"])[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """여러 쿼리를 한 번의 요청으로 임베딩"""
+        return self.embed_batch([f"{self.query_instruction}{text}" for text in texts])
+
+
+# 전역 인스턴스
+ollama_client = OllamaHTTPClient(
+    connect_timeout=settings.OLLAMA_CONNECT_TIMEOUT,
+    read_timeout=settings.OLLAMA_READ_TIMEOUT,
+    max_connections=settings.OLLAMA_POOL_MAX_CONNECTIONS,
+    max_keepalive=settings.OLLAMA_POOL_MAX_KEEPALIVE,
+    keepalive_expiry=settings.OLLAMA_POOL_KEEPALIVE_EXPIRY,
+    pool_timeout=settings.OLLAMA_POOL_TIMEOUT,
+    max_retries=settings.OLLAMA_EMBED_MAX_RETRIES,
+    backoff_base=settings.OLLAMA_RETRY_BACKOFF_BASE,
+    backoff_max=settings.OLLAMA_RETRY_BACKOFF_MAX,
+    failure_threshold=settings.OLLAMA_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.OLLAMA_CIRCUIT_RESET_TIMEOUT,
+)
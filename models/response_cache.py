@@ -0,0 +1,102 @@
+"""
+응답 캐시 - 결정적 설정의 LLM 응답을 정확히 일치하는 키로 캐싱
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class ResponseCache:
+    """크기와 유효 시간이 제한된 LLM 응답 캐시"""
+
+    def __init__(self, max_items: int = 1000, ttl: float = 3600.0):
+        """
+        초기화
+
+        Args:
+            max_items: 보관할 최대 응답 수 (LRU 방식으로 제거)
+            ttl: 응답 유효 시간(초)
+        """
+        self.max_items = max_items
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+        # 캐시 통계
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(**params: Any) -> str:
+        """
+        요청 파라미터로 캐시 키 생성
+
+        Args:
+            **params: 모델, 프롬프트, 온도 등 응답을 결정하는 값
+
+        Returns:
+            str: sha256 해시 키
+        """
+        payload = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        캐시 조회
+
+        Args:
+            key: 캐시 키
+
+        Returns:
+            Optional[Any]: 캐시된 응답 (없거나 만료되면 None)
+        """
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and time.time() - item[1] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            if item is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        응답 저장
+
+        Args:
+            key: 캐시 키
+            value: 저장할 응답
+        """
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        캐시 통계 반환
+
+        Returns:
+            dict: 히트/미스 카운터, 적중률, 항목 수
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "items": len(self._entries),
+                "max_items": self.max_items,
+                "ttl": self.ttl,
+            }
@@ -0,0 +1,146 @@
+"""
+BM25 키워드 인덱스 - 식별자, 에러 코드 등 정확한 단어 일치 검색
+"""
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# 영문/숫자/한글 단어, 그리고 E-1234, v1.2 처럼 -, ., _ 로 이어진 식별자
+_TOKEN_PATTERN = re.compile(r"\w+(?:[-.]\w+)*")
+_HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    BM25용 토큰화
+
+    식별자는 통째로 한 토큰으로 두고 구성 요소도 함께 추가합니다.
+    한글 단어는 조사가 붙어도 일치하도록 글자 bigram을 추가합니다.
+
+    Args:
+        text: 원본 텍스트
+
+    Returns:
+        List[str]: 토큰 리스트
+    """
+    tokens: List[str] = []
+    for word in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(word)
+        parts = re.split(r"[-.]", word)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part)
+        if len(word) > 2 and _HANGUL_PATTERN.search(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class BM25Index:
+    """메모리 내 역색인 기반 BM25 검색 인덱스"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        초기화
+
+        Args:
+            k1: 단어 빈도 포화 계수
+            b: 문서 길이 정규화 계수
+        """
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)  # 토큰 → {문서 ID: 빈도}
+        self._doc_terms: Dict[str, List[str]] = {}  # 문서 ID → 고유 토큰 (삭제용)
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self.version: Optional[int] = None  # 반영된 컬렉션 변경 버전 (None이면 아직 로드 전)
+
+    def __len__(self) -> int:
+        """색인된 문서 수"""
+        return len(self._doc_lengths)
+
+    def ids(self) -> Set[str]:
+        """색인된 문서 ID 집합"""
+        with self._lock:
+            return set(self._doc_lengths)
+
+    def add(self, ids: Iterable[str], texts: Iterable[str]) -> None:
+        """
+        문서 추가 (같은 ID가 있으면 교체)
+
+        Args:
+            ids: 문서 ID
+            texts: 문서 텍스트
+        """
+        with self._lock:
+            for doc_id, text in zip(ids, texts):
+                if doc_id in self._doc_lengths:
+                    self._remove_one(doc_id)
+                counts = Counter(tokenize(text))
+                for token, count in counts.items():
+                    self._postings[token][doc_id] = count
+                length = sum(counts.values())
+                self._doc_terms[doc_id] = list(counts.keys())
+                self._doc_lengths[doc_id] = length
+                self._total_length += length
+
+    def _remove_one(self, doc_id: str) -> None:
+        """문서 하나 제거 (락을 잡은 상태에서 호출)"""
+        for token in self._doc_terms.pop(doc_id, []):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[token]
+        self._total_length -= self._doc_lengths.pop(doc_id, 0)
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """
+        문서 제거
+
+        Args:
+            ids: 제거할 문서 ID
+        """
+        with self._lock:
+            for doc_id in ids:
+                self._remove_one(doc_id)
+
+    def clear(self) -> None:
+        """인덱스 전체 삭제"""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_lengths.clear()
+            self._total_length = 0
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """
+        BM25 점수 상위 문서 검색
+
+        Args:
+            query: 검색 쿼리
+            k: 반환할 문서 개수
+
+        Returns:
+            List[Tuple[str, float]]: (문서 ID, 점수) 리스트 (점수 내림차순)
+        """
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if doc_count == 0:
+                return []
+            average_length = self._total_length / doc_count
+
+            scores: Dict[str, float] = defaultdict(float)
+            for token in set(tokenize(query)):
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / average_length)
+                    scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
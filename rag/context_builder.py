@@ -0,0 +1,171 @@
+"""
+컨텍스트 빌더 - 검색된 청크를 중복 없이 합쳐 토큰 예산 안에 담기
+"""
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+from config import settings
+
+
+# 토큰 수 추정에 쓰는 UTF-8 바이트 수 (영문 약 4자, 한글 약 1.3자가 1토큰)
+BYTES_PER_TOKEN = 4
+
+# 이보다 짧은 접미사/접두사 일치는 우연으로 보고 병합하지 않음
+MIN_OVERLAP_CHARS = 20
+
+# 청크 사이 구분자
+SEPARATOR = "\n\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수 추정 (모델 토크나이저 없이 UTF-8 바이트 수 기준)
+
+    Args:
+        text: 텍스트
+
+    Returns:
+        int: 추정 토큰 수
+    """
+    return math.ceil(len(text.encode("utf-8")) / BYTES_PER_TOKEN)
+
+
+def find_overlap(left: str, right: str, max_overlap: int) -> int:
+    """
+    left의 끝과 right의 앞이 겹치는 가장 긴 길이 찾기
+
+    Args:
+        left: 앞 청크 텍스트
+        right: 뒤 청크 텍스트
+        max_overlap: 확인할 최대 겹침 길이
+
+    Returns:
+        int: 겹치는 문자 수 (MIN_OVERLAP_CHARS 미만이면 0)
+    """
+    tail = left[-max_overlap:]
+    for start in range(len(tail) - MIN_OVERLAP_CHARS + 1):
+        if right.startswith(tail[start:]):
+            return len(tail) - start
+    return 0
+
+
+class ContextBuilder:
+    """검색된 청크로 프롬프트 컨텍스트를 만드는 클래스"""
+
+    def __init__(self, max_overlap: int = None):
+        """
+        초기화
+
+        Args:
+            max_overlap: 인접 청크 병합 시 확인할 최대 겹침 길이 (기본값: CHUNK_OVERLAP의 2배)
+        """
+        self.max_overlap = max_overlap or max(settings.CHUNK_OVERLAP * 2, MIN_OVERLAP_CHARS)
+
+    @staticmethod
+    def _source_key(doc: Document) -> tuple:
+        """같은 원문에서 나온 청크인지 판별하는 키 (출처, 페이지)"""
+        return doc.metadata.get("source"), doc.metadata.get("page")
+
+    def _merge(self, documents: List[Document]) -> List[Dict[str, Any]]:
+        """
+        중복 청크를 제거하고 같은 출처의 겹치는 청크를 이어 붙이기
+
+        Args:
+            documents: 관련성 순 문서 리스트
+
+        Returns:
+            List[Dict]: {"text", "rank", "key"} 그룹 리스트 (rank는 가장 관련성 높은 청크의 순위)
+        """
+        groups: List[Dict[str, Any]] = []
+        for rank, doc in enumerate(documents):
+            text = doc.page_content.strip()
+            # 이미 포함된 내용(동일 청크, 다른 청크에 포함된 조각)은 버림
+            if not text or any(text in group["text"] for group in groups):
+                continue
+            contained = [group for group in groups if group["text"] in text]
+            if contained:
+                rank = min(group["rank"] for group in contained)
+                groups = [group for group in groups if group not in contained]
+            groups.append({"text": text, "rank": rank, "key": self._source_key(doc)})
+
+        # 겹치는 청크가 없을 때까지 이어 붙이기 (A+B 다음 (A+B)+C 처럼 연쇄 병합)
+        merged = True
+        while merged:
+            merged = False
+            for i, left in enumerate(groups):
+                for j, right in enumerate(groups):
+                    if i == j or left["key"] != right["key"]:
+                        continue
+                    overlap = find_overlap(left["text"], right["text"], self.max_overlap)
+                    if overlap:
+                        left["text"] += right["text"][overlap:]
+                        left["rank"] = min(left["rank"], right["rank"])
+                        del groups[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+        return groups
+
+    @staticmethod
+    def _truncate(text: str, max_tokens: int) -> str:
+        """토큰 예산에 맞게 텍스트 뒷부분을 공백 경계에서 자르기"""
+        encoded = text.encode("utf-8")[:max_tokens * BYTES_PER_TOKEN]
+        cut = encoded.decode("utf-8", errors="ignore")
+        boundary = cut.rfind(" ")
+        if boundary > len(cut) // 2:
+            cut = cut[:boundary]
+        return cut.rstrip()
+
+    def build(self, documents: List[Document], max_tokens: int = None,
+              compress: Optional[Callable[[List[str]], List[str]]] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        청크를 병합하고 관련성 순으로 토큰 예산 안에 담아 컨텍스트 생성
+
+        예산을 넘는 그룹은 건너뛰고 더 작은 다음 그룹을 시도하며,
+        가장 관련성 높은 그룹 하나가 예산보다 크면 잘라서 넣습니다.
+        compress가 주어지면 병합 후, 예산에 담기 전에 적용합니다.
+
+        Args:
+            documents: 관련성 순 문서 리스트
+            max_tokens: 컨텍스트 토큰 예산 (기본값: CONTEXT_MAX_TOKENS, 0이면 제한 없음)
+            compress: 관련성 순 텍스트 리스트를 받아 줄인 리스트를 반환하는 함수
+
+        Returns:
+            Tuple[str, Dict]: (컨텍스트 텍스트, 통계 - 입력 청크/병합 후 그룹/포함 그룹/추정 토큰 수,
+                              압축 시 압축률과 소요 시간)
+        """
+        max_tokens = settings.CONTEXT_MAX_TOKENS if max_tokens is None else max_tokens
+        groups = sorted(self._merge(documents), key=lambda group: group["rank"])
+        texts = [group["text"] for group in groups]
+        stats: Dict[str, Any] = {"chunks": len(documents), "groups": len(groups)}
+
+        if compress is not None and texts:
+            started = time.perf_counter()
+            before = sum(estimate_tokens(text) for text in texts)
+            texts = compress(texts)
+            after = sum(estimate_tokens(text) for text in texts)
+            stats["compression_ratio"] = round(after / before, 4) if before else 1.0
+            stats["compression_seconds"] = round(time.perf_counter() - started, 4)
+
+        separator_tokens = estimate_tokens(SEPARATOR)
+        parts: List[str] = []
+        used = 0
+        for text in texts:
+            tokens = estimate_tokens(text) + (separator_tokens if parts else 0)
+            if max_tokens and used + tokens > max_tokens:
+                if parts:
+                    continue
+                text = self._truncate(text, max_tokens)
+                tokens = estimate_tokens(text)
+            parts.append(text)
+            used += tokens
+
+        stats["included"] = len(parts)
+        stats["tokens"] = used
+        return SEPARATOR.join(parts), stats
+
+
+# 전역 인스턴스
+context_builder = ContextBuilder()
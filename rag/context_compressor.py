@@ -0,0 +1,110 @@
+"""
+컨텍스트 압축 - 질문과 관련된 문장만 남기는 추출식 압축
+"""
+import re
+from typing import List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from models.embedding_cache import CachedEmbeddings, EmbeddingCacheStore
+from config import settings
+
+
+# 문장 경계: 종결 부호 뒤 공백 또는 줄바꿈
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    텍스트를 문장 단위로 분리
+
+    Args:
+        text: 원본 텍스트
+
+    Returns:
+        List[str]: 빈 문장을 제외한 문장 리스트
+    """
+    return [sentence.strip() for sentence in _SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+class ContextCompressor:
+    """질문 임베딩과의 코사인 유사도로 문장을 골라 컨텍스트를 줄이는 클래스"""
+
+    def __init__(self, embeddings: Optional[Embeddings] = None):
+        """
+        초기화
+
+        Args:
+            embeddings: 임베딩 모델 (기본값: 벡터 스토어와 같은 임베딩)
+        """
+        self._embeddings = embeddings
+        self._sentence_embeddings: Optional[Embeddings] = None
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """임베딩 모델 lazy loading (질문 임베딩은 임베딩 캐시를 거침)"""
+        if self._embeddings is None:
+            from rag.vector_store import vector_store_manager
+            self._embeddings = vector_store_manager.embeddings
+        return self._embeddings
+
+    @property
+    def sentence_embeddings(self) -> Embeddings:
+        """
+        문장 임베딩 모델
+
+        검색된 청크의 문장을 모두 디스크 캐시에 넣으면 SQLite 파일이 끝없이 커지므로,
+        임베딩 캐시 대신 CONTEXT_COMPRESSION_CACHE_MAX_ITEMS개로 제한된 메모리 LRU만 거칩니다.
+        """
+        if self._sentence_embeddings is None:
+            embeddings = self.embeddings
+            if isinstance(embeddings, CachedEmbeddings):
+                embeddings = CachedEmbeddings(
+                    underlying=embeddings.underlying,
+                    model_name=embeddings.model_name,
+                    store=EmbeddingCacheStore(max_memory_items=settings.CONTEXT_COMPRESSION_CACHE_MAX_ITEMS),
+                )
+            self._sentence_embeddings = embeddings
+        return self._sentence_embeddings
+
+    def compress(self, question: str, texts: List[str], max_sentences: int = None) -> List[str]:
+        """
+        질문과 유사도가 높은 문장만 원래 순서대로 남기기
+
+        캐시에 없는 문장을 한 번의 /api/embed 요청으로 임베딩하고, 행렬-벡터 곱 한 번으로
+        질문과의 코사인 유사도를 계산해 상위 max_sentences개를 고릅니다.
+
+        Args:
+            question: 질문
+            texts: 관련성 순 컨텍스트 텍스트 리스트
+            max_sentences: 남길 최대 문장 수 (기본값: CONTEXT_COMPRESSION_MAX_SENTENCES)
+
+        Returns:
+            List[str]: 압축된 텍스트 리스트 (남은 문장이 없는 텍스트는 제외)
+        """
+        max_sentences = max_sentences or settings.CONTEXT_COMPRESSION_MAX_SENTENCES
+        sentences = [split_sentences(text) for text in texts]
+        flat = [sentence for group in sentences for sentence in group]
+        if len(flat) <= max_sentences:
+            return texts
+
+        matrix = np.asarray(self.sentence_embeddings.embed_documents(flat), dtype=np.float32)
+        query = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+        scores = matrix @ query
+
+        keep = np.zeros(len(flat), dtype=bool)
+        keep[np.argpartition(-scores, max_sentences - 1)[:max_sentences]] = True
+
+        compressed: List[str] = []
+        position = 0
+        for group in sentences:
+            kept = [sentence for offset, sentence in enumerate(group) if keep[position + offset]]
+            position += len(group)
+            if kept:
+                compressed.append(" ".join(kept))
+        return compressed
+
+
+# 전역 인스턴스
+context_compressor = ContextCompressor()
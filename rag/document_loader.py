@@ -1,8 +1,11 @@
 """
 문서 로더 - 다양한 형식의 문서를 로드하고 전처리
 """
+import multiprocessing
 import os
-from typing import List
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Iterator, List, Optional, Tuple
 from langchain_core.documents import Document
 from langchain_community.document_loaders import (
     PyPDFLoader,
@@ -10,9 +13,33 @@ from langchain_community.document_loaders import (
     DirectoryLoader
 )
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from utils.tracing import record_span
 from config import settings
 
 
+# 지원하는 문서 확장자
+SUPPORTED_EXTENSIONS = ('.pdf', '.txt', '.md')
+
+
+def _load_and_split_worker(file_path: str) -> Tuple[str, List[Document], int]:
+    """
+    프로세스 풀 워커 - 파일 하나를 로드하고 청크로 분할
+    
+    Args:
+        file_path: 파일 경로
+        
+    Returns:
+        Tuple: (파일 경로, 청크 리스트, 페이지 수)
+    """
+    processor = document_processor
+    pages = 0
+    chunks: List[Document] = []
+    for page in processor.iter_pages(file_path):
+        pages += 1
+        chunks.extend(processor.text_splitter.split_documents([page]))
+    return file_path, chunks, pages
+
+
 class DocumentProcessor:
     """문서 처리 클래스"""
     
@@ -86,6 +113,72 @@ class DocumentProcessor:
         
         return documents
     
+    def iter_directory_files(self, directory_path: str) -> Iterator[str]:
+        """
+        디렉토리 내 지원 형식 파일 경로를 재귀적으로 나열
+        
+        Args:
+            directory_path: 디렉토리 경로
+            
+        Yields:
+            str: 파일 경로
+        """
+        for root, _, filenames in os.walk(directory_path):
+            for filename in sorted(filenames):
+                if os.path.splitext(filename)[1].lower() in SUPPORTED_EXTENSIONS:
+                    yield os.path.join(root, filename)
+    
+    def iter_directory_parallel(
+        self,
+        directory_path: str,
+        max_workers: int = None,
+        skip: Optional[Callable[[str], bool]] = None
+    ) -> Iterator[Tuple[str, Optional[List[Document]], int, Optional[Exception]]]:
+        """
+        프로세스 풀로 디렉토리 내 문서를 병렬 로드 및 분할
+        
+        PDF 텍스트 추출은 CPU 연산이므로 여러 프로세스에 분산하고,
+        끝난 순서대로 결과를 반환합니다. 동시에 처리 중인 파일 수를
+        워커 수의 두 배로 제한하여 메모리 사용량을 일정하게 유지합니다.
+        
+        Args:
+            directory_path: 디렉토리 경로
+            max_workers: 프로세스 수 (기본값: INGEST_PROCESS_WORKERS 또는 CPU 수)
+            skip: True를 반환하면 해당 파일을 건너뛰는 함수 (이미 수집된 파일 등)
+            
+        Yields:
+            Tuple: (파일 경로, 청크 리스트, 페이지 수, 오류) - 실패 시 청크는 None
+        """
+        max_workers = max_workers or settings.INGEST_PROCESS_WORKERS or os.cpu_count() or 1
+        files = (
+            path for path in self.iter_directory_files(directory_path)
+            if skip is None or not skip(path)
+        )
+        
+        # fork는 부모 프로세스의 스레드 상태를 복제하므로 spawn 사용
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            in_flight = {}
+            
+            def fill():
+                while len(in_flight) < max_workers * 2:
+                    path = next(files, None)
+                    if path is None:
+                        return
+                    in_flight[executor.submit(_load_and_split_worker, path)] = path
+            
+            fill()
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    path = in_flight.pop(future)
+                    try:
+                        _, chunks, pages = future.result()
+                        yield path, chunks, pages, None
+                    except Exception as e:
+                        yield path, None, 0, e
+                fill()
+    
     def load_document(self, file_path: str) -> List[Document]:
         """
         파일 확장자에 따라 자동으로 적절한 로더 선택
@@ -106,6 +199,101 @@ class DocumentProcessor:
         else:
             raise ValueError(f"지원하지 않는 파일 형식입니다: {ext}")
     
+    def _get_loader(self, file_path: str):
+        """
+        파일 확장자에 맞는 로더 반환
+        
+        Args:
+            file_path: 파일 경로
+            
+        Returns:
+            BaseLoader: 문서 로더
+        """
+        _, ext = os.path.splitext(file_path)
+        ext = ext.lower()
+        
+        if ext == '.pdf':
+            return PyPDFLoader(file_path)
+        elif ext in ['.txt', '.md']:
+            return TextLoader(file_path, encoding='utf-8')
+        else:
+            raise ValueError(f"지원하지 않는 파일 형식입니다: {ext}")
+    
+    def iter_pages(self, file_path: str) -> Iterator[Document]:
+        """
+        문서를 페이지 단위로 지연 로드
+        
+        전체 페이지를 메모리에 올리지 않고 한 페이지씩 반환합니다.
+        
+        Args:
+            file_path: 파일 경로
+            
+        Yields:
+            Document: 페이지 문서
+        """
+        yield from self._get_loader(file_path).lazy_load()
+    
+    def iter_chunks(self, file_path: str,
+                    on_page: Optional[Callable[[Document], None]] = None) -> Iterator[Document]:
+        """
+        페이지 → 청크 생성기 파이프라인
+        
+        Args:
+            file_path: 파일 경로
+            on_page: 페이지를 읽을 때마다 호출할 콜백
+            
+        Yields:
+            Document: 문서 청크
+        """
+        # 페이지 로드와 분할이 번갈아 진행되므로 각각의 시간을 합산해 추적에 기록
+        parse_seconds = split_seconds = 0.0
+        pages = chunks = 0
+        page_iter = self.iter_pages(file_path)
+        try:
+            while True:
+                started = time.perf_counter()
+                page = next(page_iter, None)
+                parse_seconds += time.perf_counter() - started
+                if page is None:
+                    break
+                pages += 1
+                if on_page is not None:
+                    on_page(page)
+                started = time.perf_counter()
+                split = self.text_splitter.split_documents([page])
+                split_seconds += time.perf_counter() - started
+                chunks += len(split)
+                yield from split
+        finally:
+            record_span("parse", parse_seconds, pages=pages)
+            record_span("split", split_seconds, chunks=chunks)
+    
+    def iter_chunk_batches(self, file_path: str, batch_size: int = None,
+                           on_page: Optional[Callable[[Document], None]] = None) -> Iterator[List[Document]]:
+        """
+        페이지 → 청크 → 임베딩 배치 생성기 파이프라인
+        
+        한 번에 batch_size개의 청크만 메모리에 유지하므로 파일 크기와
+        관계없이 메모리 사용량이 일정합니다.
+        
+        Args:
+            file_path: 파일 경로
+            batch_size: 배치당 청크 수
+            on_page: 페이지를 읽을 때마다 호출할 콜백
+            
+        Yields:
+            List[Document]: 청크 배치
+        """
+        batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        batch: List[Document] = []
+        for chunk in self.iter_chunks(file_path, on_page=on_page):
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
     def split_documents(self, documents: List[Document]) -> List[Document]:
         """
         문서를 청크로 분할
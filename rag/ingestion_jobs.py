@@ -0,0 +1,404 @@
+"""
+문서 수집 작업 큐 - 업로드된 문서를 백그라운드에서 처리
+"""
+import asyncio
+import os
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from rag.document_loader import document_processor
+from rag.manifest import source_manifest, compute_file_hash, lock_source
+from rag.vector_store import vector_store_manager
+from utils.concurrency import run_blocking
+from utils.tracing import current_trace_id, span, tracer
+from config import settings
+
+
+class QueueFullError(Exception):
+    """작업 큐가 가득 차서 새 작업을 받을 수 없음"""
+
+
+class SourceRemovedError(Exception):
+    """작업이 잠금을 기다리는 동안 출처 파일이 삭제됨"""
+
+
+class IngestionJob:
+    """문서 수집 작업 상태"""
+
+    def __init__(self, filename: str, file_path: str, kind: str = "file"):
+        """
+        초기화
+
+        Args:
+            filename: 원본 파일명 (디렉토리 작업이면 디렉토리 이름)
+            file_path: 저장된 파일 경로 (디렉토리 작업이면 디렉토리 경로)
+            kind: 작업 종류 ("file" 또는 "directory")
+        """
+        self.job_id = uuid.uuid4().hex
+        self.filename = filename
+        self.file_path = file_path
+        self.kind = kind
+        self.status = "queued"  # queued → running → completed | failed
+        self.trace_id = current_trace_id()  # 업로드 요청의 추적 ID (수집 추적에 이어서 사용)
+
+        # 진행 상황
+        self.files = 0
+        self.pages = 0
+        self.chunks = 0
+        self.embedded = 0
+        self.skipped = 0
+
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        """작업 종료 여부"""
+        return self.status in ("completed", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        작업 상태를 딕셔너리로 변환
+
+        Returns:
+            dict: 작업 상태
+        """
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": {
+                "files": self.files,
+                "pages": self.pages,
+                "chunks": self.chunks,
+                "embedded": self.embedded,
+                "skipped": self.skipped,
+            },
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class IngestionJobManager:
+    """문서 수집 작업 큐 및 워커 풀 관리 클래스"""
+
+    def __init__(self, concurrency: int = None, queue_size: int = None,
+                 max_history: int = None):
+        """
+        초기화
+
+        Args:
+            concurrency: 동시에 실행할 워커 수
+            queue_size: 대기 큐 최대 크기 (가득 차면 업로드에 backpressure 적용)
+            max_history: 보관할 작업 상태 최대 개수
+        """
+        self.concurrency = concurrency or settings.INGEST_WORKERS
+        self.queue_size = queue_size or settings.INGEST_QUEUE_SIZE
+        self.max_history = max_history or settings.INGEST_JOB_HISTORY
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+
+    async def start(self) -> None:
+        """워커 풀 시작"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"ingestion-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        """워커 풀 종료 (대기 중인 작업은 버림)"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def submit(self, filename: str, file_path: str,
+                     timeout: float = None, kind: str = "file") -> IngestionJob:
+        """
+        새 수집 작업 등록
+
+        큐가 가득 차 있으면 최대 timeout초 동안 빈자리를 기다리고,
+        그래도 자리가 없으면 QueueFullError를 발생시킵니다.
+
+        Args:
+            filename: 원본 파일명
+            file_path: 저장된 파일 경로
+            timeout: 큐 대기 최대 시간(초)
+            kind: 작업 종류 ("file" 또는 "directory")
+
+        Returns:
+            IngestionJob: 등록된 작업
+        """
+        if self._queue is None:
+            await self.start()
+        timeout = settings.INGEST_ENQUEUE_TIMEOUT if timeout is None else timeout
+
+        job = IngestionJob(filename, file_path, kind=kind)
+        try:
+            await asyncio.wait_for(self._queue.put(job), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise QueueFullError(
+                f"수집 작업 큐가 가득 찼습니다 (최대 {self.queue_size}개). 잠시 후 다시 시도해주세요."
+            )
+        self._remember(job)
+        return job
+
+    def is_full(self) -> bool:
+        """큐가 가득 찼는지 여부"""
+        return self._queue is not None and self._queue.full()
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        """
+        작업 조회
+
+        Args:
+            job_id: 작업 ID
+
+        Returns:
+            Optional[IngestionJob]: 작업 (없으면 None)
+        """
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        큐 상태 통계 반환
+
+        Returns:
+            dict: 워커 수, 대기 작업 수, 상태별 작업 수
+        """
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.concurrency,
+            "queue_size": self.queue_size,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "jobs": counts,
+        }
+
+    def _remember(self, job: IngestionJob) -> None:
+        """작업 상태 보관 (오래된 종료 작업부터 정리)"""
+        self._jobs[job.job_id] = job
+        if len(self._jobs) > self.max_history:
+            for job_id in [j for j, item in self._jobs.items() if item.done]:
+                if len(self._jobs) <= self.max_history:
+                    break
+                del self._jobs[job_id]
+
+    async def _worker(self) -> None:
+        """큐에서 작업을 꺼내 차례로 실행"""
+        while True:
+            job = await self._queue.get()
+            try:
+                await run_blocking(self._run_job, job)
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, job: IngestionJob) -> None:
+        """
+        작업 실행 (워커 스레드에서 호출)
+
+        Args:
+            job: 실행할 작업
+        """
+        job.status = "running"
+        job.started_at = time.time()
+        # 업로드 요청과 같은 추적 ID로 수집 과정(해시 → 파싱 → 분할 → 임베딩 → 기록)을 별도 기록
+        with tracer.start("ingest", trace_id=job.trace_id, job_id=job.job_id,
+                          filename=job.filename, kind=job.kind) as trace:
+            try:
+                if job.kind == "directory":
+                    self._run_directory_job(job)
+                else:
+                    self._run_file_job(job)
+                job.status = "completed"
+            except SourceRemovedError as e:
+                # 먼저 처리된 DELETE를 되돌리지 않도록 다시 수집하지 않음
+                job.error = str(e)
+                job.status = "failed"
+            except Exception as e:
+                print(f"\n{'='*60}")
+                print(f"문서 수집 작업 오류 발생! (job_id={job.job_id})")
+                print(f"{'='*60}")
+                print(traceback.format_exc())
+                print(f"{'='*60}\n")
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.finished_at = time.time()
+                trace.set(status=job.status, pages=job.pages, chunks=job.chunks, embedded=job.embedded)
+
+    def _sync_source(self, job: IngestionJob, filename: str, file_path: str,
+                     batches, size: int, file_hash: str) -> Dict[str, Any]:
+        """
+        청크 배치를 증분 수집하고 매니페스트에 기록
+
+        Args:
+            job: 진행 상황을 갱신할 작업
+            filename: 매니페스트에 기록할 파일명
+            file_path: 출처 파일 경로
+            batches: 청크 배치 이터러블
+            size: 파일 크기
+            file_hash: 파일 해시
+
+        Returns:
+            Dict: 증분 수집 리포트
+        """
+        def count_chunks(items):
+            for batch in items:
+                job.chunks += len(batch)
+                yield batch
+
+        def on_batch(batch, embedded):
+            job.embedded += embedded
+            job.skipped += len(batch) - embedded
+
+        # 변경된 청크만 임베딩하고 사라진 청크는 삭제 (재업로드 시 멱등)
+        report = vector_store_manager.sync_document_batches(
+            file_path, count_chunks(batches), on_batch=on_batch
+        )
+        source_manifest.record(filename, file_path, report["chunk_ids"], size, file_hash)
+        job.files += 1
+        return report
+
+    def _run_file_job(self, job: IngestionJob) -> None:
+        """
+        파일 하나 수집
+
+        Args:
+            job: 실행할 작업
+        """
+        # 같은 파일의 다른 수집 작업이나 DELETE가 끝날 때까지 대기
+        with lock_source(job.file_path):
+            if not os.path.exists(job.file_path):
+                raise SourceRemovedError(f"수집 전에 파일이 삭제되었습니다: {job.filename}")
+
+            # 매니페스트의 해시와 같으면 파싱/임베딩 없이 종료
+            size = os.path.getsize(job.file_path)
+            with span("hash", bytes=size):
+                file_hash = compute_file_hash(job.file_path)
+            entry = source_manifest.get(job.filename)
+            if entry is not None and entry["hash"] == file_hash and entry["source"] == job.file_path:
+                job.chunks = job.skipped = len(entry["chunk_ids"])
+                job.files = 1
+                job.result = {
+                    "filename": job.filename,
+                    "unchanged": True,
+                    "chunks": job.chunks,
+                    "added": 0,
+                    "skipped": job.chunks,
+                    "deleted": 0,
+                    "total_documents": vector_store_manager.get_collection_count(),
+                }
+                return
+
+            # 페이지 → 청크 → 배치 → 벡터 스토어 파이프라인 (메모리 사용량 일정)
+            def on_page(page):
+                job.pages += 1
+
+            batches = document_processor.iter_chunk_batches(job.file_path, on_page=on_page)
+            report = self._sync_source(job, job.filename, job.file_path, batches, size, file_hash)
+
+        job.result = {
+            "filename": job.filename,
+            "unchanged": False,
+            "pages": job.pages,
+            "chunks": job.chunks,
+            "added": report["added"],
+            "skipped": report["skipped"],
+            "deleted": report["deleted"],
+            "total_documents": vector_store_manager.get_collection_count(),
+            "throughput": report["throughput"],
+        }
+
+    def _run_directory_job(self, job: IngestionJob) -> None:
+        """
+        디렉토리 전체 병렬 수집
+
+        파싱과 분할은 프로세스 풀에서 진행하고, 끝난 파일부터 차례로
+        증분 수집합니다. 매니페스트상 변경되지 않은 파일은 건너뜁니다.
+
+        Args:
+            job: 실행할 작업
+        """
+        directory = job.file_path
+        started = time.perf_counter()
+        unchanged = []
+        failed = {}
+        hashes = {}
+        added = skipped = deleted = 0
+
+        def relative_name(path: str) -> str:
+            return os.path.relpath(path, directory)
+
+        def is_current(path: str, file_hash: str) -> bool:
+            entry = source_manifest.get(relative_name(path))
+            return entry is not None and entry["source"] == path and entry["hash"] == file_hash
+
+        def skip(path: str) -> bool:
+            # 파싱 전에 해시를 구해 두어야 파싱 중 파일이 바뀌어도 다음 동기화에서 다시 수집됨
+            size, file_hash = os.path.getsize(path), compute_file_hash(path)
+            if is_current(path, file_hash):
+                unchanged.append(relative_name(path))
+                return True
+            hashes[path] = (size, file_hash)
+            return False
+
+        batch_size = settings.INGEST_BATCH_SIZE
+        for path, chunks, pages, error in document_processor.iter_directory_parallel(directory, skip=skip):
+            if error is not None:
+                hashes.pop(path, None)
+                failed[relative_name(path)] = str(error)
+                continue
+            job.pages += pages
+            size, file_hash = hashes.pop(path)
+            batches = (chunks[i:i + batch_size] for i in range(0, len(chunks), batch_size))
+            with lock_source(path):
+                # 파싱하는 동안 삭제되었거나 다른 작업이 같은 버전을 이미 수집한 파일은 건너뜀
+                if not os.path.exists(path):
+                    failed[relative_name(path)] = "수집 전에 파일이 삭제되었습니다"
+                    continue
+                if is_current(path, file_hash):
+                    unchanged.append(relative_name(path))
+                    continue
+                report = self._sync_source(job, relative_name(path), path, batches, size, file_hash)
+            added += report["added"]
+            skipped += report["skipped"]
+            deleted += report["deleted"]
+
+        seconds = time.perf_counter() - started
+        job.result = {
+            "directory": directory,
+            "files": job.files,
+            "unchanged_files": len(unchanged),
+            "failed_files": failed,
+            "pages": job.pages,
+            "chunks": job.chunks,
+            "added": added,
+            "skipped": skipped,
+            "deleted": deleted,
+            "total_documents": vector_store_manager.get_collection_count(),
+            "throughput": {
+                "chunks": job.chunks,
+                "seconds": round(seconds, 3),
+                "chunks_per_second": round(job.chunks / seconds, 2) if seconds > 0 else 0.0,
+            },
+        }
+
+
+# 전역 인스턴스
+ingestion_job_manager = IngestionJobManager()
@@ -0,0 +1,196 @@
+"""
+소스 매니페스트 - 파일별 청크 ID, 크기, 해시, 수집 시각 기록
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import AbstractContextManager
+from typing import Any, Dict, List, Optional
+from utils.keyed_lock import KeyedLock
+from config import settings
+
+
+def compute_file_hash(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """
+    파일 내용의 sha256 해시 계산 (블록 단위로 읽음)
+
+    Args:
+        file_path: 파일 경로
+        block_size: 한 번에 읽을 바이트 수
+
+    Returns:
+        str: sha256 해시
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SourceManifest:
+    """수집된 소스 파일 정보를 JSON 파일로 영구 보관하는 클래스"""
+
+    def __init__(self, path: str = None):
+        """
+        초기화
+
+        Args:
+            path: 매니페스트 파일 경로 (기본값: 벡터 스토어 디렉토리의 manifest.json)
+        """
+        self.path = path or os.path.join(settings.VECTOR_STORE_PATH, "manifest.json")
+        self._lock = threading.RLock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._stamp = None  # 마지막으로 읽은 파일의 (inode, 크기, 수정 시각)
+
+    def _file_stamp(self) -> Optional[tuple]:
+        """매니페스트 파일 식별값 (없으면 None)"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        매니페스트 로드
+
+        다른 uvicorn 워커가 파일을 교체했으면 다시 읽습니다 (저장은 항상 새 파일로 교체).
+        """
+        stamp = self._file_stamp()
+        if self._entries is None or stamp != self._stamp:
+            if stamp is not None:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            else:
+                self._entries = {}
+            self._stamp = stamp
+        return self._entries
+
+    def _save(self) -> None:
+        """임시 파일에 쓴 뒤 교체하여 원자적으로 저장"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+        self._stamp = self._file_stamp()
+
+    def _write_lock(self) -> AbstractContextManager:
+        """쓰기 잠금 (다른 워커의 기록을 덮어쓰지 않도록 최신 파일을 읽고 고친 뒤 저장)"""
+        return source_locks.hold(os.path.abspath(self.path))
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        """
+        파일 정보 조회
+
+        Args:
+            filename: 파일명
+
+        Returns:
+            Optional[Dict]: 파일 정보 (없으면 None)
+        """
+        with self._lock:
+            entry = self._load().get(filename)
+            return dict(entry) if entry is not None else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """
+        전체 파일 정보 목록 (청크 ID 제외)
+
+        Returns:
+            List[Dict]: 파일명, 출처 경로, 크기, 해시, 청크 수, 수집 시각
+        """
+        with self._lock:
+            return [
+                {
+                    "filename": filename,
+                    "source": entry["source"],
+                    "size": entry["size"],
+                    "hash": entry["hash"],
+                    "chunks": len(entry["chunk_ids"]),
+                    "ingested_at": entry["ingested_at"],
+                }
+                for filename, entry in sorted(self._load().items())
+            ]
+
+    def record(self, filename: str, source: str, chunk_ids: List[str],
+               size: int, file_hash: str) -> None:
+        """
+        파일 수집 결과 기록
+
+        Args:
+            filename: 파일명
+            source: 출처 파일 경로 (청크 메타데이터의 source 값)
+            chunk_ids: 파일에서 생성된 청크 ID 리스트
+            size: 파일 크기(바이트)
+            file_hash: 파일 내용 sha256 해시
+        """
+        with self._lock, self._write_lock():
+            self._load()[filename] = {
+                "source": source,
+                "chunk_ids": list(chunk_ids),
+                "size": size,
+                "hash": file_hash,
+                "ingested_at": time.time(),
+            }
+            self._save()
+
+    def remove(self, filename: str) -> Optional[Dict[str, Any]]:
+        """
+        파일 정보 삭제
+
+        Args:
+            filename: 파일명
+
+        Returns:
+            Optional[Dict]: 삭제된 파일 정보 (없으면 None)
+        """
+        with self._lock, self._write_lock():
+            entry = self._load().pop(filename, None)
+            if entry is not None:
+                self._save()
+            return entry
+
+    def clear(self) -> None:
+        """전체 기록 삭제"""
+        with self._lock, self._write_lock():
+            self._entries = {}
+            self._save()
+
+    def total_chunks(self) -> int:
+        """
+        기록된 전체 청크 수
+
+        Returns:
+            int: 청크 수
+        """
+        with self._lock:
+            return sum(len(entry["chunk_ids"]) for entry in self._load().values())
+
+
+def lock_source(source: str) -> AbstractContextManager:
+    """
+    출처 파일 하나의 수집/교체/삭제를 직렬화하는 잠금
+
+    같은 파일의 작업이 겹치면 두 버전의 청크가 함께 남거나, 진행 중인 수집이
+    끝나면서 매니페스트를 다시 기록해 삭제를 되돌릴 수 있으므로
+    스냅샷 → 추가 → 오래된 청크 삭제 → 매니페스트 기록을 이 잠금 안에서 진행합니다.
+
+    Args:
+        source: 출처 파일 경로
+
+    Returns:
+        AbstractContextManager: with 문에 쓸 잠금
+    """
+    return source_locks.hold(os.path.abspath(source))
+
+
+# 전역 인스턴스
+source_manifest = SourceManifest()
+source_locks = KeyedLock(os.path.join(settings.VECTOR_STORE_PATH, "locks"))
@@ -0,0 +1,798 @@
+"""
+NumPy 벡터 스토어 - 메모리 맵 float32 행렬 기반의 경량 벡터 인덱스
+"""
+import json
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+try:
+    import fcntl
+except ImportError:  # Windows - 프로세스 간 쓰기 잠금 없이 동작 (단일 프로세스 쓰기만 안전)
+    fcntl = None
+
+
+# 1차 검색용 양자화 방식
+QUANTIZATION_MODES = ("none", "float16", "int8")
+
+# 양자화 행렬을 float32로 변환하며 검색할 블록 행 수 (변환 결과가 CPU 캐시에 머물도록 작게 유지)
+QUANTIZED_BLOCK_ROWS = 512
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """행 단위 단위 벡터 정규화 (영벡터는 그대로 둠)"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def quantize(vectors: np.ndarray, mode: str) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    1차 검색용 양자화 벡터 생성
+
+    int8은 행마다 최대 절댓값을 127로 맞추는 대칭 스케일을 사용합니다.
+
+    Args:
+        vectors: float32 행렬
+        mode: "none", "float16", "int8"
+
+    Returns:
+        Tuple: (양자화 행렬, int8 행별 스케일) - 해당 없는 값은 None
+    """
+    if mode == "float16":
+        return vectors.astype(np.float16), None
+    if mode == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+        return np.round(vectors / scales[:, None]).astype(np.int8), scales
+    return None, None
+
+
+class NumpyCollection:
+    """
+    메모리 맵 파일에 저장되는 벡터 컬렉션
+
+    ChromaDB Collection과 같은 형태의 upsert/get/delete/query/count를 제공하여
+    VectorStoreManager가 백엔드와 상관없이 같은 코드로 동작하도록 합니다.
+
+    저장 형식 (CURRENT 파일이 가리키는 세대 디렉토리 gen-* 아래):
+        info.json     - 벡터 차원, 양자화 방식
+        vectors.f32   - 단위 벡터로 정규화한 float32 행렬 (행 단위로 이어 붙임)
+        vectors.f16   - (float16 모드) 1차 검색용 float16 행렬
+        vectors.i8    - (int8 모드) 1차 검색용 int8 행렬, scales.f32에 행별 스케일
+        documents.txt - 청크 본문을 이어 붙인 UTF-8 파일
+        records.jsonl - 행마다 한 줄: ID, 메타데이터, 본문 위치
+        deleted.txt   - 삭제된 행 번호
+
+    파일은 모두 추가 전용이므로 여러 프로세스가 같은 페이지를 복사 없이 공유하고,
+    다른 프로세스가 쓴 변경은 파일의 새로 늘어난 부분만 이어 읽어 반영합니다.
+    쓰기(추가, 삭제, 압축)는 LOCK 파일의 flock으로 프로세스 간에 직렬화하므로
+    여러 uvicorn 워커가 동시에 수집해도 본문 offset과 벡터 행이 어긋나지 않습니다.
+    압축으로 교체된 직전 세대는 다음 세대 교체 때까지 남겨 두고, 그보다 오래된
+    세대를 읽다가 파일이 사라지면 CURRENT를 다시 읽어 새 세대에서 재시도합니다.
+
+    양자화 모드에서는 작은 양자화 행렬만으로 1차 검색을 하고, 후보
+    (k × rescore_factor개)만 디스크의 float32 원본으로 다시 채점합니다.
+    자주 읽히는 페이지가 양자화 행렬뿐이라 같은 메모리에 더 많은 청크를 둘 수 있습니다.
+    """
+
+    def __init__(self, path: str, quantization: str = "none", rescore_factor: int = 4,
+                 block_rows: int = 16384):
+        """
+        초기화
+
+        Args:
+            path: 컬렉션 디렉토리
+            quantization: 새 세대에 사용할 양자화 방식 ("none", "float16", "int8")
+            rescore_factor: 원본으로 다시 채점할 후보 배수 (k × rescore_factor)
+            block_rows: 검색 시 한 번에 행렬 곱을 계산할 행 수
+        """
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"지원하지 않는 양자화 방식입니다: {quantization}")
+        self.path = path
+        self.quantization = quantization
+        self.rescore_factor = max(1, rescore_factor)
+        self.block_rows = block_rows
+        self._lock = threading.RLock()
+        self._write_depth = 0  # 같은 스레드의 중첩 쓰기 (upsert → compact)
+        self._lock_file = None
+        os.makedirs(self.path, exist_ok=True)
+        self._reset_state(None)
+        self._refresh()
+
+    def _file(self, name: str, generation: str = None) -> str:
+        """세대 디렉토리 안의 파일 경로"""
+        return os.path.join(self.path, generation or self._generation, name)
+
+    def _read_current(self) -> Optional[str]:
+        """현재 세대 이름 읽기 (아직 없으면 None)"""
+        try:
+            with open(os.path.join(self.path, "CURRENT"), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _write_current(self, generation: str) -> None:
+        """현재 세대 교체 (원자적)"""
+        temp_path = os.path.join(self.path, "CURRENT.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(generation)
+        os.replace(temp_path, os.path.join(self.path, "CURRENT"))
+
+    @contextmanager
+    def _write_lock(self):
+        """
+        쓰기 잠금 (프로세스 안에서는 RLock, 프로세스 간에는 LOCK 파일 flock)
+
+        잠근 뒤 다른 프로세스가 쓴 변경을 먼저 반영하므로 이어 쓸 위치가 항상 최신입니다.
+        """
+        with self._lock:
+            if self._write_depth == 0 and fcntl is not None:
+                self._lock_file = open(os.path.join(self.path, "LOCK"), "a")
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._write_depth += 1
+            try:
+                self._refresh()
+                yield
+            finally:
+                self._write_depth -= 1
+                if self._write_depth == 0 and self._lock_file is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def _remove_stale_generations(self, keep: Iterable[Optional[str]]) -> None:
+        """keep에 없는 세대 디렉토리 삭제 (쓰기 잠금을 잡은 상태에서 호출)"""
+        keep = set(keep)
+        for name in os.listdir(self.path):
+            if name.startswith("gen-") and name not in keep:
+                # 다른 프로세스가 아직 열고 있을 수 있으므로 실패는 무시
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def _retry_on_generation_change(self, operation):
+        """
+        세대 디렉토리가 지워져 FileNotFoundError가 나면 CURRENT를 다시 읽고 한 번 더 실행
+
+        Args:
+            operation: 실행할 함수 (시작할 때 _refresh()를 호출해야 함)
+
+        Returns:
+            operation의 반환값
+        """
+        try:
+            return operation()
+        except FileNotFoundError:
+            with self._lock:
+                if self._read_current() == self._generation:
+                    raise
+            return operation()
+
+    def _reset_state(self, generation: Optional[str]) -> None:
+        """메모리 상태 초기화 (락을 잡은 상태에서 호출)"""
+        self._generation = generation
+        self.dim: Optional[int] = None
+        self._ids: List[Optional[str]] = []  # 행 → ID (삭제된 행은 None)
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._spans: List[Tuple[int, int]] = []  # 행 → (본문 offset, 길이)
+        self._id_to_row: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._replaced: List[int] = []  # 같은 ID로 덮어써져 삭제 처리할 행
+        self._matrix: Optional[np.ndarray] = None
+        self._stored_quantization = "none"  # 현재 세대의 양자화 방식
+        self._quantized: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._records_size = 0
+        self._deleted_size = 0
+
+    def _refresh(self) -> None:
+        """
+        디스크의 변경 사항을 메모리 상태에 반영 (락을 잡은 상태에서 호출)
+
+        세대가 바뀌었으면(압축/삭제) 처음부터 다시 읽고, 아니면
+        records.jsonl과 deleted.txt에서 새로 추가된 줄만 읽습니다.
+        """
+        with self._lock:
+            self._retry_on_generation_change(self._refresh_once)
+
+    def _refresh_once(self) -> None:
+        """_refresh() 본체"""
+        with self._lock:
+            generation = self._read_current()
+            if generation != self._generation:
+                self._reset_state(generation)
+            if generation is None:
+                return
+
+            if self.dim is None:
+                info_path = self._file("info.json")
+                if not os.path.exists(info_path):
+                    return
+                with open(info_path, "r", encoding="utf-8") as f:
+                    info = json.load(f)
+                self.dim = info["dim"]
+                self._stored_quantization = info.get("quantization", "none")
+
+            rows_before = len(self._ids)
+            lines = self._read_new_lines("records.jsonl", self._records_size)
+            if lines:
+                # 줄마다 파싱하지 않고 한 번에 JSON 배열로 파싱 (열기 시간 단축)
+                for record in json.loads(b"[" + b",".join(lines) + b"]"):
+                    self._apply_record(record)
+                self._records_size += sum(len(line) for line in lines)
+            if len(self._ids) != rows_before:
+                self._alive = np.concatenate([self._alive, np.ones(len(self._ids) - rows_before, dtype=bool)])
+                self._alive[self._replaced] = False
+                self._replaced = []
+                self._map_vectors()
+            for line in self._read_new_lines("deleted.txt", self._deleted_size):
+                if not self._apply_deletion(int(line)):
+                    break
+                self._deleted_size += len(line)
+
+    def _map_vectors(self) -> None:
+        """현재 행 수에 맞게 벡터 파일을 메모리 맵으로 다시 연결"""
+        rows = len(self._ids)
+        self._matrix = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r", shape=(rows, self.dim))
+        if self._stored_quantization == "float16":
+            self._quantized = np.memmap(self._file("vectors.f16"), dtype=np.float16, mode="r", shape=(rows, self.dim))
+        elif self._stored_quantization == "int8":
+            self._quantized = np.memmap(self._file("vectors.i8"), dtype=np.int8, mode="r", shape=(rows, self.dim))
+            self._scales = np.memmap(self._file("scales.f32"), dtype=np.float32, mode="r", shape=(rows,))
+
+    def _read_new_lines(self, name: str, start: int) -> List[bytes]:
+        """
+        파일에서 start 바이트 이후의 완성된 줄 읽기
+
+        다른 프로세스가 아직 쓰는 중인 마지막 줄(줄바꿈 없음)은 제외합니다.
+
+        Returns:
+            List[bytes]: 줄바꿈을 포함한 줄 리스트
+        """
+        path = self._file(name)
+        if not os.path.exists(path) or os.path.getsize(path) <= start:
+            return []
+        with open(path, "rb") as f:
+            f.seek(start)
+            data = f.read()
+        return data[:data.rfind(b"\n") + 1].splitlines(keepends=True)
+
+    def _apply_record(self, record: Dict[str, Any]) -> None:
+        """records.jsonl 레코드 하나 반영"""
+        row = len(self._ids)
+        previous = self._id_to_row.get(record["id"])
+        if previous is not None:
+            self._replaced.append(previous)
+            self._ids[previous] = None
+            self._metadatas[previous] = None
+        self._ids.append(record["id"])
+        self._metadatas.append(record.get("metadata"))
+        self._spans.append((record["offset"], record["length"]))
+        self._id_to_row[record["id"]] = row
+
+    def _apply_deletion(self, row: int) -> bool:
+        """deleted.txt 한 줄 반영 (아직 읽지 못한 행이면 False를 반환해 다음 갱신으로 미룸)"""
+        if row >= len(self._ids):
+            return False
+        doc_id = self._ids[row]
+        if doc_id is not None and self._id_to_row.get(doc_id) == row:
+            del self._id_to_row[doc_id]
+        self._ids[row] = None
+        self._metadatas[row] = None
+        self._alive[row] = False
+        return True
+
+    def _start_generation(self, dim: int) -> str:
+        """
+        새 세대 디렉토리 생성
+
+        세대 이름은 매번 새로 만들어, 다른 프로세스가 세대 교체를
+        이름 비교만으로 알아챌 수 있게 합니다.
+
+        Args:
+            dim: 벡터 차원
+
+        Returns:
+            str: 세대 이름
+        """
+        generation = f"gen-{uuid.uuid4().hex[:12]}"
+        directory = os.path.join(self.path, generation)
+        os.makedirs(directory)
+        with open(os.path.join(directory, "info.json"), "w", encoding="utf-8") as f:
+            json.dump({"dim": dim, "quantization": self.quantization}, f)
+        names = ["vectors.f32", "documents.txt", "records.jsonl", "deleted.txt"]
+        if self.quantization == "float16":
+            names.append("vectors.f16")
+        elif self.quantization == "int8":
+            names.extend(["vectors.i8", "scales.f32"])
+        for name in names:
+            open(os.path.join(directory, name), "wb").close()
+        return generation
+
+    def _append(self, generation: str, quantization: str, ids: Sequence[str], vectors: np.ndarray,
+                documents: Sequence[str], metadatas: Sequence[Optional[Dict[str, Any]]]) -> None:
+        """세대 파일에 행 추가 (본문 → 벡터 → 양자화 벡터 → 레코드 순서로 기록)"""
+        records = []
+        with open(self._file("documents.txt", generation), "ab") as f:
+            offset = f.tell()
+            for doc_id, document, metadata in zip(ids, documents, metadatas):
+                data = (document or "").encode("utf-8")
+                f.write(data)
+                records.append(json.dumps(
+                    {"id": doc_id, "metadata": metadata or None, "offset": offset, "length": len(data)},
+                    ensure_ascii=False
+                ) + "\n")
+                offset += len(data)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with open(self._file("vectors.f32", generation), "ab") as f:
+            f.write(vectors.tobytes())
+        quantized, scales = quantize(vectors, quantization)
+        if quantized is not None:
+            name = "vectors.f16" if quantization == "float16" else "vectors.i8"
+            with open(self._file(name, generation), "ab") as f:
+                f.write(quantized.tobytes())
+        if scales is not None:
+            with open(self._file("scales.f32", generation), "ab") as f:
+                f.write(scales.tobytes())
+        with open(self._file("records.jsonl", generation), "a", encoding="utf-8") as f:
+            f.writelines(records)
+
+    def upsert(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]],
+               documents: Optional[Sequence[str]] = None,
+               metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None) -> None:
+        """
+        벡터 추가 (같은 ID가 있으면 교체)
+
+        Args:
+            ids: 청크 ID 리스트
+            embeddings: 임베딩 리스트
+            documents: 청크 본문 리스트
+            metadatas: 메타데이터 리스트
+        """
+        ids = list(ids)
+        if not ids:
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("ids와 embeddings의 개수가 맞지 않습니다.")
+        documents = list(documents) if documents is not None else [""] * len(ids)
+        metadatas = list(metadatas) if metadatas is not None else [None] * len(ids)
+
+        with self._write_lock():
+            if self.dim is None:
+                generation = self._start_generation(vectors.shape[1])
+                self._write_current(generation)
+                self._remove_stale_generations([generation])
+                self._refresh()
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"임베딩 차원이 컬렉션과 다릅니다: {vectors.shape[1]} != {self.dim}")
+            elif self._stored_quantization != self.quantization:
+                # 양자화 설정이 바뀌었으면 새 방식으로 다시 기록한 뒤 추가
+                self.compact()
+            self._append(self._generation, self._stored_quantization, ids,
+                         _normalize_rows(vectors), documents, metadatas)
+            self._refresh()
+
+    def delete(self, ids: Iterable[str]) -> None:
+        """
+        ID로 행 삭제
+
+        삭제된 행이 살아 있는 행보다 많아지면 파일을 압축합니다.
+
+        Args:
+            ids: 삭제할 청크 ID
+        """
+        with self._write_lock():
+            rows = [self._id_to_row[doc_id] for doc_id in ids if doc_id in self._id_to_row]
+            if not rows:
+                return
+            with open(self._file("deleted.txt"), "a", encoding="utf-8") as f:
+                f.writelines(f"{row}\n" for row in rows)
+            self._refresh()
+
+            live = self.count()
+            if len(self._ids) - live > max(live, 1024):
+                self.compact()
+
+    def compact(self) -> None:
+        """삭제된 행을 제외하고 현재 양자화 설정으로 새 세대에 다시 기록"""
+        with self._write_lock():
+            if self.dim is None:
+                return
+            old_generation = self._generation
+            generation = self._start_generation(self.dim)
+            rows = np.flatnonzero(self._alive)
+            for start in range(0, len(rows), self.block_rows):
+                block = rows[start:start + self.block_rows]
+                self._append(
+                    generation,
+                    self.quantization,
+                    [self._ids[row] for row in block],
+                    np.asarray(self._matrix[block]),
+                    self._read_documents(block),
+                    [self._metadatas[row] for row in block]
+                )
+            self._write_current(generation)
+            self._refresh()
+            # 직전 세대는 아직 검색 중인 다른 프로세스를 위해 다음 세대 교체까지 남겨 둠
+            self._remove_stale_generations([generation, old_generation])
+
+    def clear(self) -> None:
+        """컬렉션 전체 삭제"""
+        with self._write_lock():
+            old_generation = self._generation
+            if old_generation is None:
+                return
+            os.remove(os.path.join(self.path, "CURRENT"))
+            self._reset_state(None)
+            self._remove_stale_generations([old_generation])
+
+    def count(self) -> int:
+        """
+        살아 있는 행 수
+
+        Returns:
+            int: 문서 개수
+        """
+        with self._lock:
+            self._refresh()
+            return int(np.count_nonzero(self._alive))
+
+    def _read_documents(self, rows: Sequence[int]) -> List[str]:
+        """행 번호 순서대로 본문 읽기"""
+        documents = []
+        with open(self._file("documents.txt"), "rb") as f:
+            for row in rows:
+                offset, length = self._spans[row]
+                f.seek(offset)
+                documents.append(f.read(length).decode("utf-8"))
+        return documents
+
+    def _rows_result(self, rows: Sequence[int], include: Sequence[str]) -> Dict[str, Any]:
+        """행 목록을 ChromaDB get() 형식의 결과로 변환"""
+        return {
+            "ids": [self._ids[row] for row in rows],
+            "documents": self._read_documents(rows) if "documents" in include else None,
+            "metadatas": [self._metadatas[row] for row in rows] if "metadatas" in include else None,
+            "embeddings": (
+                np.asarray(self._matrix[list(rows)]) if len(rows) else np.zeros((0, self.dim or 0), dtype=np.float32)
+            ) if "embeddings" in include else None,
+        }
+
+    @staticmethod
+    def _match(metadata: Optional[Dict[str, Any]], where: Dict[str, Any]) -> bool:
+        """메타데이터가 where 조건(키별 일치)을 만족하는지 확인"""
+        metadata = metadata or {}
+        for key, value in where.items():
+            if key.startswith("$") or isinstance(value, dict):
+                raise ValueError(f"지원하지 않는 where 조건입니다: {key}")
+            if metadata.get(key) != value:
+                return False
+        return True
+
+    def get(self, ids: Optional[Sequence[str]] = None, where: Optional[Dict[str, Any]] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None,
+            include: Sequence[str] = ("documents", "metadatas")) -> Dict[str, Any]:
+        """
+        ID 또는 메타데이터 조건으로 행 조회
+
+        Args:
+            ids: 조회할 청크 ID (None이면 전체)
+            where: 메타데이터 일치 조건 (예: {"source": 경로})
+            limit: 최대 개수
+            offset: 건너뛸 개수
+            include: 결과에 포함할 필드 ("documents", "metadatas", "embeddings")
+
+        Returns:
+            Dict: ids, documents, metadatas, embeddings
+        """
+        return self._retry_on_generation_change(lambda: self._get(ids, where, limit, offset, include))
+
+    def _get(self, ids, where, limit, offset, include) -> Dict[str, Any]:
+        """get() 본체"""
+        with self._lock:
+            self._refresh()
+            if ids is not None:
+                rows = [self._id_to_row[doc_id] for doc_id in ids if doc_id in self._id_to_row]
+            else:
+                rows = np.flatnonzero(self._alive).tolist()
+            if where:
+                rows = [row for row in rows if self._match(self._metadatas[row], where)]
+            start = offset or 0
+            rows = rows[start:start + limit] if limit is not None else rows[start:]
+            return self._rows_result(rows, include)
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """검색에 쓸 배열 참조 묶음 (락을 잡은 상태에서 호출, 검색은 락 밖에서 진행)"""
+        return {
+            "generation": self._generation,
+            "rows": len(self._ids),
+            "alive": self._alive,
+            "matrix": self._matrix,
+            "quantization": self._stored_quantization,
+            "quantized": self._quantized,
+            "scales": self._scales,
+        }
+
+    @staticmethod
+    def _block_scores(snapshot: Dict[str, Any], queries: np.ndarray, start: int, end: int) -> np.ndarray:
+        """블록의 1차 점수 계산 (양자화 행렬이 있으면 양자화 행렬 사용)"""
+        if snapshot["quantization"] == "float16":
+            return queries @ snapshot["quantized"][start:end].astype(np.float32).T
+        if snapshot["quantization"] == "int8":
+            block = snapshot["quantized"][start:end].astype(np.float32)
+            return (queries @ block.T) * snapshot["scales"][start:end]
+        return queries @ np.asarray(snapshot["matrix"][start:end]).T
+
+    def _top_k(self, snapshot: Dict[str, Any], queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        블록 단위 행렬 곱으로 전체 점수를 구한 뒤 argpartition으로 상위 k개 검색
+
+        Args:
+            snapshot: _snapshot() 결과
+            queries: 단위 벡터로 정규화한 쿼리 행렬 (q, dim)
+            k: 쿼리당 반환할 개수
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (행 번호, 1차 점수) - 각각 (q, k), 점수 내림차순
+        """
+        total = snapshot["rows"]
+        if total == 0:
+            return np.zeros((len(queries), 0), dtype=np.int64), np.zeros((len(queries), 0), dtype=np.float32)
+        scores = np.empty((len(queries), total), dtype=np.float32)
+        block_rows = self.block_rows if snapshot["quantization"] == "none" else QUANTIZED_BLOCK_ROWS
+        for start in range(0, total, block_rows):
+            end = min(start + block_rows, total)
+            scores[:, start:end] = self._block_scores(snapshot, queries, start, end)
+        scores[:, ~snapshot["alive"][:total]] = -np.inf
+
+        take = min(k, total)
+        rows = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+        top_scores = np.take_along_axis(scores, rows, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(rows, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+    def _search(self, snapshot: Dict[str, Any], queries: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        상위 k개 검색 (양자화 모드면 후보만 float32 원본으로 다시 채점)
+
+        Args:
+            snapshot: _snapshot() 결과
+            queries: 단위 벡터로 정규화한 쿼리 행렬 (q, dim)
+            k: 쿼리당 반환할 개수
+
+        Returns:
+            List[Tuple[np.ndarray, np.ndarray]]: 쿼리별 (행 번호, 코사인 유사도), 유사도 내림차순
+        """
+        if snapshot["quantization"] == "none":
+            top_rows, top_scores = self._top_k(snapshot, queries, k)
+            return [(rows[np.isfinite(scores)], scores[np.isfinite(scores)])
+                    for rows, scores in zip(top_rows, top_scores)]
+
+        top_rows, top_scores = self._top_k(snapshot, queries, k * self.rescore_factor)
+        results = []
+        for query, rows, scores in zip(queries, top_rows, top_scores):
+            rows = np.sort(rows[np.isfinite(scores)])
+            exact = np.asarray(snapshot["matrix"][rows]) @ query if len(rows) else np.zeros(0, dtype=np.float32)
+            order = np.argsort(-exact)[:k]
+            results.append((rows[order], exact[order]))
+        return results
+
+    def query(self, query_embeddings: Sequence[Sequence[float]], n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None,
+              include: Sequence[str] = ("documents", "metadatas", "distances")) -> Dict[str, Any]:
+        """
+        코사인 거리 기준 상위 n_results개 검색
+
+        Args:
+            query_embeddings: 쿼리 임베딩 리스트
+            n_results: 쿼리당 반환할 개수
+            where: 메타데이터 일치 조건 (조건을 만족하는 행 중에서만 검색)
+            include: 결과에 포함할 필드 ("documents", "metadatas", "distances", "embeddings")
+
+        Returns:
+            Dict: 쿼리별 ids, documents, metadatas, distances, embeddings 리스트
+        """
+        queries = _normalize_rows(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        return self._retry_on_generation_change(lambda: self._query(queries, n_results, where, include))
+
+    def _filtered_snapshot(self, where: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """where 조건을 만족하지 않는 행을 삭제된 행처럼 가린 스냅샷 (락을 잡은 상태에서 호출)"""
+        snapshot = self._snapshot()
+        if where:
+            rows = snapshot["rows"]
+            matched = np.fromiter(
+                (self._match(metadata, where) for metadata in self._metadatas[:rows]),
+                dtype=bool, count=rows
+            )
+            snapshot["alive"] = snapshot["alive"][:rows] & matched
+        return snapshot
+
+    def _query(self, queries: np.ndarray, n_results: int, where: Optional[Dict[str, Any]],
+               include: Sequence[str]) -> Dict[str, Any]:
+        """query() 본체"""
+        result: Dict[str, List[Any]] = {"ids": [], "documents": [], "metadatas": [], "distances": [], "embeddings": []}
+        with self._lock:
+            self._refresh()
+            if self.dim is None or not self._ids:
+                for key in result:
+                    result[key] = [[] for _ in queries]
+                return result
+            snapshot = self._filtered_snapshot(where)
+
+        # 행렬 곱은 GIL을 놓으므로 락 밖에서 실행해 동시 검색을 막지 않음
+        found = self._search(snapshot, queries, n_results)
+
+        with self._lock:
+            if self._generation != snapshot["generation"]:
+                # 검색 도중 세대가 바뀌었으면(압축/삭제) 행 번호가 달라지므로 다시 검색
+                self._refresh()
+                found = self._search(self._filtered_snapshot(where), queries, n_results)
+            for rows, scores in found:
+                # 검색 도중 삭제된 행 제외
+                alive = self._alive[rows]
+                rows, scores = rows[alive].tolist(), scores[alive]
+                found_result = self._rows_result(rows, include)
+                result["ids"].append(found_result["ids"])
+                result["documents"].append(found_result["documents"])
+                result["metadatas"].append(found_result["metadatas"])
+                result["embeddings"].append(found_result["embeddings"])
+                result["distances"].append((1.0 - scores).tolist() if "distances" in include else None)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        인덱스 크기 통계 반환
+
+        Returns:
+            dict: 행 수, 양자화 방식, 1차 검색 인덱스 바이트 수, float32 원본 바이트 수
+        """
+        with self._lock:
+            self._refresh()
+            rows = len(self._ids)
+            full_bytes = rows * (self.dim or 0) * 4
+            if self._stored_quantization == "float16":
+                index_bytes = rows * self.dim * 2
+            elif self._stored_quantization == "int8":
+                index_bytes = rows * (self.dim + 4)
+            else:
+                index_bytes = full_bytes
+            return {
+                "rows": rows,
+                "live": int(np.count_nonzero(self._alive)),
+                "dim": self.dim,
+                "quantization": self._stored_quantization,
+                "rescore_factor": self.rescore_factor,
+                "index_bytes": index_bytes,
+                "full_precision_bytes": full_bytes,
+            }
+
+
+class NumpyVectorStore(VectorStore):
+    """NumpyCollection을 LangChain VectorStore 인터페이스로 감싼 벡터 스토어"""
+
+    def __init__(self, persist_directory: str, collection_name: str,
+                 embedding_function: Embeddings, quantization: str = "none",
+                 rescore_factor: int = 4):
+        """
+        초기화
+
+        Args:
+            persist_directory: 저장 디렉토리
+            collection_name: 컬렉션 이름
+            embedding_function: 임베딩 모델
+            quantization: 1차 검색용 양자화 방식 ("none", "float16", "int8")
+            rescore_factor: 원본으로 다시 채점할 후보 배수
+        """
+        self._embedding_function = embedding_function
+        self.collection = NumpyCollection(
+            os.path.join(persist_directory, "numpy", collection_name),
+            quantization=quantization,
+            rescore_factor=rescore_factor
+        )
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """임베딩 모델"""
+        return self._embedding_function
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        """
+        텍스트를 임베딩하여 추가
+
+        Args:
+            texts: 텍스트 리스트
+            metadatas: 메타데이터 리스트
+            ids: 청크 ID 리스트 (기본값: 무작위 UUID)
+
+        Returns:
+            List[str]: 추가된 청크 ID 리스트
+        """
+        texts = list(texts)
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        vectors = self._embedding_function.embed_documents(texts)
+        self.collection.upsert(ids=ids, embeddings=vectors, documents=texts, metadatas=metadatas)
+        return ids
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        """쿼리와 가장 유사한 문서 k개 검색 (filter: 메타데이터 일치 조건)"""
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        """쿼리와 가장 유사한 문서 k개를 코사인 거리와 함께 검색 (filter: 메타데이터 일치 조건)"""
+        return self.similarity_search_by_vector_with_score(
+            self._embedding_function.embed_query(query), k=k, **kwargs
+        )
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        """임베딩과 가장 유사한 문서 k개 검색 (filter: 메타데이터 일치 조건)"""
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k=k, **kwargs)]
+
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4,
+                                               filter: Optional[Dict[str, Any]] = None,
+                                               **kwargs: Any) -> List[Tuple[Document, float]]:
+        """
+        임베딩과 가장 유사한 문서 k개를 코사인 거리와 함께 검색
+
+        Args:
+            embedding: 쿼리 임베딩
+            k: 반환할 문서 개수
+            filter: 메타데이터 일치 조건 (예: {"source": 경로})
+
+        Returns:
+            List[Tuple[Document, float]]: (문서, 코사인 거리) 리스트
+
+        Raises:
+            ValueError: 지원하지 않는 검색 인자를 받은 경우
+        """
+        if kwargs:
+            raise ValueError(f"지원하지 않는 검색 인자입니다: {', '.join(sorted(kwargs))}")
+        results = self.collection.query(query_embeddings=[embedding], n_results=k, where=filter)
+        return [
+            (Document(id=doc_id, page_content=text, metadata=metadata or {}), distance)
+            for doc_id, text, metadata, distance in zip(
+                results["ids"][0], results["documents"][0],
+                results["metadatas"][0], results["distances"][0]
+            )
+        ]
+
+    def _select_relevance_score_fn(self):
+        """코사인 거리를 0~1 관련도 점수로 변환"""
+        return lambda distance: 1.0 - distance
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """ID로 문서 삭제"""
+        if ids:
+            self.collection.delete(ids)
+        return True
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        """ID로 문서 조회"""
+        found = self.collection.get(ids=list(ids))
+        return [
+            Document(id=doc_id, page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(found["ids"], found["documents"], found["metadatas"])
+        ]
+
+    def delete_collection(self) -> None:
+        """컬렉션 전체 삭제"""
+        self.collection.clear()
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings,
+                   metadatas: Optional[List[dict]] = None, *,
+                   ids: Optional[List[str]] = None,
+                   persist_directory: str = "./numpy_store",
+                   collection_name: str = "documents",
+                   **kwargs: Any) -> "NumpyVectorStore":
+        """텍스트로 새 벡터 스토어 생성"""
+        store = cls(persist_directory=persist_directory, collection_name=collection_name,
+                    embedding_function=embedding)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
@@ -1,53 +1,312 @@
 """
 검색기 - 벡터 스토어를 활용한 문서 검색
 """
-from typing import List
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
 from rag.vector_store import vector_store_manager
+from rag.context_builder import context_builder
+from utils.metrics import stage_seconds
+from utils.tracing import span
 from config import settings
 
 
+# 지원하는 검색 모드
+SEARCH_MODES = ("vector", "keyword", "hybrid")
+
+# 검색 단계별 소요 시간(초)을 받을 딕셔너리 (호출 측에서 설정하면 검색기가 채움)
+retrieval_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("retrieval_timings", default=None)
+
+
+def mmr_select(query_vector, candidate_vectors, k: int, lambda_mult: float) -> List[int]:
+    """
+    Maximal Marginal Relevance로 관련성 높고 서로 겹치지 않는 후보 선택
+    
+    후보 간 코사인 유사도 행렬을 한 번에 계산하고, 선택된 후보와의
+    최대 유사도를 누적 갱신하여 k번의 벡터 연산으로 끝냅니다.
+    
+    Args:
+        query_vector: 쿼리 임베딩
+        candidate_vectors: 후보 임베딩 리스트
+        k: 선택할 후보 수
+        lambda_mult: 관련성 가중치 (1이면 관련성만, 0이면 다양성만)
+        
+    Returns:
+        List[int]: 선택된 후보 인덱스 (선택 순서)
+    """
+    matrix = np.asarray(candidate_vectors, dtype=np.float32)
+    query = np.asarray(query_vector, dtype=np.float32)
+    matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+    
+    relevance = matrix @ query
+    similarity = matrix @ matrix.T
+    max_similarity = np.full(len(matrix), -np.inf, dtype=np.float32)
+    available = np.ones(len(matrix), dtype=bool)
+    selected: List[int] = []
+    
+    for _ in range(min(k, len(matrix))):
+        if selected:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        index = int(np.argmax(scores))
+        selected.append(index)
+        available[index] = False
+        max_similarity = np.maximum(max_similarity, similarity[:, index])
+    return selected
+
+
+class HybridRetriever(BaseRetriever):
+    """검색 모드(벡터/키워드/하이브리드)를 지정할 수 있는 LangChain Retriever"""
+    
+    k: int = 4
+    search_mode: str = "hybrid"
+    rerank: Optional[bool] = None
+    
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return document_retriever.retrieve_documents(
+            query, k=self.k, mode=self.search_mode, rerank=self.rerank
+        )
+
+
 class DocumentRetriever:
     """문서 검색 클래스"""
     
     def __init__(self):
         """초기화"""
         self.vector_store_manager = vector_store_manager
+        self._cross_encoder = None
+        self._cross_encoder_lock = threading.Lock()
     
-    def get_retriever(self, k: int = None) -> BaseRetriever:
+    def get_retriever(self, k: int = None, mode: str = None, rerank: bool = None) -> BaseRetriever:
         """
         LangChain Retriever 반환
         
         Args:
             k: 검색할 문서 개수
+            mode: 검색 모드 ("vector", "keyword", "hybrid")
+            rerank: 재순위화 사용 여부 (None이면 설정값)
             
         Returns:
             BaseRetriever: 검색기 인스턴스
         """
         k = k or settings.TOP_K
-        vectorstore = self.vector_store_manager.load_vectorstore()
-        retriever = vectorstore.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": k}
-        )
+        mode = mode or settings.SEARCH_MODE
+        retriever = HybridRetriever(k=k, search_mode=mode, rerank=rerank)
         return retriever
     
-    def retrieve_documents(self, query: str, k: int = None) -> List[Document]:
+    def _fetch_sizes(self, k: int, mode: str, rerank: bool) -> tuple:
+        """
+        재순위화 후보 수와 벡터 검색 후보 수 계산
+        
+        Returns:
+            tuple: (1차 후보 수, 벡터 검색 후보 수)
+        """
+        fetch_k = max(k, settings.RERANK_CANDIDATES) if rerank else k
+        vector_k = fetch_k if mode == "vector" else max(fetch_k, settings.HYBRID_FETCH_K)
+        return fetch_k, vector_k
+    
+    def batch_vector_search(self, query_vectors: List[List[float]], k: int = None,
+                            mode: str = None, rerank: bool = None) -> Optional[List[List[tuple]]]:
+        """
+        여러 질문의 벡터 검색을 한 번의 컬렉션 쿼리로 미리 수행
+        
+        결과를 질문별로 retrieve_documents(vector_results=...)에 넘기면
+        질문마다 벡터 검색을 다시 하지 않습니다.
+        
+        Args:
+            query_vectors: 질문 임베딩 리스트
+            k: 검색할 문서 개수
+            mode: 검색 모드 ("vector", "keyword", "hybrid")
+            rerank: 재순위화 사용 여부 (None이면 설정값)
+            
+        Returns:
+            Optional[List[List[tuple]]]: 질문별 (문서, 거리) 리스트 (키워드 모드는 None)
+        """
+        k = k or settings.TOP_K
+        mode = mode or settings.SEARCH_MODE
+        rerank = settings.RERANK_ENABLED if rerank is None else rerank
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"지원하지 않는 검색 모드입니다: {mode}")
+        if mode == "keyword":
+            return None
+        _, vector_k = self._fetch_sizes(k, mode, rerank)
+        return self.vector_store_manager.vector_search_by_vectors(query_vectors, k=vector_k)
+    
+    def retrieve_documents(self, query: str, k: int = None, mode: str = None,
+                           rerank: bool = None, query_vector: List[float] = None,
+                           vector_results: List[tuple] = None) -> List[Document]:
         """
         쿼리에 대한 관련 문서 검색
         
+        하이브리드 모드에서는 벡터 검색과 BM25 키워드 검색 결과를
+        Reciprocal Rank Fusion으로 합칩니다. 재순위화가 켜져 있으면
+        후보를 넉넉히 가져와 MMR(및 크로스 인코더)로 최종 k개를 고릅니다.
+        단계별 소요 시간은 retrieval_timings에 기록됩니다.
+        
         Args:
             query: 검색 쿼리
             k: 검색할 문서 개수
+            mode: 검색 모드 ("vector", "keyword", "hybrid")
+            rerank: 재순위화 사용 여부 (None이면 설정값)
+            query_vector: 미리 계산한 질문 임베딩 (벡터 검색과 재순위화에 사용)
+            vector_results: batch_vector_search()로 미리 가져온 벡터 검색 결과
             
         Returns:
             List[Document]: 검색된 문서 리스트
         """
         k = k or settings.TOP_K
-        documents = self.vector_store_manager.search(query, k=k)
+        rerank = settings.RERANK_ENABLED if rerank is None else rerank
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        
+        fetch_k, _ = self._fetch_sizes(k, mode or settings.SEARCH_MODE, rerank)
+        documents = self._search(query, fetch_k, mode, vector_results, query_vector)
+        timings["search"] = time.perf_counter() - started
+        
+        if rerank and len(documents) > k:
+            with span("rerank", candidates=len(documents), k=k):
+                documents = self.rerank(query, documents, k, timings, query_vector)
+        timings["retrieval_total"] = time.perf_counter() - started
+        
+        for stage, seconds in timings.items():
+            stage_seconds.observe(seconds, stage="retrieval" if stage == "retrieval_total" else stage)
+        recorder = retrieval_timings.get()
+        if recorder is not None:
+            recorder.update({stage: round(seconds, 4) for stage, seconds in timings.items()})
         return documents
     
+    def _search(self, query: str, k: int, mode: str = None,
+                vector_results: List[tuple] = None,
+                query_vector: List[float] = None) -> List[Document]:
+        """
+        검색 모드에 따라 1차 후보 검색
+        
+        Args:
+            query: 검색 쿼리
+            k: 검색할 문서 개수
+            mode: 검색 모드 ("vector", "keyword", "hybrid")
+            vector_results: 미리 가져온 벡터 검색 결과 (None이면 직접 검색)
+            query_vector: 미리 계산한 질문 임베딩 (있으면 다시 임베딩하지 않고 검색)
+            
+        Returns:
+            List[Document]: 검색된 문서 리스트
+        """
+        mode = mode or settings.SEARCH_MODE
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"지원하지 않는 검색 모드입니다: {mode}")
+        
+        if mode == "keyword":
+            return [doc for doc, _ in self.vector_store_manager.keyword_search(query, k=k)]
+        
+        fetch_k = k if mode == "vector" else max(k, settings.HYBRID_FETCH_K)
+        if vector_results is None and query_vector is not None:
+            vector_results = self.vector_store_manager.vector_search_by_vectors([query_vector], k=fetch_k)[0]
+        elif vector_results is None:
+            vector_results = self.vector_store_manager.vector_search(query, k=fetch_k)
+        if mode == "vector":
+            return [doc for doc, _ in vector_results[:k]]
+        
+        keyword_results = self.vector_store_manager.keyword_search(query, k=fetch_k)
+        return self.reciprocal_rank_fusion(
+            [[doc for doc, _ in vector_results], [doc for doc, _ in keyword_results]],
+            k=k
+        )
+    
+    def rerank(self, query: str, documents: List[Document], k: int,
+               timings: Dict[str, float] = None,
+               query_vector: List[float] = None) -> List[Document]:
+        """
+        후보 문서 재순위화
+        
+        벡터 스토어에 저장된 임베딩으로 MMR을 적용해 겹치는 청크를 걸러내고,
+        크로스 인코더가 설정되어 있으면 MMR 결과를 다시 채점해 상위 k개를 고릅니다.
+        
+        Args:
+            query: 검색 쿼리
+            documents: 후보 문서 리스트 (id 필드 필요)
+            k: 반환할 문서 개수
+            timings: 단계별 소요 시간을 기록할 딕셔너리
+            query_vector: 미리 계산한 쿼리 임베딩 (None이면 새로 임베딩)
+            
+        Returns:
+            List[Document]: 재순위화된 문서 리스트
+        """
+        timings = {} if timings is None else timings
+        use_cross_encoder = bool(settings.CROSS_ENCODER_MODEL)
+        
+        started = time.perf_counter()
+        mmr_k = max(k, settings.CROSS_ENCODER_CANDIDATES) if use_cross_encoder else k
+        if query_vector is None:
+            query_vector = self.vector_store_manager.embeddings.embed_query(query)
+        vectors = self.vector_store_manager.get_embeddings_by_ids([doc.id for doc in documents])
+        selected = mmr_select(query_vector, vectors, mmr_k, settings.MMR_LAMBDA)
+        documents = [documents[index] for index in selected]
+        timings["mmr"] = time.perf_counter() - started
+        
+        if use_cross_encoder and len(documents) > k:
+            started = time.perf_counter()
+            scores = self._get_cross_encoder().predict(
+                [(query, doc.page_content) for doc in documents]
+            )
+            order = np.argsort(-np.asarray(scores))[:k]
+            documents = [documents[index] for index in order]
+            timings["cross_encoder"] = time.perf_counter() - started
+        
+        return documents[:k]
+    
+    def _get_cross_encoder(self):
+        """
+        크로스 인코더 모델 반환 (최초 사용 시 CPU로 로드)
+        
+        Returns:
+            CrossEncoder: sentence-transformers 크로스 인코더
+        """
+        if self._cross_encoder is None:
+            with self._cross_encoder_lock:
+                if self._cross_encoder is None:
+                    try:
+                        from sentence_transformers import CrossEncoder
+                    except ImportError:
+                        raise ImportError(
+                            "크로스 인코더 재순위화에는 sentence-transformers 패키지가 필요합니다. "
+                            "pip install sentence-transformers"
+                        )
+                    self._cross_encoder = CrossEncoder(settings.CROSS_ENCODER_MODEL, device="cpu")
+        return self._cross_encoder
+    
+    def reciprocal_rank_fusion(self, result_lists: List[List[Document]], k: int,
+                               rrf_k: int = None) -> List[Document]:
+        """
+        여러 검색 결과를 Reciprocal Rank Fusion으로 합치기
+        
+        Args:
+            result_lists: 순위순 문서 리스트들 (문서의 id 필드로 동일 문서 판별)
+            k: 반환할 문서 개수
+            rrf_k: 순위 완화 상수
+            
+        Returns:
+            List[Document]: 합쳐진 점수 상위 문서 리스트
+        """
+        rrf_k = rrf_k or settings.RRF_K
+        scores = {}
+        documents = {}
+        for results in result_lists:
+            for rank, doc in enumerate(results):
+                scores[doc.id] = scores.get(doc.id, 0.0) + 1.0 / (rrf_k + rank + 1)
+                documents.setdefault(doc.id, doc)
+        ranked = sorted(scores, key=scores.get, reverse=True)[:k]
+        return [documents[doc_id] for doc_id in ranked]
+    
     def retrieve_with_scores(self, query: str, k: int = None) -> List[tuple]:
         """
         점수와 함께 문서 검색
@@ -63,20 +322,23 @@ class DocumentRetriever:
         results = self.vector_store_manager.search_with_score(query, k=k)
         return results
     
-    def format_documents(self, documents: List[Document]) -> str:
+    def format_documents(self, documents: List[Document], max_tokens: int = None) -> str:
         """
-        문서 리스트를 텍스트로 포맷팅
+        문서 리스트를 프롬프트 컨텍스트 텍스트로 포맷팅
+        
+        같은 출처의 겹치는 청크는 CHUNK_OVERLAP 중복 없이 이어 붙이고,
+        관련성 순으로 토큰 예산(CONTEXT_MAX_TOKENS) 안에 담습니다.
         
         Args:
-            documents: 문서 리스트
+            documents: 관련성 순 문서 리스트
+            max_tokens: 컨텍스트 토큰 예산 (None이면 설정값)
             
         Returns:
             str: 포맷팅된 텍스트
         """
-        formatted = "\n\n".join([doc.page_content for doc in documents])
+        formatted, _ = context_builder.build(documents, max_tokens)
         return formatted
 
 
 # 전역 인스턴스
 document_retriever = DocumentRetriever()
-
@@ -1,13 +1,28 @@
 """
-벡터 스토어 관리 - ChromaDB를 사용한 벡터 데이터베이스
+벡터 스토어 관리 - ChromaDB 또는 NumPy 메모리 맵 백엔드를 사용한 벡터 데이터베이스
 """
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
 from langchain_core.documents import Document
 from langchain_community.vectorstores import Chroma
 from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
 from models.llm_setup import get_embeddings
+from rag.bm25 import BM25Index
+from rag.manifest import lock_source
+from rag.numpy_store import NumpyVectorStore
+from utils.keyed_lock import KeyedLock
+from utils.metrics import stage_seconds
+from utils.tracing import span
 from config import settings
+import chromadb
+import contextvars
+import hashlib
 import os
+import queue
+import threading
+import time
+import uuid
 
 
 class VectorStoreManager:
@@ -23,6 +38,24 @@ class VectorStoreManager:
         self._embeddings = embeddings
         self.persist_directory = settings.VECTOR_STORE_PATH
         self.collection_name = settings.COLLECTION_NAME
+        self.backend = settings.VECTOR_STORE_BACKEND
+        
+        # 장기 보관되는 클라이언트/컬렉션 핸들 (최초 사용 시 생성)
+        self._lock = threading.RLock()
+        self._client = None
+        self._client_path = None
+        self._handles = None  # (VectorStore, 컬렉션) 쌍
+        self._handles_key = None
+        
+        # 임베딩 요청 전용 스레드 풀 (동시 임베딩 요청 수 제한)
+        self._embed_executor = None
+        
+        # 컬렉션 변경 버전 파일 잠금 (스레드 + 워커 프로세스 간)
+        self._version_lock = KeyedLock(os.path.join(self.persist_directory, "locks"))
+        
+        # 컬렉션과 동기화되는 BM25 키워드 인덱스 (키워드 검색 시 버전이 바뀌었으면 변경분만 다시 로드)
+        self.keyword_index = BM25Index()
+        self._keyword_reload_lock = threading.Lock()
         
         # 디렉토리 생성
         os.makedirs(self.persist_directory, exist_ok=True)
@@ -34,7 +67,26 @@ class VectorStoreManager:
             self._embeddings = get_embeddings()
         return self._embeddings
     
-    def create_vectorstore(self, documents: List[Document]) -> Chroma:
+    def _config_key(self) -> tuple:
+        """현재 설정과 컬렉션 세대를 나타내는 키 (변경 시 핸들을 다시 연다)"""
+        return (self.backend, self.persist_directory, self.collection_name, id(self.embeddings),
+                self.generation)
+    
+    def _get_client(self):
+        """
+        영구 ChromaDB 클라이언트 반환 (경로별로 한 번만 생성)
+        
+        Returns:
+            chromadb.ClientAPI: ChromaDB 클라이언트
+        """
+        with self._lock:
+            if self._client is None or self._client_path != self.persist_directory:
+                os.makedirs(self.persist_directory, exist_ok=True)
+                self._client = chromadb.PersistentClient(path=self.persist_directory)
+                self._client_path = self.persist_directory
+            return self._client
+    
+    def create_vectorstore(self, documents: List[Document]) -> VectorStore:
         """
         새로운 벡터 스토어 생성
         
@@ -42,39 +94,431 @@ class VectorStoreManager:
             documents: 벡터화할 문서 리스트
             
         Returns:
-            Chroma: 생성된 벡터 스토어
+            VectorStore: 생성된 벡터 스토어
         """
-        vectorstore = Chroma.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
-            persist_directory=self.persist_directory,
-            collection_name=self.collection_name
-        )
+        vectorstore = self.load_vectorstore()
+        vectorstore.add_documents(documents)
         return vectorstore
     
-    def load_vectorstore(self) -> Chroma:
+    def _open(self) -> tuple:
         """
-        기존 벡터 스토어 로드
+        (VectorStore, 컬렉션) 핸들 쌍 반환
+        
+        클라이언트와 컬렉션 핸들은 한 번만 열어 모든 요청에서 재사용하며,
+        delete_collection() 호출(다른 워커의 호출 포함)이나 설정 변경 이후에만 다시 엽니다.
+        VECTOR_STORE_BACKEND가 "numpy"이면 메모리 맵 백엔드를 사용합니다.
+        컬렉션은 ChromaDB Collection 또는 같은 메서드를 제공하는 NumpyCollection입니다.
         
         Returns:
-            Chroma: 로드된 벡터 스토어
+            tuple: (VectorStore, 컬렉션)
         """
-        vectorstore = Chroma(
-            persist_directory=self.persist_directory,
-            embedding_function=self.embeddings,
-            collection_name=self.collection_name
-        )
-        return vectorstore
+        key = self._config_key()
+        handles = self._handles
+        if handles is not None and self._handles_key == key:
+            return handles
+        
+        with self._lock:
+            if self._handles is None or self._handles_key != key:
+                if self.backend == "numpy":
+                    vectorstore = NumpyVectorStore(
+                        persist_directory=self.persist_directory,
+                        collection_name=self.collection_name,
+                        embedding_function=self.embeddings,
+                        quantization=settings.VECTOR_QUANTIZATION,
+                        rescore_factor=settings.VECTOR_RESCORE_FACTOR
+                    )
+                    collection = vectorstore.collection
+                else:
+                    client = self._get_client()
+                    # 임베딩은 항상 직접 계산해 넘기므로 ChromaDB 기본 임베딩 함수는 쓰지 않음
+                    collection = client.get_or_create_collection(
+                        name=self.collection_name,
+                        embedding_function=None
+                    )
+                    vectorstore = Chroma(
+                        client=client,
+                        persist_directory=self.persist_directory,
+                        embedding_function=self.embeddings,
+                        collection_name=self.collection_name
+                    )
+                self._handles = (vectorstore, collection)
+                self._handles_key = key
+            return self._handles
+    
+    def load_vectorstore(self) -> VectorStore:
+        """
+        기존 벡터 스토어 로드 (핸들은 재사용)
+        
+        Returns:
+            VectorStore: 로드된 벡터 스토어
+        """
+        return self._open()[0]
+    
+    def _get_collection(self):
+        """
+        컬렉션 핸들 반환 (ID 지정 쓰기, 메타데이터 조회 등 VectorStore 인터페이스 밖의 작업용)
+        
+        Returns:
+            chromadb.Collection 또는 NumpyCollection: 컬렉션 핸들
+        """
+        return self._open()[1]
+    
+    @property
+    def _version_path(self) -> str:
+        """컬렉션 변경 버전 파일 경로"""
+        return os.path.join(self.persist_directory, "store.version")
+    
+    @property
+    def _generation_path(self) -> str:
+        """컬렉션 세대 파일 경로"""
+        return os.path.join(self.persist_directory, "store.generation")
+    
+    @staticmethod
+    def _read_counter(path: str) -> int:
+        """카운터 파일 값 반환 (없으면 0)"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                return int(f.read())
+        except (FileNotFoundError, ValueError):
+            return 0
+    
+    def _write_counter(self, path: str, value: int) -> None:
+        """카운터 파일을 원자적으로 교체"""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(str(value))
+        os.replace(temp_path, path)
+    
+    @property
+    def version(self) -> int:
+        """
+        컬렉션 변경 버전 (추가/삭제 시 증가, 답변 캐시와 BM25 인덱스 무효화에 사용)
+        
+        여러 uvicorn 워커가 같은 벡터 스토어를 쓰므로 프로세스 메모리가 아니라
+        벡터 스토어 디렉토리의 파일에 기록해 다른 워커의 변경도 반영합니다.
+        """
+        return self._read_counter(self._version_path)
+    
+    @property
+    def generation(self) -> int:
+        """
+        컬렉션 세대 (delete_collection() 시 증가)
+        
+        컬렉션을 삭제하면 다시 만들어진 컬렉션은 새 ID를 가지므로, 다른 워커가 들고 있던
+        핸들은 더 이상 쓸 수 없습니다. 세대가 바뀌면 load_vectorstore()가 핸들을 다시 엽니다.
+        """
+        return self._read_counter(self._generation_path)
+    
+    def _bump_version(self) -> None:
+        """
+        컬렉션 변경 버전 증가
+        
+        직전 버전까지 반영된 BM25 인덱스는 방금 적용한 변경도 이미 반영했으므로
+        새 버전으로 표시하고, 다른 워커의 변경을 놓친 인덱스는 다음 검색 때 다시 로드되도록 둡니다.
+        """
+        with self._lock, self._version_lock.hold(self._version_path):
+            current = self.version
+            self._write_counter(self._version_path, current + 1)
+            if self.keyword_index.version == current:
+                self.keyword_index.version = current + 1
+    
+    def reset(self) -> None:
+        """캐시된 컬렉션 핸들을 버려 다음 호출 시 다시 열도록 함"""
+        with self._lock:
+            self._handles = None
+            self._handles_key = None
+    
+    def _get_embed_executor(self) -> ThreadPoolExecutor:
+        """
+        임베딩 요청용 스레드 풀 반환
+        
+        프로세스 전체에서 동시에 보내는 임베딩 요청 수를
+        EMBEDDING_MAX_CONCURRENCY로 제한합니다.
+        
+        Returns:
+            ThreadPoolExecutor: 임베딩 스레드 풀
+        """
+        with self._lock:
+            if self._embed_executor is None:
+                self._embed_executor = ThreadPoolExecutor(
+                    max_workers=settings.EMBEDDING_MAX_CONCURRENCY,
+                    thread_name_prefix="embedding-worker"
+                )
+            return self._embed_executor
     
-    def add_documents(self, documents: List[Document]) -> None:
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None,
+                      batch_size: int = None) -> Dict[str, Any]:
         """
         벡터 스토어에 문서 추가
         
+        청크를 batch_size개씩 나누어 여러 임베딩 요청을 동시에 보내고,
+        완료된 배치부터 미리 계산된 ID와 함께 컬렉션에 일괄 upsert합니다.
+        
         Args:
             documents: 추가할 문서 리스트
+            ids: 문서 ID 리스트 (기본값: 무작위 UUID)
+            batch_size: 임베딩 요청당 청크 수
+            
+        Returns:
+            Dict: 처리량 리포트 (청크 수, 배치 수, 소요 시간, 초당 청크 수)
         """
-        vectorstore = self.load_vectorstore()
-        vectorstore.add_documents(documents)
+        started = time.perf_counter()
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        if ids is None:
+            ids = [str(uuid.uuid4()) for _ in documents]
+        
+        collection = self._get_collection()
+        embeddings = self.embeddings
+        executor = self._get_embed_executor()
+        
+        def embed(start: int):
+            texts = [doc.page_content for doc in documents[start:start + batch_size]]
+            with span("embed_batch", size=len(texts)):
+                return start, embeddings.embed_documents(texts)
+        
+        # 임베딩 스레드에서도 호출 측 추적에 단계가 기록되도록 컨텍스트를 복사해 실행
+        futures = [
+            executor.submit(contextvars.copy_context().run, embed, start)
+            for start in range(0, len(documents), batch_size)
+        ]
+        try:
+            for future in as_completed(futures):
+                start, vectors = future.result()
+                batch = documents[start:start + batch_size]
+                texts = [doc.page_content for doc in batch]
+                with span("write", size=len(batch)):
+                    collection.upsert(
+                        ids=ids[start:start + batch_size],
+                        embeddings=vectors,
+                        documents=texts,
+                        # ChromaDB는 빈 메타데이터 딕셔너리를 허용하지 않음
+                        metadatas=[doc.metadata or None for doc in batch]
+                    )
+                    self.keyword_index.add(ids[start:start + batch_size], texts)
+        finally:
+            for future in futures:
+                future.cancel()
+            if futures:
+                self._bump_version()
+        
+        return self._throughput_report(len(documents), len(futures), time.perf_counter() - started)
+    
+    @staticmethod
+    def _throughput_report(chunks: int, batches: int, seconds: float) -> Dict[str, Any]:
+        """
+        수집 처리량 리포트 생성
+        
+        Args:
+            chunks: 처리한 청크 수
+            batches: 임베딩 배치 수
+            seconds: 소요 시간(초)
+            
+        Returns:
+            Dict: 처리량 리포트
+        """
+        return {
+            "chunks": chunks,
+            "batches": batches,
+            "seconds": round(seconds, 3),
+            "chunks_per_second": round(chunks / seconds, 2) if seconds > 0 else 0.0,
+        }
+    
+    @staticmethod
+    def _prefetch(batches: Iterable[List[Document]], prefetch: int = None) -> Iterator[List[Document]]:
+        """
+        배치 생성을 별도 스레드에서 미리 진행하는 생성기
+        
+        배치 생성(파싱/분할)은 생산자 스레드에서 진행하고, 호출 측은
+        준비된 배치를 임베딩하고 기록합니다. 앞쪽 페이지를 임베딩하는 동안
+        뒤쪽 페이지 파싱이 겹쳐 진행되며, 대기 배치 수는 prefetch로 제한됩니다.
+        
+        Args:
+            batches: 청크 배치 이터러블 (생성기 권장)
+            prefetch: 미리 준비해 둘 최대 배치 수
+            
+        Yields:
+            List[Document]: 청크 배치
+        """
+        prefetch = prefetch or settings.INGEST_PREFETCH_BATCHES
+        pending: "queue.Queue" = queue.Queue(maxsize=prefetch)
+        done = object()
+        stop = threading.Event()
+        
+        def produce():
+            try:
+                for batch in batches:
+                    if stop.is_set():
+                        return
+                    pending.put(batch)
+                pending.put(done)
+            except BaseException as e:
+                pending.put(e)
+        
+        # 파싱/분할 시간이 호출 측 추적에 기록되도록 컨텍스트를 복사해 실행
+        producer = threading.Thread(
+            target=contextvars.copy_context().run, args=(produce,), name="ingest-producer", daemon=True
+        )
+        producer.start()
+        try:
+            while True:
+                item = pending.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # 오류로 중단된 경우 생산자 스레드가 막히지 않도록 큐를 비움
+            stop.set()
+            while producer.is_alive():
+                try:
+                    pending.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+    
+    def add_document_batches(self, batches: Iterable[List[Document]],
+                             prefetch: int = None,
+                             on_batch: Optional[Callable[[List[Document]], None]] = None) -> Dict[str, Any]:
+        """
+        청크 배치 스트림을 파이프라인으로 벡터 스토어에 추가
+        
+        Args:
+            batches: 청크 배치 이터러블 (생성기 권장)
+            prefetch: 미리 준비해 둘 최대 배치 수
+            on_batch: 배치를 기록할 때마다 호출할 콜백
+            
+        Returns:
+            Dict: 전체 처리량 리포트
+        """
+        started = time.perf_counter()
+        added = 0
+        batch_count = 0
+        for batch in self._prefetch(batches, prefetch):
+            report = self.add_documents(batch)
+            added += len(batch)
+            batch_count += report["batches"]
+            if on_batch is not None:
+                on_batch(batch)
+        return self._throughput_report(added, batch_count, time.perf_counter() - started)
+    
+    @staticmethod
+    def make_chunk_id(source: str, content_hash: str, occurrence: int = 0) -> str:
+        """
+        출처 경로와 내용 해시로 결정적인 청크 ID 생성
+        
+        Args:
+            source: 출처 파일 경로
+            content_hash: 청크 내용의 sha256 해시
+            occurrence: 같은 파일 안에서 동일한 내용이 반복된 순번
+            
+        Returns:
+            str: 청크 ID
+        """
+        source_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+        chunk_id = f"{source_hash}-{content_hash[:32]}"
+        if occurrence:
+            chunk_id += f"-{occurrence}"
+        return chunk_id
+    
+    def get_ids_by_source(self, source: str) -> List[str]:
+        """
+        특정 출처 파일에서 생성된 청크 ID 조회
+        
+        Args:
+            source: 출처 파일 경로
+            
+        Returns:
+            List[str]: 청크 ID 리스트
+        """
+        collection = self._get_collection()
+        return collection.get(where={"source": source}, include=[])["ids"]
+    
+    def delete_ids(self, ids: List[str], batch_size: int = 1000) -> int:
+        """
+        청크 ID로 문서 삭제
+        
+        Args:
+            ids: 삭제할 청크 ID 리스트
+            batch_size: 한 번에 삭제할 ID 수
+            
+        Returns:
+            int: 삭제 요청한 청크 수
+        """
+        collection = self._get_collection()
+        ids = list(ids)
+        for start in range(0, len(ids), batch_size):
+            collection.delete(ids=ids[start:start + batch_size])
+        self.keyword_index.remove(ids)
+        if ids:
+            self._bump_version()
+        return len(ids)
+    
+    def sync_document_batches(self, source: str, batches: Iterable[List[Document]],
+                              prefetch: int = None,
+                              on_batch: Optional[Callable[[List[Document], int], None]] = None) -> Dict[str, Any]:
+        """
+        출처 파일 단위의 증분(멱등) 수집
+        
+        각 청크에 출처 경로와 내용 해시로 만든 결정적 ID를 부여하고,
+        이미 존재하는 청크는 건너뛰며 새 청크만 임베딩합니다.
+        끝까지 처리한 뒤 더 이상 나타나지 않은 기존 청크는 삭제합니다.
+        전체 과정은 출처별 잠금(rag.manifest.lock_source) 안에서 진행됩니다.
+        
+        Args:
+            source: 출처 파일 경로 (청크 메타데이터의 source 값)
+            batches: 청크 배치 이터러블
+            prefetch: 미리 준비해 둘 최대 배치 수
+            on_batch: 배치 처리 후 (배치, 새로 임베딩한 청크 수)로 호출할 콜백
+            
+        Returns:
+            Dict: 추가/건너뜀/삭제 청크 수, 현재 청크 ID 목록과 처리량 리포트
+        """
+        started = time.perf_counter()
+        # 같은 출처의 다른 수집/삭제와 겹치면 스냅샷이 어긋나 오래된 청크가 남으므로
+        # 스냅샷 → 추가 → 오래된 청크 삭제를 출처별 잠금 안에서 진행 (수집 작업이 이미 잡았으면 재진입)
+        with lock_source(source):
+            existing = set(self.get_ids_by_source(source))
+            seen: Dict[str, None] = {}  # 순서를 유지하는 집합
+            occurrences: Dict[str, int] = {}
+            added = skipped = batch_count = 0
+            
+            for batch in self._prefetch(batches, prefetch):
+                new_docs, new_ids = [], []
+                for doc in batch:
+                    content_hash = hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest()
+                    occurrence = occurrences.get(content_hash, 0)
+                    occurrences[content_hash] = occurrence + 1
+                    chunk_id = self.make_chunk_id(source, content_hash, occurrence)
+                    seen[chunk_id] = None
+                    
+                    if chunk_id in existing:
+                        skipped += 1
+                        continue
+                    doc.metadata["source"] = source
+                    doc.metadata["content_hash"] = content_hash
+                    new_docs.append(doc)
+                    new_ids.append(chunk_id)
+                
+                if new_docs:
+                    report = self.add_documents(new_docs, ids=new_ids)
+                    added += len(new_docs)
+                    batch_count += report["batches"]
+                if on_batch is not None:
+                    on_batch(batch, len(new_docs))
+            
+            # 새 버전에 없는 기존 청크 삭제
+            stale = existing.difference(seen)
+            with span("delete", size=len(stale)):
+                deleted = self.delete_ids(stale)
+            
+        report = self._throughput_report(added, batch_count, time.perf_counter() - started)
+        return {
+            "added": added,
+            "skipped": skipped,
+            "deleted": deleted,
+            "chunk_ids": list(seen),
+            "throughput": report,
+        }
     
     def search(self, query: str, k: int = None) -> List[Document]:
         """
@@ -92,6 +536,157 @@ class VectorStoreManager:
         results = vectorstore.similarity_search(query, k=k)
         return results
     
+    def vector_search(self, query: str, k: int = None) -> List[tuple]:
+        """
+        ID가 포함된 유사도 검색
+        
+        Args:
+            query: 검색 쿼리
+            k: 반환할 문서 개수
+            
+        Returns:
+            List[tuple]: (문서, 거리) 튜플 리스트 - 문서의 id 필드에 청크 ID 포함
+        """
+        started = time.perf_counter()
+        with span("embed"):
+            query_vector = self.embeddings.embed_query(query)
+        stage_seconds.observe(time.perf_counter() - started, stage="query_embedding")
+        return self.vector_search_by_vectors([query_vector], k=k)[0]
+    
+    def vector_search_by_vectors(self, query_vectors: List[List[float]], k: int = None) -> List[List[tuple]]:
+        """
+        여러 쿼리 임베딩을 한 번의 컬렉션 쿼리로 검색
+        
+        NumPy 백엔드는 모든 쿼리를 하나의 행렬 곱으로 채점하고,
+        ChromaDB도 한 번의 호출로 처리합니다.
+        
+        Args:
+            query_vectors: 쿼리 임베딩 리스트
+            k: 쿼리당 반환할 문서 개수
+            
+        Returns:
+            List[List[tuple]]: 쿼리별 (문서, 거리) 튜플 리스트
+        """
+        k = k or settings.TOP_K
+        if not len(query_vectors):
+            return []
+        collection = self._get_collection()
+        started = time.perf_counter()
+        with span("vector_search", queries=len(query_vectors), k=k):
+            results = collection.query(
+                query_embeddings=list(query_vectors),
+                n_results=k,
+                include=["documents", "metadatas", "distances"]
+            )
+        stage_seconds.observe(time.perf_counter() - started, stage="vector_query")
+        return [
+            [
+                (Document(id=doc_id, page_content=text, metadata=metadata or {}), distance)
+                for doc_id, text, metadata, distance in zip(ids, texts, metadatas, distances)
+            ]
+            for ids, texts, metadatas, distances in zip(
+                results["ids"],
+                results["documents"],
+                results["metadatas"],
+                results["distances"]
+            )
+        ]
+    
+    def get_embeddings_by_ids(self, ids: List[str]) -> List[List[float]]:
+        """
+        저장된 청크 임베딩을 ID 순서대로 조회 (재임베딩 없음)
+        
+        Args:
+            ids: 청크 ID 리스트
+            
+        Returns:
+            List[List[float]]: ids와 같은 순서의 임베딩 리스트
+        """
+        if not ids:
+            return []
+        collection = self._get_collection()
+        found = collection.get(ids=list(ids), include=["embeddings"])
+        by_id = dict(zip(found["ids"], found["embeddings"]))
+        return [by_id[doc_id] for doc_id in ids]
+    
+    def _ensure_keyword_index(self) -> BM25Index:
+        """
+        BM25 인덱스가 컬렉션 전체를 반영하도록 로드
+        
+        최초 검색 때, 그리고 다른 워커가 컬렉션을 바꿔 버전이 달라졌을 때 다시 맞춥니다.
+        청크 ID는 내용 해시로 만들어지므로 컬렉션의 ID 목록만 읽어 인덱스와 비교하고,
+        사라진 ID는 빼고 새 ID의 본문만 가져옵니다. 이 프로세스의 추가/삭제는 인덱스에
+        바로 반영되므로 다시 맞추지 않습니다.
+        
+        맞추는 동안 컬렉션 잠금(self._lock)은 잡지 않으며, 이미 한 번 로드된 인덱스라면
+        다른 스레드가 맞추는 중에는 기다리지 않고 직전 상태로 검색합니다.
+        
+        Returns:
+            BM25Index: 키워드 인덱스
+        """
+        index = self.keyword_index
+        version = self.version
+        if index.version == version:
+            return index
+        if not self._keyword_reload_lock.acquire(blocking=index.version is None):
+            return index
+        try:
+            if index.version != version:
+                indexed = index.ids()
+                collection = self._get_collection()
+                current: Set[str] = set()
+                offset, page_size = 0, 1000
+                while True:
+                    page = collection.get(include=[], limit=page_size, offset=offset)
+                    current.update(page["ids"])
+                    if len(page["ids"]) < page_size:
+                        break
+                    offset += page_size
+                
+                index.remove(indexed - current)
+                added = list(current - indexed)
+                for start in range(0, len(added), page_size):
+                    page = collection.get(ids=added[start:start + page_size], include=["documents"])
+                    index.add(page["ids"], page["documents"])
+                # 맞추는 중에 컬렉션이 바뀌었다면 버전이 달라져 다음 검색에서 다시 맞춤
+                index.version = version
+        finally:
+            self._keyword_reload_lock.release()
+        return index
+    
+    def keyword_search(self, query: str, k: int = None) -> List[tuple]:
+        """
+        BM25 키워드 검색
+        
+        Args:
+            query: 검색 쿼리
+            k: 반환할 문서 개수
+            
+        Returns:
+            List[tuple]: (문서, BM25 점수) 튜플 리스트 - 문서의 id 필드에 청크 ID 포함
+        """
+        k = k or settings.TOP_K
+        started = time.perf_counter()
+        with span("keyword_search", k=k) as current:
+            results = self._keyword_search(query, k)
+            current.set(hits=len(results))
+        stage_seconds.observe(time.perf_counter() - started, stage="keyword_search")
+        return results
+    
+    def _keyword_search(self, query: str, k: int) -> List[tuple]:
+        """BM25 키워드 검색 본체 (keyword_search 참고)"""
+        hits = self._ensure_keyword_index().search(query, k)
+        if not hits:
+            return []
+        
+        collection = self._get_collection()
+        found = collection.get(ids=[doc_id for doc_id, _ in hits], include=["documents", "metadatas"])
+        by_id = {
+            doc_id: Document(id=doc_id, page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(found["ids"], found["documents"], found["metadatas"])
+        }
+        return [(by_id[doc_id], score) for doc_id, score in hits if doc_id in by_id]
+    
     def search_with_score(self, query: str, k: int = None) -> List[tuple]:
         """
         점수와 함께 유사도 검색
@@ -110,8 +705,14 @@ class VectorStoreManager:
     
     def delete_collection(self) -> None:
         """컬렉션 삭제"""
-        vectorstore = self.load_vectorstore()
-        vectorstore.delete_collection()
+        with self._lock:
+            vectorstore = self.load_vectorstore()
+            vectorstore.delete_collection()
+            self.keyword_index.clear()
+            with self._version_lock.hold(self._generation_path):
+                self._write_counter(self._generation_path, self.generation + 1)
+            self.reset()
+            self._bump_version()
     
     def get_collection_count(self) -> int:
         """
@@ -121,9 +722,8 @@ class VectorStoreManager:
             int: 문서 개수
         """
         try:
-            vectorstore = self.load_vectorstore()
-            # ChromaDB의 컬렉션에서 문서 개수 조회
-            collection = vectorstore._collection
+            # 컬렉션에서 문서 개수 조회
+            collection = self._get_collection()
             return collection.count()
         except:
             return 0
@@ -2,12 +2,26 @@
 채팅 라우터 - 일반 대화 API
 """
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 from models.llm_setup import get_llm, test_llm_connection
+from models.response_cache import ResponseCache
+from utils.circuit_breaker import CircuitOpenError
+from utils.concurrency import run_blocking
+from utils.singleflight import SingleFlight
+from utils.sse import sse_stream, SSE_HEADERS
+from config import settings
 
 router = APIRouter()
 
+# 결정적 설정(낮은 온도)의 응답 캐시와 동일 요청 합치기
+chat_response_cache = ResponseCache(
+    max_items=settings.CHAT_CACHE_MAX_ITEMS,
+    ttl=settings.CHAT_CACHE_TTL
+)
+chat_single_flight = SingleFlight()
+
 
 class Message(BaseModel):
     """메시지 모델"""
@@ -27,11 +41,57 @@ class ChatResponse(BaseModel):
     response: str
 
 
+def build_chat_prompt(request: ChatRequest) -> str:
+    """
+    대화 히스토리를 포함한 프롬프트 구성
+    
+    Args:
+        request: 채팅 요청
+        
+    Returns:
+        str: LLM에 전달할 프롬프트
+    """
+    # 대화 히스토리가 있으면 컨텍스트 구성
+    if request.history and len(request.history) > 0:
+        # 이전 대화를 포함한 프롬프트 구성
+        context = "이전 대화:\n"
+        for msg in request.history[-6:]:  # 최근 6개 메시지만 (3턴)
+            if msg.role == "user":
+                context += f"사용자: {msg.content}\n"
+            else:
+                context += f"AI: {msg.content}\n"
+        
+        context += f"\n현재 질문: {request.message}\n\n"
+        context += "위 대화 맥락을 고려하여 현재 질문에 답변해주세요:"
+        
+        return context
+    return request.message
+
+
+def get_chat_llm(request: ChatRequest):
+    """
+    요청 온도가 반영된 LLM 인스턴스 반환
+    
+    Args:
+        request: 채팅 요청
+        
+    Returns:
+        Ollama: LLM 인스턴스
+    """
+    # 온도 설정이 기본값과 다른 경우에만 요청 온도 적용 (공유 인스턴스는 바꾸지 않음)
+    if request.temperature != 0.7:
+        return get_llm(temperature=request.temperature)
+    return get_llm()
+
+
 @router.post("/query", response_model=ChatResponse)
 async def chat_query(request: ChatRequest):
     """
     일반 채팅 질의 (대화 메모리 포함)
     
+    온도가 CHAT_CACHE_MAX_TEMPERATURE 이하이면 같은 요청의 응답을 캐시에서
+    반환하며, 온도와 관계없이 동시에 들어온 동일 요청은 하나의 Ollama 호출로 합칩니다.
+    
     Args:
         request: 채팅 요청 (메시지, 온도, 히스토리)
         
@@ -39,34 +99,35 @@ async def chat_query(request: ChatRequest):
         ChatResponse: LLM 응답
     """
     try:
-        llm = get_llm()
-        
-        # 온도 설정이 기본값과 다른 경우 업데이트
-        if request.temperature != 0.7:
-            llm.temperature = request.temperature
+        llm = get_chat_llm(request)
+        full_prompt = build_chat_prompt(request)
         
-        # 대화 히스토리가 있으면 컨텍스트 구성
-        if request.history and len(request.history) > 0:
-            # 이전 대화를 포함한 프롬프트 구성
-            context = "이전 대화:\n"
-            for msg in request.history[-6:]:  # 최근 6개 메시지만 (3턴)
-                if msg.role == "user":
-                    context += f"사용자: {msg.content}\n"
-                else:
-                    context += f"AI: {msg.content}\n"
-            
-            context += f"\n현재 질문: {request.message}\n\n"
-            context += "위 대화 맥락을 고려하여 현재 질문에 답변해주세요:"
-            
-            full_prompt = context
-        else:
-            full_prompt = request.message
+        # 프롬프트(히스토리 포함), 모델, 생성 파라미터가 같으면 같은 요청
+        key = ResponseCache.make_key(
+            model=llm.model,
+            prompt=full_prompt,
+            temperature=llm.temperature,
+            num_predict=llm.num_predict
+        )
+        cacheable = (
+            settings.CHAT_CACHE_ENABLED
+            and llm.temperature is not None
+            and llm.temperature <= settings.CHAT_CACHE_MAX_TEMPERATURE
+        )
+        if cacheable:
+            cached = chat_response_cache.get(key)
+            if cached is not None:
+                return ChatResponse(response=cached)
         
-        # LLM 호출
-        response = llm.invoke(full_prompt)
+        # LLM 호출 (비동기 - 동일한 요청이 진행 중이면 그 결과를 공유)
+        response = await chat_single_flight.do(key, lambda: llm.ainvoke(full_prompt))
         
+        if cacheable:
+            chat_response_cache.put(key, response)
         return ChatResponse(response=response)
     
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -74,6 +135,49 @@ async def chat_query(request: ChatRequest):
         )
 
 
+@router.post("/query/stream")
+async def chat_query_stream(request: ChatRequest):
+    """
+    일반 채팅 질의 (SSE 토큰 스트리밍)
+    
+    Ollama가 토큰을 생성하는 즉시 `data: {"token": ...}` 이벤트로 전송하고,
+    생성이 끝나면 `done` 이벤트를 보냅니다.
+    
+    Args:
+        request: 채팅 요청 (메시지, 온도, 히스토리)
+        
+    Returns:
+        StreamingResponse: text/event-stream 응답
+    """
+    llm = get_chat_llm(request)
+    full_prompt = build_chat_prompt(request)
+    
+    async def events():
+        async for token in llm.astream(full_prompt):
+            if token:
+                yield {"data": {"token": token}}
+    
+    return StreamingResponse(
+        sse_stream(events()),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+@router.get("/cache")
+async def get_chat_cache_stats():
+    """
+    채팅 응답 캐시 및 요청 합치기 통계 조회
+    
+    Returns:
+        dict: 캐시 히트/미스, 합쳐진 요청 수
+    """
+    return {
+        "response_cache": chat_response_cache.stats(),
+        "single_flight": chat_single_flight.stats()
+    }
+
+
 @router.get("/test")
 async def test_connection():
     """
@@ -83,7 +187,7 @@ async def test_connection():
         dict: 테스트 결과
     """
     try:
-        result = test_llm_connection()
+        result = await run_blocking(test_llm_connection)
         return result
     except Exception as e:
         raise HTTPException(
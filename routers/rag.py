@@ -2,12 +2,19 @@
 RAG 라우터 - 문서 기반 질의응답 API
 """
 import os
+import time
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Any
-from rag.document_loader import document_processor
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Literal, Optional, Tuple
 from rag.vector_store import vector_store_manager
+from rag.manifest import source_manifest, lock_source
+from rag.ingestion_jobs import ingestion_job_manager, QueueFullError
 from chains.qa_chain import qa_chain_manager
+from chains.answer_cache import answer_cache
+from utils.circuit_breaker import CircuitOpenError
+from utils.concurrency import run_blocking
+from utils.sse import sse_stream, format_ndjson, SSE_HEADERS
 from config import settings
 
 router = APIRouter()
@@ -16,7 +23,15 @@ router = APIRouter()
 class RAGQueryRequest(BaseModel):
     """RAG 쿼리 요청 모델"""
     question: str
-    top_k: int = 4
+    top_k: Optional[int] = Field(default=None, ge=1, le=50)  # None이면 TOP_K 설정값 사용
+    search_mode: Optional[Literal["vector", "keyword", "hybrid"]] = None  # None이면 설정값 사용
+
+
+class RAGBatchQueryRequest(BaseModel):
+    """RAG 일괄 쿼리 요청 모델"""
+    questions: List[str]
+    top_k: Optional[int] = Field(default=None, ge=1, le=50)  # None이면 TOP_K 설정값 사용
+    search_mode: Optional[Literal["vector", "keyword", "hybrid"]] = None  # None이면 설정값 사용
 
 
 class RAGQueryResponse(BaseModel):
@@ -24,6 +39,9 @@ class RAGQueryResponse(BaseModel):
     question: str
     answer: str
     source_documents: List[Dict[str, Any]]
+    cached: bool = False
+    timings: Dict[str, float] = {}  # 검색 단계별 소요 시간(초)
+    context: Dict[str, Any] = {}  # 컨텍스트 통계 (청크/그룹 수, 추정 토큰 수, 압축률)
 
 
 class DocumentInfo(BaseModel):
@@ -31,55 +49,128 @@ class DocumentInfo(BaseModel):
     filename: str
     size: int
     chunks: int
+    ingested_at: Optional[float] = None
 
 
-@router.post("/upload")
-async def upload_document(file: UploadFile = File(...)):
+async def save_upload_file(file: UploadFile, file_path: str) -> int:
     """
-    문서 업로드 및 벡터화
+    업로드 파일을 고정 크기 블록 단위로 디스크에 저장
+    
+    파일 전체를 메모리에 올리지 않으며, 임시 파일에 기록한 뒤
+    이름을 바꿔 수집 작업이 불완전한 파일을 읽지 않도록 합니다.
     
     Args:
-        file: 업로드할 파일 (PDF, TXT, MD)
+        file: 업로드 파일
+        file_path: 저장할 경로
         
     Returns:
-        dict: 업로드 결과
+        int: 저장된 바이트 수
     """
+    temp_path = f"{file_path}.part"
+    size = 0
+    buffer = await run_blocking(open, temp_path, "wb")
     try:
-        # 파일 확장자 확인
-        filename = file.filename
-        _, ext = os.path.splitext(filename)
+        while True:
+            block = await file.read(settings.UPLOAD_BLOCK_SIZE)
+            if not block:
+                break
+            await run_blocking(buffer.write, block)
+            size += len(block)
+    except BaseException:
+        await run_blocking(buffer.close)
+        await run_blocking(os.remove, temp_path)
+        raise
+    await run_blocking(buffer.close)
+    await run_blocking(os.replace, temp_path, file_path)
+    return size
+
+
+def validate_filename(filename: str, allow_subdirectories: bool = False) -> str:
+    """
+    파일명과 확장자 검증
+    
+    디렉토리 동기화로 수집된 하위 디렉토리 파일은 매니페스트에 업로드 디렉토리 기준
+    상대 경로(예: sub/s.txt)로 기록되므로, allow_subdirectories이면 정규화한 상대 경로가
+    업로드 디렉토리 안에 있을 때 허용합니다.
+    
+    Args:
+        filename: 파일명 (allow_subdirectories이면 업로드 디렉토리 기준 상대 경로)
+        allow_subdirectories: 하위 디렉토리 경로 허용 여부
         
-        if ext.lower() not in ['.pdf', '.txt', '.md']:
-            raise HTTPException(
-                status_code=400,
-                detail="지원하지 않는 파일 형식입니다. PDF, TXT, MD 파일만 가능합니다."
-            )
+    Returns:
+        str: 검증된 파일명 (정규화된 상대 경로)
+    """
+    invalid = HTTPException(
+        status_code=400,
+        detail=f"올바르지 않은 파일명입니다: {filename}"
+    )
+    if not filename:
+        raise invalid
+    
+    # 경로 조작 방지
+    if allow_subdirectories:
+        normalized = os.path.normpath(filename)
+        root = os.path.realpath(settings.UPLOAD_DIR)
+        resolved = os.path.realpath(os.path.join(root, normalized))
+        if (os.path.isabs(normalized) or normalized.split(os.sep)[0] in (os.curdir, os.pardir)
+                or os.path.commonpath([root, resolved]) != root or resolved == root):
+            raise invalid
+        filename = normalized
+    elif os.path.basename(filename) != filename:
+        raise invalid
+    
+    _, ext = os.path.splitext(filename)
+    if ext.lower() not in ['.pdf', '.txt', '.md']:
+        raise HTTPException(
+            status_code=400,
+            detail="지원하지 않는 파일 형식입니다. PDF, TXT, MD 파일만 가능합니다."
+        )
+    return filename
+
+
+async def accept_upload(file: UploadFile, filename: str) -> dict:
+    """
+    업로드 파일을 저장하고 수집 작업 등록
+    
+    같은 이름의 파일이 이미 있으면 내용을 교체하며, 증분 수집에 의해
+    바뀐 청크만 다시 임베딩됩니다.
+    
+    Args:
+        file: 업로드 파일
+        filename: 저장할 파일명
         
-        # 업로드 디렉토리 생성
-        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    Returns:
+        dict: 등록된 작업 정보
+    """
+    try:
+        # 큐가 가득 찬 경우 파일을 받기 전에 거절
+        if ingestion_job_manager.is_full():
+            raise QueueFullError("수집 작업 큐가 가득 찼습니다. 잠시 후 다시 시도해주세요.")
         
-        # 파일 저장
+        # 업로드 디렉토리 생성 (하위 디렉토리 파일 교체 포함)
         file_path = os.path.join(settings.UPLOAD_DIR, filename)
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
         
-        # 문서 처리 (로드 및 분할)
-        chunks = document_processor.process_document(file_path)
+        # 파일 저장 (블록 단위 스트리밍)
+        await save_upload_file(file, file_path)
         
-        # 벡터 스토어에 추가
-        vector_store_manager.add_documents(chunks)
+        # 백그라운드 수집 작업 등록 (큐가 가득 차면 잠시 대기)
+        job = await ingestion_job_manager.submit(filename, file_path)
         
         return {
-            "status": "success",
-            "message": "문서가 성공적으로 업로드되고 벡터화되었습니다.",
+            "status": "accepted",
+            "message": "문서가 업로드되었습니다. 백그라운드에서 벡터화가 진행됩니다.",
             "filename": filename,
-            "chunks": len(chunks),
-            "total_documents": vector_store_manager.get_collection_count()
+            "job_id": job.job_id,
+            "status_url": f"/api/rag/jobs/{job.job_id}"
         }
     
-    except HTTPException:
-        raise
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
@@ -94,6 +185,87 @@ async def upload_document(file: UploadFile = File(...)):
         )
 
 
+@router.post("/upload", status_code=202)
+async def upload_document(file: UploadFile = File(...)):
+    """
+    문서 업로드 및 벡터화 작업 등록
+    
+    파일을 저장한 뒤 백그라운드 수집 작업으로 넘기고 작업 ID를 즉시 반환합니다.
+    진행 상황은 `/api/rag/jobs/{job_id}`에서 조회할 수 있습니다.
+    
+    Args:
+        file: 업로드할 파일 (PDF, TXT, MD)
+        
+    Returns:
+        dict: 등록된 작업 정보
+    """
+    filename = validate_filename(file.filename)
+    return await accept_upload(file, filename)
+
+
+@router.post("/sync", status_code=202)
+async def sync_upload_directory():
+    """
+    업로드 디렉토리 전체 재동기화 작업 등록
+    
+    data 디렉토리의 모든 지원 파일을 프로세스 풀로 병렬 파싱하는 작업을 등록합니다.
+    내용이 바뀌지 않은 파일과 청크는 건너뛰므로 비용은 변경분에 비례하며,
+    디렉토리에서 사라진 파일의 청크는 삭제합니다.
+    
+    Returns:
+        dict: 등록된 작업 정보
+    """
+    try:
+        # 디렉토리에서 사라진 파일은 인덱스에서도 삭제
+        removed = []
+        for entry in await run_blocking(source_manifest.list):
+            if not os.path.exists(entry["source"]):
+                await run_blocking(delete_document_chunks, entry["filename"])
+                removed.append(entry["filename"])
+        
+        # 디렉토리 전체를 프로세스 풀로 병렬 파싱하는 작업 하나로 등록
+        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+        job = await ingestion_job_manager.submit(
+            os.path.basename(os.path.abspath(settings.UPLOAD_DIR)),
+            settings.UPLOAD_DIR,
+            kind="directory"
+        )
+        
+        return {
+            "status": "accepted",
+            "job_id": job.job_id,
+            "status_url": f"/api/rag/jobs/{job.job_id}",
+            "removed": removed
+        }
+    
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """
+    문서 수집 작업 상태 조회
+    
+    Args:
+        job_id: 작업 ID
+        
+    Returns:
+        dict: 작업 상태, 진행 상황(페이지/청크/임베딩 수) 및 결과
+    """
+    job = ingestion_job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"작업을 찾을 수 없습니다: {job_id}"
+        )
+    return job.to_dict()
+
+
 @router.post("/query", response_model=RAGQueryResponse)
 async def rag_query(request: RAGQueryRequest):
     """
@@ -107,24 +279,31 @@ async def rag_query(request: RAGQueryRequest):
     """
     try:
         # 벡터 스토어에 문서가 있는지 확인
-        doc_count = vector_store_manager.get_collection_count()
+        doc_count = await run_blocking(vector_store_manager.get_collection_count)
         if doc_count == 0:
             raise HTTPException(
                 status_code=400,
                 detail="업로드된 문서가 없습니다. 먼저 문서를 업로드해주세요."
             )
         
-        # QA 체인으로 질의응답
-        result = qa_chain_manager.query(request.question)
+        # QA 체인으로 질의응답 (비동기)
+        result = await qa_chain_manager.aquery(
+            request.question, search_mode=request.search_mode, k=request.top_k
+        )
         
         return RAGQueryResponse(
             question=result["question"],
             answer=result["answer"],
-            source_documents=result["source_documents"]
+            source_documents=result["source_documents"],
+            cached=result.get("cached", False),
+            timings=result.get("timings", {}),
+            context=result.get("context", {})
         )
     
     except HTTPException:
         raise
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -132,27 +311,196 @@ async def rag_query(request: RAGQueryRequest):
         )
 
 
+@router.post("/query/stream")
+async def rag_query_stream(request: RAGQueryRequest):
+    """
+    RAG 기반 질의응답 (SSE 토큰 스트리밍)
+    
+    첫 이벤트(`sources`)로 검색된 소스 문서를 보내고, 이후 생성되는
+    토큰을 `data: {"token": ...}` 이벤트로 전송한 뒤 `done` 이벤트로 끝납니다.
+    
+    Args:
+        request: RAG 쿼리 요청
+        
+    Returns:
+        StreamingResponse: text/event-stream 응답
+    """
+    doc_count = await run_blocking(vector_store_manager.get_collection_count)
+    if doc_count == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="업로드된 문서가 없습니다. 먼저 문서를 업로드해주세요."
+        )
+    
+    return StreamingResponse(
+        sse_stream(qa_chain_manager.astream_query(
+            request.question, search_mode=request.search_mode, k=request.top_k
+        )),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+async def batch_ndjson_stream(questions: List[str], search_mode: Optional[str], k: Optional[int]):
+    """
+    일괄 질의 결과를 NDJSON 줄로 변환하고 마지막에 요약 줄 추가
+    
+    Args:
+        questions: 질문 리스트
+        search_mode: 검색 모드
+        k: 질문당 검색할 문서 개수
+        
+    Yields:
+        str: NDJSON 한 줄
+    """
+    started = time.perf_counter()
+    failed = 0
+    async for item in qa_chain_manager.abatch_query(questions, search_mode=search_mode, k=k):
+        if "error" in item:
+            failed += 1
+        yield format_ndjson(item)
+    yield format_ndjson({
+        "done": True,
+        "total": len(questions),
+        "failed": failed,
+        "seconds": round(time.perf_counter() - started, 4)
+    })
+
+
+@router.post("/query/batch")
+async def rag_query_batch(request: RAGBatchQueryRequest):
+    """
+    RAG 기반 일괄 질의응답 (NDJSON 스트리밍)
+    
+    질문 전체를 한 번에 임베딩하고 벡터 검색도 한 번의 쿼리로 수행한 뒤,
+    답변 생성은 RAG_BATCH_MAX_CONCURRENCY개까지 동시에 진행합니다.
+    결과는 완료되는 순서대로 한 줄씩 전송되며(`index`로 원래 순서 확인),
+    실패한 질문은 해당 줄의 `error`로만 보고됩니다. 마지막 줄은 요약입니다.
+    
+    Args:
+        request: RAG 일괄 쿼리 요청
+        
+    Returns:
+        StreamingResponse: application/x-ndjson 응답
+    """
+    if not request.questions:
+        raise HTTPException(
+            status_code=400,
+            detail="질문이 없습니다."
+        )
+    if len(request.questions) > settings.RAG_BATCH_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {settings.RAG_BATCH_MAX_QUESTIONS}개의 질문만 처리할 수 있습니다."
+        )
+    
+    doc_count = await run_blocking(vector_store_manager.get_collection_count)
+    if doc_count == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="업로드된 문서가 없습니다. 먼저 문서를 업로드해주세요."
+        )
+    
+    return StreamingResponse(
+        batch_ndjson_stream(request.questions, request.search_mode, request.top_k),
+        media_type="application/x-ndjson",
+        headers=SSE_HEADERS
+    )
+
+
+def delete_document_chunks(filename: str) -> int:
+    """
+    파일 하나의 청크를 벡터 스토어와 매니페스트에서 삭제
+    
+    같은 파일의 수집 작업이 진행 중이면 끝날 때까지 기다린 뒤 삭제합니다.
+    
+    Args:
+        filename: 파일명
+        
+    Returns:
+        int: 삭제한 청크 수 (알 수 없는 파일이면 -1)
+    """
+    file_path = os.path.join(settings.UPLOAD_DIR, filename)
+    with lock_source(file_path):
+        entry = source_manifest.remove(filename)
+        if entry is not None:
+            return vector_store_manager.delete_ids(entry["chunk_ids"])
+        
+        # 매니페스트 도입 이전에 수집된 파일은 메타데이터로 조회
+        ids = vector_store_manager.get_ids_by_source(file_path)
+        if not ids:
+            return -1
+        return vector_store_manager.delete_ids(ids)
+
+
+def delete_document_source(filename: str) -> Tuple[int, bool]:
+    """
+    파일 하나의 청크와 원본 파일 삭제
+    
+    청크와 원본을 같은 잠금 안에서 지우므로 대기 중이던 수집 작업은
+    파일이 없는 것을 보고 다시 수집하지 않습니다.
+    
+    Args:
+        filename: 파일명
+        
+    Returns:
+        Tuple[int, bool]: 삭제한 청크 수 (알 수 없는 파일이면 -1), 원본 파일 존재 여부
+    """
+    file_path = os.path.join(settings.UPLOAD_DIR, filename)
+    with lock_source(file_path):
+        deleted = delete_document_chunks(filename)
+        file_existed = os.path.exists(file_path)
+        if file_existed:
+            os.remove(file_path)
+    return deleted, file_existed
+
+
+@router.get("/cache")
+async def get_answer_cache_stats():
+    """
+    시맨틱 답변 캐시 통계 조회
+    
+    Returns:
+        dict: 히트/미스 카운터, 적중률, 항목 수
+    """
+    return answer_cache.stats()
+
+
+@router.delete("/cache")
+async def clear_answer_cache():
+    """
+    시맨틱 답변 캐시 비우기
+    
+    Returns:
+        dict: 삭제 결과
+    """
+    answer_cache.clear()
+    return {
+        "status": "success",
+        "message": "답변 캐시가 비워졌습니다."
+    }
+
+
 @router.get("/documents")
 async def get_documents_info():
     """
-    저장된 문서 정보 조회
+    저장된 문서 정보 조회 (소스 매니페스트 기반)
     
     Returns:
         dict: 문서 정보
     """
     try:
-        doc_count = vector_store_manager.get_collection_count()
-        
-        # data 디렉토리의 파일 목록
-        uploaded_files = []
-        if os.path.exists(settings.UPLOAD_DIR):
-            for filename in os.listdir(settings.UPLOAD_DIR):
-                file_path = os.path.join(settings.UPLOAD_DIR, filename)
-                if os.path.isfile(file_path):
-                    uploaded_files.append({
-                        "filename": filename,
-                        "size": os.path.getsize(file_path)
-                    })
+        doc_count = await run_blocking(vector_store_manager.get_collection_count)
+        
+        uploaded_files = [
+            DocumentInfo(
+                filename=entry["filename"],
+                size=entry["size"],
+                chunks=entry["chunks"],
+                ingested_at=entry["ingested_at"]
+            )
+            for entry in await run_blocking(source_manifest.list)
+        ]
         
         return {
             "total_chunks": doc_count,
@@ -167,6 +515,65 @@ async def get_documents_info():
         )
 
 
+@router.put("/documents/{filename:path}", status_code=202)
+async def replace_document(filename: str, file: UploadFile = File(...)):
+    """
+    문서 교체 (제자리 갱신)
+    
+    업로드한 내용으로 기존 파일을 교체하고 증분 수집 작업을 등록합니다.
+    바뀐 청크만 다시 임베딩되고 사라진 청크는 삭제됩니다.
+    
+    Args:
+        filename: 교체할 파일명 (하위 디렉토리 파일은 매니페스트의 상대 경로)
+        file: 새 파일 내용
+        
+    Returns:
+        dict: 등록된 작업 정보
+    """
+    filename = validate_filename(filename, allow_subdirectories=True)
+    return await accept_upload(file, filename)
+
+
+@router.delete("/documents/{filename:path}")
+async def delete_document(filename: str):
+    """
+    문서 하나 삭제
+    
+    매니페스트에 기록된 청크만 벡터 스토어에서 삭제하고 원본 파일도 지웁니다.
+    같은 파일의 수집 작업이 진행 중이면 끝날 때까지 기다렸다가 삭제하고,
+    대기 중인 작업은 파일이 없으므로 실패로 끝납니다.
+    
+    Args:
+        filename: 삭제할 파일명 (하위 디렉토리 파일은 매니페스트의 상대 경로)
+        
+    Returns:
+        dict: 삭제 결과
+    """
+    filename = validate_filename(filename, allow_subdirectories=True)
+    try:
+        deleted, file_existed = await run_blocking(delete_document_source, filename)
+        
+        if deleted < 0 and not file_existed:
+            raise HTTPException(
+                status_code=404,
+                detail=f"문서를 찾을 수 없습니다: {filename}"
+            )
+        
+        return {
+            "status": "success",
+            "message": f"{filename} 문서가 삭제되었습니다.",
+            "deleted_chunks": max(deleted, 0)
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"문서 삭제 중 오류 발생: {str(e)}"
+        )
+
+
 @router.delete("/documents")
 async def delete_all_documents():
     """
@@ -176,8 +583,9 @@ async def delete_all_documents():
         dict: 삭제 결과
     """
     try:
-        # 벡터 스토어 컬렉션 삭제
-        vector_store_manager.delete_collection()
+        # 벡터 스토어 컬렉션 및 매니페스트 삭제
+        await run_blocking(vector_store_manager.delete_collection)
+        await run_blocking(source_manifest.clear)
         
         return {
             "status": "success",
@@ -4,6 +4,7 @@ Streamlit UI - LangChain RAG 시스템 테스트 인터페이스
 import streamlit as st
 import requests
 import json
+import time
 
 # 페이지 설정
 st.set_page_config(
@@ -15,6 +16,39 @@ st.set_page_config(
 # API 엔드포인트
 API_BASE_URL = "http://localhost:8000"
 
+
+def stream_events(url, payload):
+    """
+    SSE 엔드포인트를 호출하여 (이벤트 이름, 데이터) 튜플을 차례로 반환
+    
+    Args:
+        url: 스트리밍 엔드포인트 URL
+        payload: 요청 JSON
+        
+    Yields:
+        tuple: (이벤트 이름, 데이터 딕셔너리)
+    """
+    with requests.post(url, json=payload, stream=True, timeout=(5, None)) as response:
+        if response.status_code != 200:
+            try:
+                detail = response.json().get("detail", "알 수 없는 오류")
+            except ValueError:
+                detail = f"HTTP {response.status_code}"
+            raise RuntimeError(detail)
+        
+        event = "message"
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                event = "message"
+                continue
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[len("data:"):].strip())
+                if event == "error":
+                    raise RuntimeError(data.get("detail", "스트리밍 오류"))
+                yield event, data
+
 # 제목
 st.title("🤖 LangChain RAG 시스템")
 st.markdown("---")
@@ -85,36 +119,41 @@ with tab1:
         st.session_state.chat_history = []
         st.rerun()
     
-    # 메시지 전송 처리
+    # 메시지 전송 처리 (토큰 스트리밍)
     if chat_input:
-        with st.spinner("응답 생성 중..."):
-            try:
-                # 대화 히스토리를 API 형식으로 변환
-                history = []
-                for chat in st.session_state.chat_history:
-                    history.append({"role": "user", "content": chat["user"]})
-                    history.append({"role": "assistant", "content": chat["assistant"]})
-                
-                response = requests.post(
-                    f"{API_BASE_URL}/api/chat/query",
-                    json={
-                        "message": chat_input,
-                        "temperature": temperature,
-                        "history": history
-                    }
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    st.session_state.chat_history.append({
-                        "user": chat_input,
-                        "assistant": result["response"]
-                    })
-                    st.rerun()  # 화면 새로고침
-                else:
-                    st.error(f"오류: {response.status_code}")
-            except Exception as e:
-                st.error(f"오류: {str(e)}")
+        try:
+            # 대화 히스토리를 API 형식으로 변환
+            history = []
+            for chat in st.session_state.chat_history:
+                history.append({"role": "user", "content": chat["user"]})
+                history.append({"role": "assistant", "content": chat["assistant"]})
+            
+            st.markdown(f"**👤 사용자:**")
+            st.info(chat_input)
+            st.markdown(f"**🤖 AI:**")
+            placeholder = st.empty()
+            answer = ""
+            
+            for event, data in stream_events(
+                f"{API_BASE_URL}/api/chat/query/stream",
+                {
+                    "message": chat_input,
+                    "temperature": temperature,
+                    "history": history
+                }
+            ):
+                if "token" in data:
+                    answer += data["token"]
+                    placeholder.success(answer + "▌")
+            placeholder.success(answer)
+            
+            st.session_state.chat_history.append({
+                "user": chat_input,
+                "assistant": answer
+            })
+            st.rerun()  # 화면 새로고침
+        except Exception as e:
+            st.error(f"오류: {str(e)}")
 
 # 탭 2: RAG 질의응답
 with tab2:
@@ -130,32 +169,41 @@ with tab2:
     
     col1, col2 = st.columns([1, 5])
     with col1:
-        if st.button("🔍 검색 및 답변", key="rag_search"):
-            if rag_input:
-                with st.spinner("문서 검색 및 답변 생성 중..."):
-                    try:
-                        response = requests.post(
-                            f"{API_BASE_URL}/api/rag/query",
-                            json={
-                                "question": rag_input,
-                                "top_k": top_k
-                            }
-                        )
-                        
-                        if response.status_code == 200:
-                            result = response.json()
-                            st.session_state.rag_history.append(result)
-                        else:
-                            error_detail = response.json().get("detail", "알 수 없는 오류")
-                            st.error(f"오류: {error_detail}")
-                    except Exception as e:
-                        st.error(f"오류: {str(e)}")
+        rag_search = st.button("🔍 검색 및 답변", key="rag_search")
     
     with col2:
         if st.button("🗑️ 질의 기록 지우기", key="rag_clear"):
             st.session_state.rag_history = []
             st.rerun()
     
+    # 답변 스트리밍 표시
+    if rag_search and rag_input:
+        try:
+            result = {"question": rag_input, "answer": "", "source_documents": []}
+            status = st.empty()
+            status.info("문서 검색 중...")
+            placeholder = st.empty()
+            
+            for event, data in stream_events(
+                f"{API_BASE_URL}/api/rag/query/stream",
+                {
+                    "question": rag_input,
+                    "top_k": top_k
+                }
+            ):
+                if event == "sources":
+                    result["source_documents"] = data.get("source_documents", [])
+                    status.info(f"참고 문서 {len(result['source_documents'])}개 검색됨 - 답변 생성 중...")
+                elif "token" in data:
+                    result["answer"] += data["token"]
+                    placeholder.success(result["answer"] + "▌")
+            
+            status.empty()
+            placeholder.empty()
+            st.session_state.rag_history.append(result)
+        except Exception as e:
+            st.error(f"오류: {str(e)}")
+    
     # RAG 히스토리 표시
     st.markdown("---")
     for idx, item in enumerate(reversed(st.session_state.rag_history)):
@@ -193,16 +241,32 @@ with tab3:
         st.info(f"선택된 파일: {uploaded_file.name} ({uploaded_file.size} bytes)")
         
         if st.button("📤 업로드 및 벡터화"):
-            with st.spinner("파일 업로드 및 처리 중..."):
-                try:
-                    files = {"file": (uploaded_file.name, uploaded_file, uploaded_file.type)}
-                    response = requests.post(
-                        f"{API_BASE_URL}/api/rag/upload",
-                        files=files
-                    )
+            try:
+                files = {"file": (uploaded_file.name, uploaded_file, uploaded_file.type)}
+                response = requests.post(
+                    f"{API_BASE_URL}/api/rag/upload",
+                    files=files
+                )
+                
+                if response.status_code == 202:
+                    job = response.json()
+                    progress = st.empty()
                     
-                    if response.status_code == 200:
-                        result = response.json()
+                    # 작업 완료까지 진행 상황 폴링
+                    while True:
+                        status = requests.get(f"{API_BASE_URL}{job['status_url']}").json()
+                        info = status["progress"]
+                        progress.info(
+                            f"상태: {status['status']} · 페이지 {info['pages']} · "
+                            f"청크 {info['chunks']} · 임베딩 {info['embedded']}"
+                        )
+                        if status["status"] in ("completed", "failed"):
+                            break
+                        time.sleep(1)
+                    
+                    if status["status"] == "completed":
+                        result = status["result"]
+                        progress.empty()
                         st.success("✅ 업로드 성공!")
                         
                         col1, col2, col3 = st.columns(3)
@@ -213,10 +277,12 @@ with tab3:
                         with col3:
                             st.metric("전체 문서", result.get("total_documents", 0))
                     else:
-                        error_detail = response.json().get("detail", "알 수 없는 오류")
-                        st.error(f"업로드 실패: {error_detail}")
-                except Exception as e:
-                    st.error(f"오류: {str(e)}")
+                        st.error(f"벡터화 실패: {status.get('error')}")
+                else:
+                    error_detail = response.json().get("detail", "알 수 없는 오류")
+                    st.error(f"업로드 실패: {error_detail}")
+            except Exception as e:
+                st.error(f"오류: {str(e)}")
     
     st.markdown("---")
     
@@ -238,7 +304,7 @@ with tab3:
                     if uploaded_files:
                         st.markdown("**업로드된 파일:**")
                         for file in uploaded_files:
-                            st.write(f"- {file['filename']} ({file['size']} bytes)")
+                            st.write(f"- {file['filename']} ({file['size']} bytes, {file.get('chunks', 0)} 청크)")
                     else:
                         st.info("업로드된 파일이 없습니다.")
             except Exception as e:
@@ -0,0 +1,4 @@
+"""
+유틸리티 패키지
+"""
+
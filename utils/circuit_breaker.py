@@ -0,0 +1,129 @@
+"""
+회로 차단기 - 연속 실패한 외부 서비스 호출을 일정 시간 즉시 실패시킴
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """회로가 열려 있어 호출을 보내지 않은 경우"""
+
+
+class CircuitBreaker:
+    """
+    연속 실패 횟수 기반 회로 차단기
+
+    closed(정상) → 연속 실패가 failure_threshold에 도달하면 open(즉시 실패)
+    → reset_timeout이 지나면 half_open(시험 요청 하나만 허용) → 성공 시 closed, 실패 시 다시 open
+
+    시험 요청이 성공/실패 기록 없이 끝나면(취소, 다른 예외) release_probe()로 자리를 돌려줘야
+    다음 요청이 다시 시험할 수 있습니다.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 15.0):
+        """
+        초기화
+
+        Args:
+            name: 오류 메시지와 통계에 쓸 이름
+            failure_threshold: 회로를 열 연속 실패 횟수 (0이면 항상 닫힘)
+            reset_timeout: 회로를 연 뒤 시험 요청을 허용하기까지 시간(초)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_id = 0
+
+        # 통계
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        """현재 상태 (closed, open, half_open)"""
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return self._state
+
+    def before_call(self) -> Optional[int]:
+        """
+        호출 전 확인 (허용되지 않으면 예외)
+
+        Returns:
+            Optional[int]: 시험 요청 자리를 잡았으면 release_probe()에 넘길 번호, 아니면 None
+
+        Raises:
+            CircuitOpenError: 회로가 열려 있거나 다른 시험 요청이 진행 중인 경우
+        """
+        if not self.failure_threshold:
+            return None
+        with self._lock:
+            if self._state == "closed":
+                return None
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if self._state == "open" and remaining <= 0:
+                self._state = "half_open"
+            if self._state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._probe_id += 1
+                return self._probe_id
+            self.rejected += 1
+        raise CircuitOpenError(
+            f"{self.name} 연속 실패로 호출을 차단했습니다 ({max(remaining, 0):.1f}초 후 재시도)"
+        )
+
+    def release_probe(self, probe: Optional[int]) -> None:
+        """
+        시험 요청 자리 반환 (호출 종료 시 항상 호출, 이미 성공/실패가 기록됐으면 아무 일도 하지 않음)
+
+        Args:
+            probe: before_call()이 반환한 번호
+        """
+        if probe is None:
+            return
+        with self._lock:
+            if self._probe_in_flight and self._probe_id == probe:
+                self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        """호출 성공 기록 (회로 닫기)"""
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """호출 실패 기록 (연속 실패가 기준에 도달하거나 시험 요청이 실패하면 회로 열기)"""
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self.opened += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        통계 반환
+
+        Returns:
+            dict: 상태, 연속 실패 수, 회로가 열린 횟수, 차단한 호출 수
+        """
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,70 @@
+"""
+동시성 유틸리티 - 블로킹 작업을 이벤트 루프 밖에서 실행
+"""
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from config import settings
+
+
+# 블로킹 작업 전용 스레드 풀 (최초 사용 시 생성)
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    크기가 제한된 공용 스레드 풀 반환
+
+    Returns:
+        ThreadPoolExecutor: 블로킹 작업용 스레드 풀
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BLOCKING_EXECUTOR_MAX_WORKERS,
+            thread_name_prefix="blocking-worker"
+        )
+    return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    블로킹 함수를 공용 스레드 풀에서 실행하고 결과를 기다림
+
+    호출 시점의 contextvars를 그대로 복사해 워커 스레드에서 실행합니다.
+
+    Args:
+        func: 실행할 블로킹 함수
+        *args: 위치 인자
+        **kwargs: 키워드 인자
+
+    Returns:
+        Any: 함수 반환값
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(), call)
+
+
+def install_default_executor(loop: asyncio.AbstractEventLoop) -> None:
+    """
+    이벤트 루프의 기본 executor를 공용 스레드 풀로 교체
+
+    LangChain의 기본 비동기 구현(run_in_executor(None, ...))도
+    같은 크기 제한을 따르도록 합니다.
+
+    Args:
+        loop: 대상 이벤트 루프
+    """
+    loop.set_default_executor(get_executor())
+
+
+def shutdown_executor() -> None:
+    """공용 스레드 풀 종료"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
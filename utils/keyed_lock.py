@@ -0,0 +1,103 @@
+"""
+키별 잠금 - 같은 키(예: 출처 파일)에 대한 작업을 스레드와 프로세스 사이에서 직렬화
+"""
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 스레드 잠금만 사용
+    fcntl = None
+
+
+class _Entry:
+    """키 하나의 잠금 상태"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.users = 0  # 잠금을 잡았거나 기다리는 스레드 수 (0이 되면 정리)
+        self.depth = 0  # 재진입 깊이
+        self.handle = None  # 프로세스 간 잠금 파일
+
+
+class KeyedLock:
+    """
+    키별 재진입 잠금
+
+    같은 프로세스 안에서는 키별 RLock으로, 여러 프로세스(uvicorn 워커) 사이에서는
+    키별 잠금 파일의 flock으로 직렬화합니다. 같은 스레드는 다시 잡을 수 있습니다.
+    """
+
+    def __init__(self, directory: str):
+        """
+        초기화
+
+        Args:
+            directory: 프로세스 간 잠금 파일을 둘 디렉토리
+        """
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, _Entry] = {}
+
+        # 통계
+        self.acquired = 0
+        self.contended = 0
+
+    def _lock_path(self, key: Hashable) -> str:
+        """키의 잠금 파일 경로"""
+        digest = hashlib.sha1(str(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.lock")
+
+    @contextmanager
+    def hold(self, key: Hashable) -> Iterator[None]:
+        """
+        키 잠금을 잡고 실행 (다른 스레드/프로세스가 잡고 있으면 대기)
+
+        Args:
+            key: 잠글 키
+        """
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            entry.users += 1
+        try:
+            if not entry.lock.acquire(blocking=False):
+                self.contended += 1
+                entry.lock.acquire()
+            try:
+                if entry.depth == 0 and fcntl is not None:
+                    os.makedirs(self.directory, exist_ok=True)
+                    entry.handle = open(self._lock_path(key), "a+b")
+                    fcntl.flock(entry.handle.fileno(), fcntl.LOCK_EX)
+                entry.depth += 1
+                self.acquired += 1
+                try:
+                    yield
+                finally:
+                    entry.depth -= 1
+                    if entry.depth == 0 and entry.handle is not None:
+                        fcntl.flock(entry.handle.fileno(), fcntl.LOCK_UN)
+                        entry.handle.close()
+                        entry.handle = None
+            finally:
+                entry.lock.release()
+        finally:
+            with self._lock:
+                entry.users -= 1
+                if entry.users == 0:
+                    del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        통계 반환
+
+        Returns:
+            dict: 잠금 획득 수, 대기가 필요했던 획득 수, 사용 중인 키 수
+        """
+        return {
+            "acquired": self.acquired,
+            "contended": self.contended,
+            "held": len(self._entries),
+        }
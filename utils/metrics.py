@@ -0,0 +1,336 @@
+"""
+메트릭 - 단계별 지연 시간 히스토그램, 카운터, 게이지와 Prometheus 텍스트 포맷 출력
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+# 기본 지연 시간 버킷(초) - 밀리초 단위 검색부터 수십 초 생성까지
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    """레이블 값 이스케이프"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """레이블 딕셔너리를 {a="1",b="2"} 형식으로 변환"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    """샘플 값 포맷 (정수는 소수점 없이)"""
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """레이블별 값을 보관하는 메트릭 기본 클래스"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        """
+        초기화
+
+        Args:
+            name: 메트릭 이름
+            documentation: HELP 설명
+            labelnames: 레이블 이름 (관측 시 같은 이름의 키워드 인자로 값 지정)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        """레이블 값 튜플 (레이블 이름 순서)"""
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """(접미사 포함 이름, 레이블, 값) 샘플 리스트"""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Prometheus 텍스트 포맷으로 변환"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class Counter(_Metric):
+    """증가만 하는 카운터"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """
+        카운터 증가
+
+        Args:
+            amount: 증가량
+            **labels: 레이블 값
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [
+                (self.name, dict(zip(self.labelnames, key)), value)
+                for key, value in self._values.items()
+            ]
+
+
+class Gauge(_Metric):
+    """현재 값을 나타내는 게이지"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        """게이지 값 설정"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """게이지 증가 (진행 중인 요청 수 등)"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        """게이지 감소"""
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        with self._lock:
+            return [
+                (self.name, dict(zip(self.labelnames, key)), value)
+                for key, value in self._values.items()
+            ]
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        """
+        초기화
+
+        Args:
+            name: 메트릭 이름
+            documentation: HELP 설명
+            labelnames: 레이블 이름
+            buckets: 버킷 상한 (오름차순, +Inf는 자동 추가)
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[tuple, list] = {}  # 레이블 → [버킷별 개수..., 합계, 개수]
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        값 하나 기록
+
+        Args:
+            value: 관측값 (초 단위 지연 시간 등)
+            **labels: 레이블 값
+        """
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        result = []
+        for key, state in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                result.append((f"{self.name}_bucket", {**labels, "le": le}, cumulative))
+            result.append((f"{self.name}_sum", labels, state[-2]))
+            result.append((f"{self.name}_count", labels, state[-1]))
+        return result
+
+
+class MetricsRegistry:
+    """메트릭과 수집 시점 콜렉터 모음"""
+
+    def __init__(self):
+        """초기화"""
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[_Metric]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """메트릭 등록 후 그대로 반환"""
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        """카운터 생성 및 등록"""
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        """게이지 생성 및 등록"""
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        """히스토그램 생성 및 등록"""
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[_Metric]]) -> None:
+        """
+        스크레이프 시점에 호출할 콜렉터 등록
+
+        캐시 적중률처럼 이미 다른 객체가 세고 있는 값은 요청 경로에서
+        다시 기록하지 않고, /metrics 요청 때 읽어서 메트릭으로 만듭니다.
+
+        Args:
+            collector: 메트릭 리스트를 반환하는 함수
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        등록된 모든 메트릭을 Prometheus 텍스트 포맷으로 변환
+
+        Returns:
+            str: text/plain; version=0.0.4 형식 문자열
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                metrics.extend(collector())
+            except Exception:
+                # 콜렉터 하나의 오류로 전체 스크레이프가 실패하지 않도록 건너뜀
+                continue
+        return "".join(metric.render() for metric in metrics)
+
+
+# 전역 레지스트리
+registry = MetricsRegistry()
+
+# 요청 처리 단계별 소요 시간 (검색, 임베딩, 컨텍스트 구성, 생성 등)
+stage_seconds = registry.histogram(
+    "rag_stage_duration_seconds", "Duration of each request processing stage in seconds", ["stage"]
+)
+
+# LLM 생성 지표
+llm_time_to_first_token_seconds = registry.histogram(
+    "llm_time_to_first_token_seconds", "Time from LLM call start to the first streamed token", ["model"]
+)
+llm_generation_seconds = registry.histogram(
+    "llm_generation_duration_seconds", "Total LLM call duration in seconds", ["model"]
+)
+llm_tokens = registry.counter(
+    "llm_tokens_total", "Tokens processed by the LLM", ["model", "kind"]
+)
+llm_tokens_per_second = registry.histogram(
+    "llm_tokens_per_second", "LLM generation speed in completion tokens per second", ["model"],
+    buckets=(1, 2, 5, 10, 15, 20, 30, 50, 75, 100, 200)
+)
+llm_requests_in_flight = registry.gauge(
+    "llm_requests_in_flight", "LLM calls currently in progress", ["model"]
+)
+
+# HTTP 요청 지표
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being processed"
+)
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request duration in seconds", ["method", "path", "status"]
+)
+
+
+def route_template(scope) -> str:
+    """
+    요청이 매칭된 라우트의 경로 템플릿 (예: /api/rag/jobs/{job_id})
+
+    레이블 수가 늘지 않도록 실제 경로 대신 사용합니다. include_router의 prefix가
+    라우트 경로에 포함되지 않는 경우 실제 경로의 앞부분으로 prefix를 복원합니다.
+
+    Args:
+        scope: ASGI scope (라우팅 이후)
+
+    Returns:
+        str: 경로 템플릿 (매칭된 라우트가 없으면 "unmatched")
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+    segments = scope["path"].split("/")
+    prefix = "/".join(segments[:max(len(segments) - template.count("/"), 0)])
+    return prefix + template
+
+
+class MetricsMiddleware:
+    """HTTP 요청 수와 소요 시간을 기록하는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        """
+        초기화
+
+        Args:
+            app: 감쌀 ASGI 앱
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        # 스트리밍 응답도 본문 전송이 끝날 때까지 진행 중으로 집계
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                path=route_template(scope),
+                status=str(status["code"]),
+            )
@@ -0,0 +1,54 @@
+"""
+Single-flight - 동일한 키의 동시 요청을 하나의 실행으로 합침
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """같은 키로 진행 중인 작업이 있으면 새로 실행하지 않고 결과를 공유하는 클래스"""
+
+    def __init__(self):
+        """초기화"""
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+        # 통계
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        키별로 한 번만 실행하고 결과를 모든 호출자에게 반환
+
+        실제 작업은 별도 태스크로 실행되므로 먼저 요청한 클라이언트가
+        연결을 끊어도 같은 결과를 기다리는 다른 호출자에게는 영향이 없습니다.
+
+        Args:
+            key: 요청을 식별하는 키
+            func: 결과를 만드는 코루틴 함수
+
+        Returns:
+            Any: 작업 결과
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        통계 반환
+
+        Returns:
+            dict: 전체 호출 수, 합쳐진 호출 수, 진행 중인 작업 수
+        """
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
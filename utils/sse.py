@@ -0,0 +1,64 @@
+"""
+Server-Sent Events 유틸리티 - 스트리밍 응답 포맷팅 (SSE, NDJSON)
+"""
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """
+    SSE 이벤트 문자열 생성
+
+    Args:
+        data: JSON으로 직렬화할 데이터
+        event: 이벤트 이름 (None이면 기본 message 이벤트)
+
+    Returns:
+        str: SSE 형식 문자열
+    """
+    payload = json.dumps(data, ensure_ascii=False)
+    if event:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f"data: {payload}\n\n"
+
+
+async def sse_stream(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """
+    {"event": ..., "data": ...} 형태의 이벤트를 SSE 문자열로 변환
+
+    스트림 도중 예외가 발생하면 error 이벤트를 보내고 종료합니다.
+    정상 종료 시 마지막에 done 이벤트를 보냅니다.
+
+    Args:
+        events: 이벤트 비동기 이터레이터
+
+    Yields:
+        str: SSE 형식 문자열
+    """
+    try:
+        async for item in events:
+            yield format_sse(item["data"], item.get("event"))
+    except Exception as e:
+        yield format_sse({"detail": str(e)}, "error")
+        return
+    yield format_sse({}, "done")
+
+
+def format_ndjson(data: Any) -> str:
+    """
+    NDJSON 한 줄 생성
+
+    Args:
+        data: JSON으로 직렬화할 데이터
+
+    Returns:
+        str: 개행으로 끝나는 JSON 문자열
+    """
+    return json.dumps(data, ensure_ascii=False) + "\n"
+
+
+# SSE 응답에 공통으로 사용하는 헤더 (프록시 버퍼링 비활성화)
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
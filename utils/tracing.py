@@ -0,0 +1,364 @@
+"""
+요청 추적 - 요청별 중첩 단계(span) 기록과 느린 요청 추적 로그
+"""
+import json
+import logging
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, List, Optional
+from config import settings
+
+
+# 응답 헤더 이름
+TRACE_HEADER = "X-Trace-Id"
+
+# 클라이언트가 보낸 추적 ID로 허용할 형식
+_VALID_TRACE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# 현재 컨텍스트(요청, 수집 작업)에서 열려 있는 span
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+# 현재 컨텍스트의 추적 ID
+_current_trace_id: ContextVar[Optional[str]] = ContextVar("current_trace_id", default=None)
+
+
+class Span:
+    """추적의 한 단계"""
+
+    __slots__ = ("name", "attrs", "started", "duration", "children")
+
+    def __init__(self, name: str, attrs: Dict[str, Any], started: float = None):
+        """
+        초기화
+
+        Args:
+            name: 단계 이름
+            attrs: 크기 등 부가 정보
+            started: 시작 시각 (perf_counter 기준)
+        """
+        self.name = name
+        self.attrs = attrs
+        self.started = time.perf_counter() if started is None else started
+        self.duration: Optional[float] = None
+        self.children: List["Span"] = []
+
+    def set(self, **attrs: Any) -> None:
+        """부가 정보 추가 (결과 개수, 토큰 수 등)"""
+        self.attrs.update(attrs)
+
+    def end(self) -> None:
+        """단계 종료"""
+        if self.duration is None:
+            self.duration = time.perf_counter() - self.started
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        """
+        딕셔너리로 변환
+
+        Args:
+            origin: 추적 시작 시각 (offset_ms 기준)
+
+        Returns:
+            dict: 이름, 시작 오프셋, 소요 시간(ms), 부가 정보, 하위 단계
+        """
+        data: Dict[str, Any] = {
+            "name": self.name,
+            "offset_ms": round((self.started - origin) * 1000, 2),
+            "duration_ms": None if self.duration is None else round(self.duration * 1000, 2),
+        }
+        if self.attrs:
+            data["attrs"] = self.attrs
+        if self.children:
+            data["spans"] = [child.to_dict(origin) for child in list(self.children)]
+        return data
+
+
+class _ActiveSpan:
+    """span()이 반환하는 컨텍스트 매니저 (현재 span을 바꿨다가 되돌림)"""
+
+    __slots__ = ("span", "token")
+
+    def __init__(self, span: Span):
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.span.end()
+        if exc_type is not None:
+            self.span.attrs["error"] = exc_type.__name__
+        _current_span.reset(self.token)
+
+
+class _NoopSpan:
+    """추적 중이 아닐 때 쓰는 아무 일도 하지 않는 span"""
+
+    __slots__ = ()
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attrs: Any):
+    """
+    현재 추적에 하위 단계 추가
+
+    추적 중이 아니면 ContextVar 조회 한 번으로 끝나는 no-op을 반환하므로
+    요청 경로 어디에나 둘 수 있습니다.
+
+    Args:
+        name: 단계 이름
+        **attrs: 크기 등 부가 정보
+
+    Returns:
+        컨텍스트 매니저 (with 블록에서 span.set()으로 부가 정보 추가)
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return _NOOP_SPAN
+    child = Span(name, attrs)
+    parent.children.append(child)
+    return _ActiveSpan(child)
+
+
+def record_span(name: str, seconds: float, **attrs: Any) -> None:
+    """
+    이미 측정한 소요 시간을 끝난 단계로 추가 (여러 번에 걸친 시간을 합산한 경우)
+
+    Args:
+        name: 단계 이름
+        seconds: 소요 시간(초)
+        **attrs: 크기 등 부가 정보
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return
+    child = Span(name, attrs, started=time.perf_counter() - seconds)
+    child.duration = seconds
+    parent.children.append(child)
+
+
+def tracing_active() -> bool:
+    """현재 컨텍스트가 추적 중인지 여부 (추적할 때만 시간을 재는 경로에서 사용)"""
+    return _current_span.get() is not None
+
+
+class Trace:
+    """요청(또는 수집 작업) 하나의 추적"""
+
+    def __init__(self, trace_id: str, name: str, attrs: Dict[str, Any]):
+        """
+        초기화
+
+        Args:
+            trace_id: 추적 ID
+            name: 최상위 단계 이름
+            attrs: 부가 정보
+        """
+        self.trace_id = trace_id
+        self.timestamp = time.time()
+        self.root = Span(name, attrs)
+        self._tokens = None
+
+    def __enter__(self) -> "Trace":
+        self._tokens = (_current_span.set(self.root), _current_trace_id.set(self.trace_id))
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        span_token, trace_id_token = self._tokens
+        _current_trace_id.reset(trace_id_token)
+        _current_span.reset(span_token)
+        if exc_type is not None:
+            self.root.attrs["error"] = exc_type.__name__
+        tracer.finish(self)
+
+    def set(self, **attrs: Any) -> None:
+        """최상위 단계에 부가 정보 추가"""
+        self.root.set(**attrs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSONL 한 줄로 기록할 딕셔너리"""
+        return {
+            "trace_id": self.trace_id,
+            "timestamp": self.timestamp,
+            **self.root.to_dict(self.root.started),
+        }
+
+
+class Tracer:
+    """추적 시작, 기록 여부 결정, 회전 JSONL 파일 기록"""
+
+    def __init__(self):
+        """초기화"""
+        self._logger: Optional[logging.Logger] = None
+        self._queue_handler: Optional[QueueHandler] = None
+        self._listener: Optional[QueueListener] = None
+        self._lock = threading.Lock()
+        self.started = 0
+        self.written = 0
+
+    @property
+    def enabled(self) -> bool:
+        """추적 사용 여부"""
+        return settings.TRACE_ENABLED
+
+    def start(self, name: str, trace_id: str = None, **attrs: Any):
+        """
+        새 추적 생성 (with 블록으로 사용)
+
+        Args:
+            name: 최상위 단계 이름
+            trace_id: 이어서 쓸 추적 ID (없거나 형식이 맞지 않으면 새로 생성)
+            **attrs: 부가 정보
+
+        Returns:
+            Trace: 추적 (비활성화 시 아무 일도 하지 않는 컨텍스트 매니저)
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        if not trace_id or not _VALID_TRACE_ID.match(trace_id):
+            trace_id = uuid.uuid4().hex
+        self.started += 1
+        return Trace(trace_id, name, attrs)
+
+    def finish(self, trace: Trace) -> None:
+        """
+        추적 종료 후 기록 여부 결정
+
+        TRACE_SLOW_THRESHOLD_MS 이상 걸린 추적은 항상, 나머지는
+        TRACE_SAMPLE_RATE 비율로만 기록합니다.
+
+        Args:
+            trace: 종료할 추적
+        """
+        trace.root.end()
+        slow = trace.root.duration * 1000 >= settings.TRACE_SLOW_THRESHOLD_MS
+        if not slow and random.random() >= settings.TRACE_SAMPLE_RATE:
+            return
+        record = trace.to_dict()
+        record["slow"] = slow
+        self._get_logger().info(json.dumps(record, ensure_ascii=False, default=str))
+        self.written += 1
+
+    def _get_logger(self) -> logging.Logger:
+        """
+        추적 전용 로거 (최초 기록 시 생성)
+
+        finish()는 이벤트 루프에서도 호출되므로 로거는 큐에 넣기만 하고,
+        파일 쓰기와 회전은 QueueListener 스레드의 회전 파일 핸들러가 맡습니다.
+        """
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    handler = RotatingFileHandler(
+                        settings.TRACE_LOG_PATH,
+                        maxBytes=settings.TRACE_LOG_MAX_BYTES,
+                        backupCount=settings.TRACE_LOG_BACKUP_COUNT,
+                        encoding="utf-8",
+                    )
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    records: queue.SimpleQueue = queue.SimpleQueue()
+                    self._listener = QueueListener(records, handler)
+                    self._listener.start()
+                    self._queue_handler = QueueHandler(records)
+                    logger = logging.getLogger("rag.traces")
+                    logger.setLevel(logging.INFO)
+                    logger.propagate = False
+                    logger.addHandler(self._queue_handler)
+                    self._logger = logger
+        return self._logger
+
+    def close(self) -> None:
+        """대기 중인 기록을 파일에 모두 쓰고 기록 스레드 종료 (애플리케이션 종료 시)"""
+        with self._lock:
+            if self._logger is None:
+                return
+            self._logger.removeHandler(self._queue_handler)
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._logger = self._queue_handler = self._listener = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        추적 통계 반환
+
+        Returns:
+            dict: 사용 여부, 시작/기록한 추적 수, 기록 조건
+        """
+        return {
+            "enabled": self.enabled,
+            "started": self.started,
+            "written": self.written,
+            "slow_threshold_ms": settings.TRACE_SLOW_THRESHOLD_MS,
+            "sample_rate": settings.TRACE_SAMPLE_RATE,
+            "path": settings.TRACE_LOG_PATH,
+        }
+
+
+class TracingMiddleware:
+    """HTTP 요청마다 추적을 시작하고 응답 헤더로 추적 ID를 돌려주는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        """
+        초기화
+
+        Args:
+            app: 감쌀 ASGI 앱
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for key, value in scope.get("headers", ()):
+            if key == b"x-trace-id":
+                incoming = value.decode("latin-1")
+                break
+        trace = tracer.start(f"{scope['method']} {scope['path']}", trace_id=incoming)
+        header = (TRACE_HEADER.lower().encode(), trace.trace_id.encode())
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                trace.root.set(status=message["status"])
+                message = {**message, "headers": [*message.get("headers", ()), header]}
+            await send(message)
+
+        # 스트리밍 응답은 본문 전송이 끝날 때까지 하나의 추적으로 기록
+        with trace:
+            await self.app(scope, receive, send_wrapper)
+
+
+def current_trace_id() -> Optional[str]:
+    """
+    현재 요청의 추적 ID (백그라운드 작업에 이어 붙일 때 사용)
+
+    Returns:
+        Optional[str]: 추적 ID (추적 중이 아니면 None)
+    """
+    return _current_trace_id.get()
+
+
+# 전역 인스턴스
+tracer = Tracer()